@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Cserélhető dekóder backendek: Essentia MonoLoader (alap) és ffmpeg alfolyamat-pool
+Parancssori belépési pont; a modul: music_analyzer.audio_decoders (python3 -m music_analyzer.audio_decoders is ugyanez)
+"""
+import sys
+
+from music_analyzer.audio_decoders import main
+
+if __name__ == "__main__":
+    sys.exit(main())
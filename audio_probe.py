@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Metaadat-only probe: hossz, mintavételi frekvencia, csatornák, bitráta dekódolás nélkül
+Parancssori belépési pont; a modul: music_analyzer.audio_probe (python3 -m music_analyzer.audio_probe is ugyanez)
+"""
+import sys
+
+from music_analyzer.audio_probe import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,315 @@
+#!/usr/bin/env python3
+"""
+Elemzési benchmark előzményekkel: minden futás (áteresztőképesség, szakaszonkénti p50/p95,
+csúcs RSS, gép ujjlenyomat) egy helyi SQLite tárba kerül, és a kiválasztott alapvonalhoz
+hasonlítjuk - lassulásnál nem nulla kilépési kód (pl. essentia-tensorflow frissítés után)
+
+Ugyanez a tár adja a futás előtti ETA költségét (mp / audio mp): az elemzők minden futás
+után elmentik a gépen mért költséget az adott módhoz (BPM, dekóder, kaszkád, trim ...),
+ennek hiányában a gép alapvonalának realtime_x értéke számít, ha a mód egyezik
+(a tár és a költség a könnyű benchmark_store modulban: az elemzők és a probe a modell nélkül érik el)
+
+Zaj kezelése: a fájlonkénti idők bootstrap konfidencia-intervalluma; regresszió csak akkor,
+ha a lassulás a küszöb (alap: 5%) fölött van ÉS az intervallum alsó széle is 1 fölött van
+
+Használat:
+  python3 benchmark_history.py run --audio-dir audio_mp3 --files 20 --set-baseline
+  python3 benchmark_history.py run --label "essentia frissítés után"
+  python3 benchmark_history.py list
+  python3 benchmark_history.py compare 7 --baseline 3
+"""
+import os
+import sys
+import time
+import hashlib
+import argparse
+import platform
+import subprocess
+
+import numpy as np
+
+from music_analyzer.library_discovery import DEFAULT_AUDIO_DIR, discover
+from music_analyzer.audio_decoders import DECODER_CHOICES, DEFAULT_DECODER, AudioDecoder
+from music_analyzer.classifier import MusicGenreClassifier
+from music_analyzer.benchmark_store import DEFAULT_HISTORY_PATH, BenchmarkHistory, host_key
+
+DEFAULT_FILES = 20
+# Az első fájl(ok) a TF gráf / gyorsítótárak bemelegítése, nem számítanak bele
+DEFAULT_WARMUP = 1
+DEFAULT_REPEAT = 1
+# Ennél kisebb relatív lassulás szignifikáns eltérésnél sem regresszió
+DEFAULT_THRESHOLD = 0.05
+RSS_THRESHOLD = 0.10
+# Ennél rövidebb abszolút eltérés (másodperc) mérési zaj (pl. ms-os trim szakasz)
+MIN_DELTA_SEC = 0.005
+BOOTSTRAP_ROUNDS = 2000
+CONFIDENCE = 0.95
+# Ezek a csomagverziók kerülnek az ujjlenyomatba (eltérésük a riportban látszik)
+FINGERPRINT_PACKAGES = ('essentia-tensorflow', 'essentia', 'tensorflow', 'numpy')
+
+
+
+def _package_version(name):
+    import importlib.metadata
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return None
+
+
+def _git_commit():
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        completed = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir,
+                                   capture_output=True, text=True, timeout=5)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return completed.stdout.strip() or None
+
+
+def host_fingerprint():
+    """
+    (gép kulcs, ujjlenyomat): a kulcs csak a hardver / OS - így egy csomagfrissítés
+    ugyanahhoz az alapvonalhoz hasonlít, és a szoftver eltérés a riportban jelenik meg
+    """
+    fingerprint = {
+        'system': platform.system(),
+        'release': platform.release(),
+        'machine': platform.machine(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'python': platform.python_version(),
+        'packages': dict((name, _package_version(name)) for name in FINGERPRINT_PACKAGES),
+        'git': _git_commit(),
+    }
+    return host_key(), fingerprint
+
+
+def peak_rss_mb():
+    """Csúcs RSS MB-ban (saját folyamat + befejezett gyerekek, pl. ffmpeg)"""
+    import resource
+    scale = 1024 * 1024 if platform.system() == 'Darwin' else 1024
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss + \
+        resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return peak / scale
+
+
+def run_benchmark(classifier, paths, warmup=DEFAULT_WARMUP, repeat=DEFAULT_REPEAT):
+    """
+    Soros mérés: (fájlonkénti minták, falióra idő, modell betöltési idő)
+    Minták: {'total': [...], 'audio_sec': [...], 'stages': {szakasz: [...]}}
+    """
+    load_start = time.perf_counter()
+    if not classifier.prepare():
+        raise RuntimeError(classifier.load_error)
+    load_sec = time.perf_counter() - load_start
+
+    for path in paths[:warmup]:
+        classifier.analyze_audio(path)
+
+    samples = {'total': [], 'audio_sec': [], 'stages': {}}
+    wall_start = time.perf_counter()
+    for _ in range(repeat):
+        for path in paths:
+            start = time.perf_counter()
+            result = classifier.analyze_audio(path)
+            elapsed = time.perf_counter() - start
+            if not result['success']:
+                raise RuntimeError(f"{path}: {result['error']}")
+            samples['total'].append(elapsed)
+            samples['audio_sec'].append(result['audio_length'])
+            for stage, seconds in result['stages'].items():
+                samples['stages'].setdefault(stage, []).append(seconds)
+    return samples, time.perf_counter() - wall_start, load_sec
+
+
+def _percentiles(values):
+    values = np.asarray(values, dtype=np.float64)
+    return {'p50': round(float(np.percentile(values, 50)), 5), 'p95': round(float(np.percentile(values, 95)), 5)}
+
+
+def summarize(samples, wall_sec, load_sec, rss_mb):
+    """Összesítés: áteresztőképesség, fájlonkénti és szakaszonkénti p50/p95, csúcs RSS"""
+    audio_sec = float(sum(samples['audio_sec']))
+    return {
+        'files': len(samples['total']),
+        'audio_sec': round(audio_sec, 1),
+        'wall_sec': round(wall_sec, 3),
+        'files_per_sec': round(len(samples['total']) / wall_sec, 4) if wall_sec > 0 else None,
+        'realtime_x': round(audio_sec / wall_sec, 2) if wall_sec > 0 else None,
+        'model_load_sec': round(load_sec, 3),
+        'peak_rss_mb': round(rss_mb, 1),
+        'total': _percentiles(samples['total']),
+        'stages': dict((stage, _percentiles(values)) for stage, values in samples['stages'].items()),
+    }
+
+
+def bootstrap_ratio(current, baseline, q, rounds=BOOTSTRAP_ROUNDS, confidence=CONFIDENCE, seed=0):
+    """
+    q-adik percentilis aránya (jelenlegi / alapvonal) és a bootstrap konfidencia-intervalluma
+    Mindkét minta visszatevéses újramintavételezése, egyetlen vektorizált lépésben
+    """
+    current = np.asarray(current, dtype=np.float64)
+    baseline = np.asarray(baseline, dtype=np.float64)
+    rng = np.random.default_rng(seed)
+    current_q = np.percentile(current[rng.integers(len(current), size=(rounds, len(current)))], q, axis=1)
+    baseline_q = np.percentile(baseline[rng.integers(len(baseline), size=(rounds, len(baseline)))], q, axis=1)
+    ratios = current_q / np.maximum(baseline_q, 1e-12)
+    tail = (1.0 - confidence) / 2.0 * 100
+    low, high = np.percentile(ratios, [tail, 100 - tail])
+    return np.percentile(current, q) / max(np.percentile(baseline, q), 1e-12), low, high
+
+
+def compare(current, baseline, threshold=DEFAULT_THRESHOLD):
+    """
+    Metrikánkénti összevetés: [(metrika, alapvonal, jelenlegi, arány, (alsó, felső) vagy None, regresszió)]
+    Idő: nagyobb = rosszabb; áteresztőképesség: kisebb = rosszabb
+    """
+    rows = []
+    series = [('total', current['samples']['total'], baseline['samples']['total'])]
+    for stage, values in current['samples']['stages'].items():
+        if stage in baseline['samples']['stages']:
+            series.append((stage, values, baseline['samples']['stages'][stage]))
+
+    for name, values, reference in series:
+        for q in (50, 95):
+            ratio, low, high = bootstrap_ratio(values, reference, q)
+            before, after = np.percentile(reference, q), np.percentile(values, q)
+            regressed = ratio > 1 + threshold and low > 1.0 and after - before > MIN_DELTA_SEC
+            rows.append((f"{name} p{q} (s)", before, after, ratio, (low, high), regressed))
+
+    before, after = baseline['summary']['realtime_x'], current['summary']['realtime_x']
+    if before and after:
+        # Egyetlen szám futásonként: csak a relatív küszöb (a zajt a fájlonkénti idők fedik le)
+        rows.append(("realtime_x", before, after, after / before, None, after < before * (1 - threshold)))
+    before, after = baseline['summary']['peak_rss_mb'], current['summary']['peak_rss_mb']
+    rows.append(("peak_rss_mb", before, after, after / before, None, after > before * (1 + RSS_THRESHOLD)))
+    return rows
+
+
+def print_comparison(current, baseline, rows):
+    """Összevetés táblázat + ujjlenyomat / konfiguráció eltérések"""
+    print(f"\n📊 #{current['id'] or '-'} vs. alapvonal #{baseline['id']} ({baseline['created']}"
+          f"{', ' + baseline['label'] if baseline['label'] else ''})")
+    if current['host'] != baseline['host']:
+        print("⚠️  Eltérő gép - az összevetés tájékoztató jellegű")
+    for key in ('python', 'git'):
+        if current['fingerprint'].get(key) != baseline['fingerprint'].get(key):
+            print(f"  🔀 {key}: {baseline['fingerprint'].get(key)} → {current['fingerprint'].get(key)}")
+    for name, version in current['fingerprint']['packages'].items():
+        if version != baseline['fingerprint']['packages'].get(name):
+            print(f"  🔀 {name}: {baseline['fingerprint']['packages'].get(name)} → {version}")
+    if current['config'] != baseline['config']:
+        print(f"⚠️  Eltérő beállítások: {baseline['config']} → {current['config']}")
+
+    print(f"  {'metrika':<22} {'alapvonal':>10} {'jelenlegi':>10} {'változás':>9}  {'95% CI':>15}")
+    for name, before, after, ratio, interval, regressed in rows:
+        ci = f"{interval[0] - 1:+.0%}..{interval[1] - 1:+.0%}" if interval else ""
+        mark = "❌" if regressed else "  "
+        print(f"{mark}{name:<22} {before:10.3f} {after:10.3f} {ratio - 1:+9.1%}  {ci:>15}")
+
+
+def main(argv=None):
+    """Benchmark előzmény parancssor"""
+    parser = argparse.ArgumentParser(description="Elemzési benchmark előzményekkel és regresszió ellenőrzéssel")
+    parser.add_argument('--history', default=DEFAULT_HISTORY_PATH, help="Előzmény tár (SQLite)")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_cmd = commands.add_parser('run', help="Mérés, mentés és összevetés az alapvonallal")
+    run_cmd.add_argument('--audio-dir', default=DEFAULT_AUDIO_DIR, help="Benchmark fájlok könyvtára")
+    run_cmd.add_argument('--files', type=int, default=DEFAULT_FILES, help="Mért fájlok száma (név szerint rendezve)")
+    run_cmd.add_argument('--warmup', type=int, default=DEFAULT_WARMUP, help="Bemelegítő fájlok (nem számítanak)")
+    run_cmd.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Ismétlések száma")
+    run_cmd.add_argument('--no-bpm', action='store_true', help="Csak műfaj (BPM nélkül)")
+    run_cmd.add_argument('--decoder', choices=DECODER_CHOICES, default=DEFAULT_DECODER, help="Dekóder backend")
+    run_cmd.add_argument('--label', help="Megjegyzés a futáshoz (pl. csomagfrissítés)")
+    run_cmd.add_argument('--baseline', type=int, help="Összevetés ezzel a futással (alap: a gép alapvonala)")
+    run_cmd.add_argument('--set-baseline', action='store_true', help="A futás legyen az új alapvonal")
+    run_cmd.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                         help=f"Megengedett relatív lassulás (alap: {DEFAULT_THRESHOLD:.0%}%)")
+
+    commands.add_parser('list', help="Legutóbbi futások")
+    baseline_cmd = commands.add_parser('baseline', help="Futás kijelölése alapvonalnak")
+    baseline_cmd.add_argument('run_id', type=int)
+    compare_cmd = commands.add_parser('compare', help="Két mentett futás összevetése")
+    compare_cmd.add_argument('run_id', type=int)
+    compare_cmd.add_argument('--baseline', type=int, help="Alapvonal futás (alap: a gép alapvonala)")
+    compare_cmd.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD)
+
+    args = parser.parse_args(argv)
+
+    with BenchmarkHistory(args.history) as history:
+        if args.command == 'list':
+            for record in history.runs():
+                summary = record['summary']
+                print(f"{'⭐' if record['is_baseline'] else '  '} #{record['id']:<4} {record['created']}  "
+                      f"{summary['realtime_x']:7.1f}x  p50 {summary['total']['p50']:.3f}s  "
+                      f"{summary['peak_rss_mb']:7.0f} MB  {record['host']}  {record['label'] or ''}")
+            return 0
+
+        if args.command == 'baseline':
+            try:
+                record = history.set_baseline(args.run_id)
+            except KeyError:
+                print(f"❌ Nincs ilyen futás: #{args.run_id}", file=sys.stderr)
+                return 1
+            print(f"⭐ Alapvonal: #{record['id']} ({record['host']})")
+            return 0
+
+        if args.command == 'compare':
+            current = history.get(args.run_id)
+            if current is None:
+                print(f"❌ Nincs ilyen futás: #{args.run_id}", file=sys.stderr)
+                return 1
+        else:
+            files = [os.path.join(args.audio_dir, name) for name, _ in discover(args.audio_dir)]
+            files = files[:args.files + args.warmup]
+            if len(files) <= args.warmup:
+                print(f"❌ Kevés audio fájl a benchmarkhoz: {args.audio_dir}", file=sys.stderr)
+                return 1
+            host, fingerprint = host_fingerprint()
+            config = {'files': len(files) - args.warmup, 'warmup': args.warmup, 'repeat': args.repeat,
+                      'tempo': not args.no_bpm, 'decoder': args.decoder,
+                      'file_set': hashlib.sha1("\n".join(files).encode('utf-8')).hexdigest()[:12]}
+            print(f"⏱️  Benchmark: {config['files']} fájl × {args.repeat}, {args.warmup} bemelegítő "
+                  f"(gép: {host})")
+            classifier = MusicGenreClassifier(decoder=AudioDecoder(args.decoder), tempo=not args.no_bpm,
+                                              verbose=False)
+            try:
+                samples, wall_sec, load_sec = run_benchmark(classifier, files, args.warmup, args.repeat)
+            except RuntimeError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 1
+            current = {
+                'id': None, 'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'label': args.label,
+                'host': host, 'fingerprint': fingerprint, 'config': config,
+                'summary': summarize(samples, wall_sec, load_sec, peak_rss_mb()), 'samples': samples,
+            }
+            current['id'] = history.save(current)
+            summary = current['summary']
+            print(f"✅ #{current['id']}: {summary['realtime_x']}x realtime, {summary['files_per_sec']} fájl/s, "
+                  f"p50 {summary['total']['p50']:.3f}s / p95 {summary['total']['p95']:.3f}s, "
+                  f"csúcs RSS {summary['peak_rss_mb']:.0f} MB")
+            for stage, values in summary['stages'].items():
+                print(f"    {stage:<12} p50 {values['p50']:.3f}s  p95 {values['p95']:.3f}s")
+
+        baseline = history.get(args.baseline) if args.baseline else history.baseline_for(current['host'])
+        if args.command == 'run' and args.set_baseline:
+            history.set_baseline(current['id'])
+            print(f"⭐ Új alapvonal: #{current['id']}")
+        if baseline is None or baseline['id'] == current['id']:
+            print("ℹ️  Nincs összevethető alapvonal (run --set-baseline vagy baseline <id>)")
+            return 0
+
+        rows = compare(current, baseline, args.threshold)
+        print_comparison(current, baseline, rows)
+        regressions = [row[0] for row in rows if row[5]]
+        if regressions:
+            print(f"\n❌ Teljesítmény regresszió: {', '.join(regressions)}")
+            return 1
+        print("\n✅ Nincs regresszió (a zajküszöbön belül)")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -68,7 +68,7 @@ def check_model_files():
             else:
                 print(f"⚠️ {model_path}: {size_mb:.1f} MB (várt: {min_size/(1024*1024):.1f}-{max_size/(1024*1024):.1f} MB)")
                 if size < 1000:  # Ha túl kicsi, valószínűleg Git LFS probléma
-                    print(f"   💡 Futtasd: git lfs pull")
+                    print("   💡 Futtasd: git lfs pull")
                 all_good = False
         else:
             print(f"❌ {model_path}: nem található")
@@ -76,6 +76,40 @@ def check_model_files():
     
     return all_good
 
+def check_worker_warmup():
+    """A PreforkPool bemelegítése sima és patch gyorsítótáras módban (a predictor bemenete eltér)"""
+    import tempfile
+    from music_analyzer import MusicGenreClassifier
+    from music_analyzer.mel_patches import PatchCache
+    from music_analyzer.prefork_workers import warm_up
+
+    print("\n🔥 Worker bemelegítés ellenőrzése:")
+    all_good = True
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for label, patch_cache in (("alap", None), ("--patch-cache", PatchCache(cache_dir))):
+            classifier = MusicGenreClassifier(patch_cache=patch_cache, verbose=False)
+            if not classifier.load_model():
+                print(f"❌ {label}: {classifier.load_error}")
+                all_good = False
+                continue
+            try:
+                warm_up(classifier)
+                print(f"✅ {label}: bemelegítő inferencia rendben")
+            except Exception as e:
+                print(f"❌ {label}: {e}")
+                all_good = False
+    return all_good
+
+def check_columnar_output():
+    """Parquet / Arrow kimenet sémája: előre ismert extra oszlopok (csak pyarrow esetén)"""
+    from music_analyzer.columnar_output import PYARROW_AVAILABLE, self_test
+
+    print("\n🧊 Oszlopos kimenet ellenőrzése:")
+    if not PYARROW_AVAILABLE:
+        print("⚠️ pyarrow nincs telepítve, a --columnar kimenet nem elérhető (kihagyva)")
+        return True
+    return self_test()
+
 def check_git_lfs():
     """Git LFS ellenőrzés"""
     print("\n📡 Git LFS ellenőrzés:")
@@ -130,6 +164,8 @@ def main():
         ("Python verzió", check_python_version),
         ("Függőségek", check_imports),
         ("Modell fájlok", check_model_files),
+        ("Worker bemelegítés", check_worker_warmup),
+        ("Oszlopos kimenet", check_columnar_output),
         ("Git LFS", check_git_lfs),
         ("Könyvtárak", check_directories)
     ]
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Közös parancssori kapcsolók a három elemző scripthez
+"""
+import argparse
+
+from music_analyzer.genre_pooling import POOLING_METHODS, DEFAULT_POOLING
+from music_analyzer.library_discovery import DEFAULT_AUDIO_DIR, parse_shard
+from music_analyzer.prefork_workers import WORKER_MODES, DEFAULT_TIMEOUT_BASE, DEFAULT_TIMEOUT_PER_MB
+from music_analyzer.scheduling import SCHEDULE_METHODS, DEFAULT_SCHEDULE
+from music_analyzer.memory_budget import parse_memory
+from music_analyzer.cascade import DEFAULT_EXCERPT_SEC, DEFAULT_MIN_CONFIDENCE, DEFAULT_MIN_MARGIN
+from music_analyzer.silence_trim import TRIM_MODES, DEFAULT_TRIM_MODE
+from music_analyzer.descriptors import DESCRIPTORS
+from music_analyzer.prefetch_io import DEFAULT_PREFETCH_MB
+from music_analyzer.audio_decoders import DECODER_CHOICES, DEFAULT_DECODER, DEFAULT_BENCHMARK_PATH
+from music_analyzer.benchmark_store import DEFAULT_HISTORY_PATH
+
+
+def build_arg_parser(description):
+    """Argumentum parser a közös kapcsolókkal"""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '--pooling',
+        choices=POOLING_METHODS,
+        default=DEFAULT_POOLING,
+        help=f"Aktivációk összesítése a patch-eken (alap: {DEFAULT_POOLING})"
+    )
+    parser.add_argument(
+        '--trim',
+        choices=TRIM_MODES,
+        default=DEFAULT_TRIM_MODE,
+        help="Csend (silence) vagy csend + zajszerű szakaszok (noise) levágása BPM és predikció előtt"
+    )
+    parser.add_argument(
+        '--descriptors',
+        nargs='+',
+        choices=DESCRIPTORS,
+        metavar='NÉV',
+        help=f"További leírók a már dekódolt jelen, külön oszlopokban ({', '.join(DESCRIPTORS)})"
+    )
+    parser.add_argument(
+        '--heads',
+        nargs='*',
+        metavar='NÉV',
+        help="Multi-head mód: a backbone egyszer fut, a műfaj és a models/heads fejei (pl. mood_happy) "
+             "az embeddingeken; név nélkül minden fej"
+    )
+    parser.add_argument(
+        '--no-bpm',
+        action='store_true',
+        help="BPM számítás kihagyása: csak műfaj, egyetlen 16 kHz-es dekódolással (gyorsabb)"
+    )
+    parser.add_argument(
+        '--cascade',
+        action='store_true',
+        help="Kétlépcsős kaszkád: gyors első menet (középső részlet, gyors tempó) minden fájlon, "
+             "teljes elemzés csak a bizonytalan eredményekre"
+    )
+    parser.add_argument(
+        '--cascade-excerpt',
+        type=float,
+        default=DEFAULT_EXCERPT_SEC,
+        metavar='SEC',
+        help=f"Az első menet részletének hossza (alap: {DEFAULT_EXCERPT_SEC:.0f}s)"
+    )
+    parser.add_argument(
+        '--cascade-confidence',
+        type=float,
+        default=DEFAULT_MIN_CONFIDENCE,
+        metavar='P',
+        help=f"Eszkaláció, ha a top-1 konfidencia ez alatt van (alap: {DEFAULT_MIN_CONFIDENCE})"
+    )
+    parser.add_argument(
+        '--cascade-margin',
+        type=float,
+        default=DEFAULT_MIN_MARGIN,
+        metavar='P',
+        help=f"Eszkaláció, ha a top-1 és top-2 konfidencia különbsége ez alatt van (alap: {DEFAULT_MIN_MARGIN})"
+    )
+    parser.add_argument(
+        '--patch-cache',
+        metavar='DIR',
+        help="Mel patch gyorsítótár: a front end számonként egyszer, float16-ként mentve; "
+             "a következő futások dekódolás nélkül, csak inferenciával"
+    )
+    parser.add_argument(
+        '--db',
+        metavar='PATH',
+        help="SQLite eredménytár (pl. eredmenyek.sqlite) - a timestampes CSV helyett"
+    )
+    parser.add_argument(
+        '--columnar',
+        metavar='PATH',
+        help="Oszlopos kimenet teljes aktivációs vektorral (.parquet vagy .arrow, pyarrow kell)"
+    )
+    parser.add_argument(
+        '--audio-dir',
+        default=DEFAULT_AUDIO_DIR,
+        help=f"Zenei könyvtár gyökere, rekurzív bejárással (alap: {DEFAULT_AUDIO_DIR})"
+    )
+    parser.add_argument(
+        '--no-recursive',
+        action='store_true',
+        help="Csak a könyvtár legfelső szintje (alkönyvtárak nélkül)"
+    )
+    parser.add_argument(
+        '--file-list',
+        metavar='PATH',
+        help="Útvonalak soronként egy fájlból ('-' = stdin) a könyvtár bejárása helyett"
+    )
+    parser.add_argument(
+        '--stdin',
+        action='store_true',
+        help="Útvonalak folyamatosan stdin-ről, soronként (rendezés / probe nélkül, azonnal indul)"
+    )
+    parser.add_argument(
+        '--jsonl',
+        action='store_true',
+        help="NDJSON kimenet: fájlonként egy JSON sor a stdout-ra, amint elkészült; minden más a stderr-re"
+    )
+    parser.add_argument(
+        '--shard',
+        type=parse_shard,
+        metavar='i/n',
+        help="Csak az i-edik szelet feldolgozása n közül (útvonal hash alapján, 0 <= i < n)"
+    )
+    parser.add_argument(
+        '--queue',
+        metavar='URL',
+        help="Megosztott munkasor (sqlite:///út/queue.db vagy redis://host:6379/0) a helyi fájllista helyett"
+    )
+    parser.add_argument(
+        '--worker-id',
+        help="Worker azonosító a munkasorban (alap: gépnév:pid)"
+    )
+    parser.add_argument(
+        '--queue-wait',
+        action='store_true',
+        help="Üres sornál várakozás új fájlokra kilépés helyett"
+    )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help="Párhuzamos worker folyamatok száma (alap: 1 = soros feldolgozás)"
+    )
+    parser.add_argument(
+        '--worker-mode',
+        choices=WORKER_MODES,
+        default='prefork',
+        help="prefork: közös, bemelegített modell fork-kal; naive: workerenkénti betöltés (összehasonlításhoz)"
+    )
+    parser.add_argument(
+        '--isolate',
+        action='store_true',
+        help="Felügyelt worker folyamat egy workerrel is (natív crash / lefagyás nem állítja le a futást)"
+    )
+    parser.add_argument(
+        '--file-timeout',
+        type=float,
+        default=DEFAULT_TIMEOUT_BASE,
+        metavar='SEC',
+        help=f"Fájlonkénti időkorlát alapja workeres módban (alap: {DEFAULT_TIMEOUT_BASE:.0f}s)"
+    )
+    parser.add_argument(
+        '--timeout-per-mb',
+        type=float,
+        default=DEFAULT_TIMEOUT_PER_MB,
+        metavar='SEC',
+        help=f"Időkorlát növekménye fájl MB-onként (alap: {DEFAULT_TIMEOUT_PER_MB:.0f}s)"
+    )
+    parser.add_argument(
+        '--memory-budget',
+        type=parse_memory,
+        metavar='MÉRET',
+        help="Memória keret a workereknek (pl. 8G): a fájlok a hosszukból becsült csúcs memória szerint "
+             "indulnak, a workerek száma (legfeljebb --workers) a kerethez igazodik"
+    )
+    parser.add_argument(
+        '--schedule',
+        choices=SCHEDULE_METHODS,
+        default=DEFAULT_SCHEDULE,
+        help="Kiosztási sorrend: lpt = leghosszabb először (min. makespan), spt = legrövidebb először, fifo"
+    )
+    parser.add_argument(
+        '--priority',
+        action='append',
+        metavar='GLOB',
+        help="Ezekre a mintákra illeszkedő fájlok előre kerülnek (ismételhető, pl. 'uploads/*')"
+    )
+    parser.add_argument(
+        '--no-probe',
+        action='store_true',
+        help="Metaadat probe kihagyása (hossz becslése csak fájlméretből, nincs hossz szűrés)"
+    )
+    parser.add_argument(
+        '--min-duration',
+        type=float,
+        metavar='SEC',
+        help="Ennél rövidebb fájlok kihagyása (probe alapján, pl. csengőhangok, jingle-ök)"
+    )
+    parser.add_argument(
+        '--max-duration',
+        type=float,
+        metavar='SEC',
+        help="Ennél hosszabb fájlok kihagyása (probe alapján, pl. DJ mixek, podcastok)"
+    )
+    parser.add_argument(
+        '--prefetch',
+        type=int,
+        default=0,
+        metavar='N',
+        help="A következő N fájl előolvasása helyi scratch területre (hálózati meghajtóhoz, 0 = ki)"
+    )
+    parser.add_argument(
+        '--prefetch-mb',
+        type=int,
+        default=DEFAULT_PREFETCH_MB,
+        metavar='MB',
+        help=f"Előolvasási keret MB-ban (alap: {DEFAULT_PREFETCH_MB})"
+    )
+    parser.add_argument(
+        '--scratch-dir',
+        metavar='DIR',
+        help="Előolvasott másolatok helye (alap: /dev/shm, ha elérhető, különben a temp könyvtár)"
+    )
+    parser.add_argument(
+        '--decoder',
+        choices=DECODER_CHOICES,
+        default=DEFAULT_DECODER,
+        help="Dekóder: auto = formátumonként a benchmark szerint (ha nincs: monoloader), monoloader, ffmpeg"
+    )
+    parser.add_argument(
+        '--decoder-benchmark',
+        default=DEFAULT_BENCHMARK_PATH,
+        metavar='PATH',
+        help=f"Dekóder benchmark eredmény (audio_decoders.py benchmark, alap: {DEFAULT_BENCHMARK_PATH})"
+    )
+    parser.add_argument(
+        '--benchmark-history',
+        default=DEFAULT_HISTORY_PATH,
+        metavar='PATH',
+        help="Benchmark előzmény tár: innen az ETA költsége (a gépen ebben a módban mért, vagy az alapvonal), "
+             f"ide kerül a futás mért költsége; üres: kikapcsolva (alap: {DEFAULT_HISTORY_PATH})"
+    )
+    return parser
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""
+Pontosság vs. sebesség kiértékelés a gyorsított / közelítő módokhoz
+Egy referencia konfiguráció (a teljes analyze_audio út) és több jelölt ugyanazon a helyi
+korpuszon; egy táblázatban: top-1 / top-5 műfaj egyezés, fő műfaj egyezés,
+BPM hiba (oktáv hibákkal), sebességnövekedés
+
+Jelölt: előre definiált név (ld. CANDIDATE_PRESETS) vagy név:kulcs=érték,kulcs=érték
+  kulcsok: pooling, trim, resample, decoder, tempo, frontend, beat_tracker, cascade
+
+Használat:
+  python3 evaluate_modes.py --audio-dir audio_mp3 --files 50
+  python3 evaluate_modes.py --candidate no-bpm --candidate gyors:pooling=first,resample=decoder --out ertekeles.csv
+"""
+import os
+import sys
+import csv
+import json
+import time
+import shutil
+import argparse
+import tempfile
+
+import numpy as np
+
+from music_analyzer.library_discovery import DEFAULT_AUDIO_DIR, discover
+from music_analyzer.audio_decoders import DECODER_CHOICES, AudioDecoder
+from music_analyzer.genre_pooling import POOLING_METHODS
+from music_analyzer.mel_patches import PatchCache
+from music_analyzer.silence_trim import TRIM_MODES
+from music_analyzer.classifier import BEAT_TRACKERS, MODELS_DIR, RESAMPLE_MODES, MusicGenreClassifier
+from music_analyzer.cascade import CascadeClassifier
+
+# A teljes (leglassabb, legpontosabb) út: minden patch átlaga, 44 kHz BPM, Essentia resample
+REFERENCE_CONFIG = {'pooling': 'mean', 'trim': 'off', 'resample': 'essentia', 'decoder': 'monoloader', 'tempo': True,
+                    'frontend': 'internal', 'beat_tracker': 'multifeature', 'cascade': False}
+CANDIDATE_PRESETS = {
+    'no-bpm': {'tempo': False},
+    'first-patch': {'pooling': 'first'},
+    'decoder-resample': {'resample': 'decoder'},
+    'ffmpeg': {'decoder': 'ffmpeg', 'resample': 'decoder'},
+    'trim-silence': {'trim': 'silence'},
+    # Külön mel front end (üres gyorsítótárral: a számítás + mentés útja)
+    'mel-frontend': {'frontend': 'patches'},
+    'fast-tempo': {'beat_tracker': 'degara'},
+    # Kétlépcsős kaszkád az alapértelmezett küszöbökkel (részlet + gyors tempó, bizonytalanoknál teljes út)
+    'cascade': {'cascade': True},
+}
+DEFAULT_CANDIDATES = ('no-bpm', 'first-patch', 'decoder-resample', 'trim-silence')
+CONFIG_VALUES = {
+    'pooling': POOLING_METHODS,
+    'trim': TRIM_MODES,
+    'resample': RESAMPLE_MODES,
+    'decoder': DECODER_CHOICES,
+    'tempo': (True, False),
+    'frontend': ('internal', 'patches'),
+    'beat_tracker': BEAT_TRACKERS,
+    'cascade': (True, False),
+}
+DEFAULT_FILES = 50
+# MIREX tempó pontosság: ±4% tűrés; Accuracy 2 a 2x, 3x, 1/2, 1/3 (oktáv) hibákat is elfogadja
+BPM_TOLERANCE = 0.04
+OCTAVE_FACTORS = (2.0, 3.0, 1 / 2.0, 1 / 3.0)
+DEFAULT_REFERENCE_CACHE = "evaluation_reference.json"
+
+
+def parse_candidate(spec):
+    """'név' (preset) vagy 'név:kulcs=érték,...' -> (név, teljes konfiguráció)"""
+    name, _, assignments = spec.partition(':')
+    if not assignments:
+        if name not in CANDIDATE_PRESETS:
+            raise ValueError(f"Ismeretlen jelölt: {name} (elérhető: {', '.join(CANDIDATE_PRESETS)})")
+        overrides = CANDIDATE_PRESETS[name]
+    else:
+        overrides = {}
+        for assignment in assignments.split(','):
+            key, _, value = assignment.partition('=')
+            if key not in CONFIG_VALUES:
+                raise ValueError(f"Ismeretlen kulcs: {key} (elérhető: {', '.join(CONFIG_VALUES)})")
+            if key in ('tempo', 'cascade'):
+                value = value.lower() in ('1', 'true', 'igen', 'yes')
+            if value not in CONFIG_VALUES[key]:
+                raise ValueError(f"Érvénytelen érték: {key}={value}")
+            overrides[key] = value
+    config = dict(REFERENCE_CONFIG)
+    config.update(overrides)
+    return name, config
+
+
+def run_config(config, paths, models_dir=MODELS_DIR):
+    """
+    Egy konfiguráció a korpuszon: {útvonal: {'genre_ids', 'parent', 'bpm', 'elapsed'} vagy {'error'}}
+    Az első fájl bemelegítés (TF gráf), az ideje nem számít bele
+    """
+    cache_dir = tempfile.mkdtemp(prefix='patch_cache_') if config['frontend'] == 'patches' else None
+    classifier_class = CascadeClassifier if config['cascade'] else MusicGenreClassifier
+    classifier = classifier_class(models_dir=models_dir, pooling=config['pooling'], trim=config['trim'],
+                                  decoder=AudioDecoder(config['decoder']), tempo=config['tempo'],
+                                  resample=config['resample'], beat_tracker=config['beat_tracker'], verbose=False,
+                                  patch_cache=PatchCache(cache_dir) if cache_dir else None)
+    try:
+        if not classifier.prepare():
+            raise RuntimeError(classifier.load_error)
+        classifier.analyze_audio(paths[0])
+        if cache_dir:
+            # A bemelegítés bejegyzése ne legyen találat a mért menetben
+            shutil.rmtree(cache_dir)
+            os.makedirs(cache_dir)
+
+        results = {}
+        for path in paths:
+            start = time.perf_counter()
+            result = classifier.analyze_audio(path)
+            elapsed = time.perf_counter() - start
+            if result['success']:
+                results[path] = {'genre_ids': result['genre_ids'], 'parent': result['parent'][0],
+                                 'bpm': float(result['bpm']), 'elapsed': elapsed}
+                if 'cascade' in result:
+                    results[path]['cascade'] = result['cascade']
+            else:
+                results[path] = {'error': result['error'], 'elapsed': elapsed}
+        return results
+    finally:
+        if cache_dir:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bpm_accuracy(reference_bpm, candidate_bpm, tolerance=BPM_TOLERANCE):
+    """(Accuracy 1, Accuracy 2, átlagos abszolút hiba) a mindkét oldalon számolt BPM-ekre"""
+    ratio = candidate_bpm / reference_bpm
+    exact = np.abs(ratio - 1.0) <= tolerance
+    octave = exact.copy()
+    for factor in OCTAVE_FACTORS:
+        octave |= np.abs(ratio - factor) <= tolerance * factor
+    return float(exact.mean()), float(octave.mean()), float(np.mean(np.abs(candidate_bpm - reference_bpm)))
+
+
+def evaluate(reference, candidate):
+    """
+    Jelölt metrikái a referenciához képest (a mindkét oldalon sikeres fájlokon)
+    top1: egyező első műfaj; top5: a referencia első műfaja a jelölt top 5-jében;
+    top5_atfedes: a két top 5 halmaz közös része / 5
+    """
+    common = [path for path in reference if 'error' not in reference[path]
+              and 'error' not in candidate.get(path, {'error': True})]
+    metrics = {'fajlok': len(common), 'hibak': sum(1 for r in candidate.values() if 'error' in r)}
+    if not common:
+        return metrics
+
+    reference_ids = np.array([reference[path]['genre_ids'] for path in common])
+    candidate_ids = np.array([candidate[path]['genre_ids'] for path in common])
+    metrics['top1'] = float(np.mean(reference_ids[:, 0] == candidate_ids[:, 0]))
+    metrics['top5'] = float(np.mean((candidate_ids == reference_ids[:, :1]).any(axis=1)))
+    overlap = (reference_ids[:, :, np.newaxis] == candidate_ids[:, np.newaxis, :]).any(axis=2).sum(axis=1)
+    metrics['top5_atfedes'] = float(np.mean(overlap / reference_ids.shape[1]))
+    metrics['fo_mufaj'] = float(np.mean([reference[path]['parent'] == candidate[path]['parent'] for path in common]))
+
+    reference_bpm = np.array([reference[path]['bpm'] for path in common])
+    candidate_bpm = np.array([candidate[path]['bpm'] for path in common])
+    has_bpm = (reference_bpm > 0) & (candidate_bpm > 0)
+    if has_bpm.any():
+        acc1, acc2, mae = bpm_accuracy(reference_bpm[has_bpm], candidate_bpm[has_bpm])
+        metrics.update({'bpm_acc1': acc1, 'bpm_acc2': acc2, 'bpm_oktav_hiba': acc2 - acc1, 'bpm_mae': mae})
+
+    routes = [candidate[path]['cascade'] for path in common if 'cascade' in candidate[path]]
+    if routes:
+        # Kaszkád: a teljes elemzésre eszkalált fájlok aránya
+        metrics['eszkalacio'] = routes.count('teljes') / len(routes)
+
+    # Gyorsulás csak ugyanebben a futásban mért referenciához (a gyorsítótárban nincs idő)
+    timed = [path for path in common if 'elapsed' in candidate[path]]
+    if timed:
+        candidate_time = sum(candidate[path]['elapsed'] for path in timed)
+        metrics['ido_sec'] = candidate_time
+        if len(timed) == len(common) and all('elapsed' in reference[path] for path in common):
+            reference_time = sum(reference[path]['elapsed'] for path in common)
+            metrics['gyorsulas'] = reference_time / candidate_time if candidate_time > 0 else None
+    return metrics
+
+
+def without_timings(results):
+    """Eredmények a mért idők nélkül (csak címkék és BPM - ezek gépfüggetlenek)"""
+    return dict((path, dict((key, value) for key, value in result.items() if key != 'elapsed'))
+                for path, result in results.items())
+
+
+def load_reference_cache(path, config, paths):
+    """
+    Mentett referencia eredmények, ha ugyanarra a konfigurációra és fájlokra készültek
+    Csak a címkék és a BPM: egy másik gépen / terhelés mellett mért idő nem adhat gyorsulást
+    """
+    if not path or not os.path.exists(path):
+        return None
+    with open(path, 'r', encoding='utf-8') as f:
+        cached = json.load(f)
+    if cached.get('config') != config or sorted(cached.get('results', {})) != sorted(paths):
+        return None
+    return without_timings(cached['results'])
+
+
+def save_reference_cache(path, config, results):
+    """Referencia eredmények mentése a következő kiértékeléshez (idők nélkül)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'config': config,
+                   'results': without_timings(results)}, f)
+
+
+def print_table(rows):
+    """Egy sor konfigurációnként; a hiányzó metrika (pl. BPM no-bpm módban) '-'"""
+    def percent(value):
+        return f"{value:6.1%}" if value is not None else f"{'-':>6}"
+
+    print(f"\n{'konfiguráció':<20} {'fájl':>5} {'top-1':>6} {'top-5':>6} {'átfed':>6} {'fő m.':>6} "
+          f"{'BPM A1':>6} {'BPM A2':>6} {'oktáv':>6} {'MAE':>6} {'gyors.':>7}")
+    print("-" * 96)
+    for name, metrics in rows:
+        mae = f"{metrics['bpm_mae']:6.2f}" if metrics.get('bpm_mae') is not None else f"{'-':>6}"
+        speedup = f"{metrics['gyorsulas']:6.2f}x" if metrics.get('gyorsulas') else f"{'-':>7}"
+        print(f"{name:<20} {metrics['fajlok']:5d} {percent(metrics.get('top1'))} {percent(metrics.get('top5'))} "
+              f"{percent(metrics.get('top5_atfedes'))} {percent(metrics.get('fo_mufaj'))} "
+              f"{percent(metrics.get('bpm_acc1'))} {percent(metrics.get('bpm_acc2'))} "
+              f"{percent(metrics.get('bpm_oktav_hiba'))} {mae} {speedup}")
+
+
+def main(argv=None):
+    """Kiértékelő parancssor"""
+    parser = argparse.ArgumentParser(description="Gyorsított módok pontossága a teljes elemzéshez képest")
+    parser.add_argument('--audio-dir', default=DEFAULT_AUDIO_DIR, help="Kiértékelő korpusz könyvtára")
+    parser.add_argument('--files', type=int, default=DEFAULT_FILES, help="Legfeljebb ennyi fájl (név szerint)")
+    parser.add_argument('--candidate', action='append', metavar='SPEC',
+                        help=f"Jelölt (ismételhető): preset ({', '.join(CANDIDATE_PRESETS)}) "
+                             "vagy név:kulcs=érték,... (alap: " + ", ".join(DEFAULT_CANDIDATES) + ")")
+    parser.add_argument('--reference', metavar='SPEC', help="Referencia felülírása, pl. ref:decoder=ffmpeg")
+    parser.add_argument('--reference-cache', default=DEFAULT_REFERENCE_CACHE,
+                        help="Referencia címkék és BPM újrahasználása (JSON; üres = kikapcsolva, "
+                             "a gyorsulás csak friss referencia méréssel számolható)")
+    parser.add_argument('--models-dir', default=MODELS_DIR, help="Modell könyvtár")
+    parser.add_argument('--out', help="Eredmény táblázat CSV-be")
+    args = parser.parse_args(argv)
+
+    try:
+        candidates = [parse_candidate(spec) for spec in (args.candidate or DEFAULT_CANDIDATES)]
+        reference_name, reference_config = parse_candidate(args.reference) if args.reference \
+            else ('referencia', dict(REFERENCE_CONFIG))
+    except ValueError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    paths = [os.path.join(args.audio_dir, name) for name, _ in discover(args.audio_dir)][:args.files]
+    if not paths:
+        print(f"❌ Nincs audio fájl: {args.audio_dir}", file=sys.stderr)
+        return 1
+    print(f"🔬 Kiértékelés: {len(paths)} fájl, {len(candidates)} jelölt")
+
+    try:
+        reference = load_reference_cache(args.reference_cache, reference_config, paths)
+        if reference is not None:
+            print(f"♻️  Referencia a gyorsítótárból: {args.reference_cache}")
+            print("   A gyorsulás oszlop üres (friss referencia méréshez: --reference-cache '')")
+        else:
+            print(f"⏱️  {reference_name}: {reference_config}")
+            reference = run_config(reference_config, paths, args.models_dir)
+            if args.reference_cache:
+                save_reference_cache(args.reference_cache, reference_config, reference)
+
+        rows = [(reference_name, evaluate(reference, reference))]
+        for name, config in candidates:
+            print(f"⏱️  {name}: {config}")
+            rows.append((name, evaluate(reference, run_config(config, paths, args.models_dir))))
+    except RuntimeError as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    print_table(rows)
+    if args.out:
+        columns = ['konfiguracio'] + sorted(set(key for _, metrics in rows for key in metrics))
+        with open(args.out, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.DictWriter(f, fieldnames=columns)
+            writer.writeheader()
+            for name, metrics in rows:
+                writer.writerow(dict(metrics, konfiguracio=name))
+        print(f"\n💾 Táblázat mentve: {args.out}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,558 @@
+#!/usr/bin/env python3
+"""
+Prioritásos job ütemező az osztályozó előtt: vegyes interaktív és tömeges terhelés
+
+A beküldött jobok (fájllisták) prioritási osztályba kerülnek; a workerek minden
+fájlhatáron a legmagasabb nem üres osztályból kapnak munkát, így egy feltöltött szám
+nem várja meg a 100k fájlos háttérfutást (a futó fájlt nem szakítjuk meg).
+Osztályon belül a beküldők fair módon osztoznak (a legkevesebb kiszolgált fájlú
+beküldő következik), a jobok egyenként törölhetők, a sor mélysége és a várakozási
+idő (p50 / p95) lekérdezhető
+
+Használat:
+  python3 job_scheduler.py serve --workers 4 --db eredmenyek.sqlite
+  python3 job_scheduler.py submit --audio-dir /mnt/zene --priority bulk --submitter archivum
+  python3 job_scheduler.py submit feltoltes.mp3 --priority interactive --wait
+  python3 job_scheduler.py cancel 3
+  python3 job_scheduler.py metrics
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import itertools
+import threading
+from collections import OrderedDict, deque
+
+from music_analyzer.genre_pooling import POOLING_METHODS, DEFAULT_POOLING
+from music_analyzer.library_discovery import DEFAULT_AUDIO_DIR, discover
+from music_analyzer.prefork_workers import IDLE
+
+# Prioritási osztályok csökkenő sorrendben: előbbi osztály fájlhatáron megelőzi a későbbit
+PRIORITY_CLASSES = ('interactive', 'normal', 'bulk')
+DEFAULT_PRIORITY = 'normal'
+# Osztályonként ennyi utolsó várakozási időből számol percentilist
+WAIT_WINDOW = 1000
+# Jobonként legfeljebb ennyi (legutóbbi) tömör eredmény marad a memóriában
+MAX_JOB_RESULTS = 1000
+# A befejezett / törölt jobok ennyi ideig kérdezhetők le
+JOB_RETENTION_SEC = 3600.0
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+# Kliens --wait lekérdezési periódus
+STATUS_POLL_SEC = 0.5
+
+
+def percentile(values, q):
+    """Egyszerű percentilis rendezett másolaton (None, ha nincs adat)"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Job:
+    """Egy beküldött fájllista és az állapota"""
+    __slots__ = ('id', 'submitter', 'priority', 'pending', 'total', 'in_flight', 'done', 'failed',
+                 'cancelled', 'submitted', 'first_started', 'finished', 'results')
+
+    def __init__(self, job_id, paths, submitter, priority):
+        self.id = job_id
+        self.submitter = submitter
+        self.priority = priority
+        self.pending = deque(paths)
+        self.total = len(self.pending)
+        self.in_flight = 0
+        self.done = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.submitted = time.time()
+        self.first_started = None
+        self.finished = None
+        self.results = deque(maxlen=MAX_JOB_RESULTS)
+
+    @property
+    def status(self):
+        if self.finished is None:
+            return 'running' if self.first_started is not None else 'queued'
+        return 'cancelled' if self.cancelled else 'done'
+
+    def summary(self, with_results=False):
+        """JSON-barát állapot"""
+        summary = {
+            'id': self.id, 'submitter': self.submitter, 'priority': self.priority, 'status': self.status,
+            'total': self.total, 'pending': len(self.pending), 'in_flight': self.in_flight,
+            'done': self.done, 'failed': self.failed, 'cancelled': self.cancelled,
+            'wait_sec': round((self.first_started or self.finished or time.time()) - self.submitted, 3),
+            'elapsed_sec': round((self.finished or time.time()) - self.submitted, 3),
+        }
+        if with_results:
+            summary['results'] = list(self.results)
+        return summary
+
+
+class _Wakeup:
+    """Önjelző pipe: új munka esetén felébreszti a PreforkPool.imap várakozását"""
+    def __init__(self):
+        self._read, self._write = os.pipe()
+        os.set_blocking(self._read, False)
+        os.set_blocking(self._write, False)
+
+    def fileno(self):
+        return self._read
+
+    def notify(self):
+        try:
+            os.write(self._write, b'x')
+        except BlockingIOError:
+            # Tele a pipe: már úgyis van függő jelzés
+            pass
+
+    def drain(self):
+        try:
+            while os.read(self._read, 4096):
+                pass
+        except BlockingIOError:
+            pass
+
+    def close(self):
+        os.close(self._read)
+        os.close(self._write)
+
+
+class JobScheduler:
+    """
+    Szálbiztos job sor: submit() / cancel() bármely szálból, a kiadás (next_path / feed)
+    és a nyugtázás (complete) a feldolgozó szálból
+    """
+    def __init__(self):
+        self._lock = threading.Condition()
+        self._ids = itertools.count(1)
+        self._jobs = OrderedDict()
+        # osztály -> beküldő -> a beküldő jobjai érkezési sorrendben
+        self._queues = dict((priority, OrderedDict()) for priority in PRIORITY_CLASSES)
+        # (osztály, beküldő) -> kiosztott fájlok (fair share számláló)
+        self._served = {}
+        # útvonal -> a rá várakozó jobok (ugyanaz a fájl több jobban is lehet)
+        self._in_flight = {}
+        self._waits = dict((priority, deque(maxlen=WAIT_WINDOW)) for priority in PRIORITY_CLASSES)
+        self.dispatched = dict((priority, 0) for priority in PRIORITY_CLASSES)
+        # Alacsonyabb osztály várakozó munkája elé kiadott fájlok (fájlhatáron történő megelőzés)
+        self.preempted = 0
+        self.closed = False
+        self.wakeup = _Wakeup()
+
+    def submit(self, paths, submitter='default', priority=DEFAULT_PRIORITY):
+        """Új job felvétele, visszatér: Job"""
+        if priority not in PRIORITY_CLASSES:
+            raise ValueError(f"Ismeretlen prioritás: {priority} ({', '.join(PRIORITY_CLASSES)})")
+        paths = [os.fspath(path) for path in paths]
+        if not paths:
+            raise ValueError("Üres job: nincs fájl")
+        with self._lock:
+            if self.closed:
+                raise RuntimeError("Az ütemező le van zárva")
+            self._prune()
+            job = Job(next(self._ids), paths, submitter, priority)
+            self._jobs[job.id] = job
+            queue = self._queues[priority]
+            if submitter not in queue:
+                # Újonnan (vagy újra) aktív beküldő: a többiek szintjéről indul, nem hozhat be "hitelt"
+                active = [self._served.get((priority, other), 0) for other in queue]
+                self._served[(priority, submitter)] = min(active) if active else 0
+                queue[submitter] = deque()
+            queue[submitter].append(job)
+            self._lock.notify_all()
+        self.wakeup.notify()
+        return job
+
+    def cancel(self, job_id):
+        """Job törlése: a még ki nem adott fájlok kikerülnek, a futók befejeződnek; None, ha nincs ilyen job"""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            removed = len(job.pending)
+            job.cancelled += removed
+            job.pending.clear()
+            if job.finished is None and job.in_flight == 0:
+                job.finished = time.time()
+            self._discard(job)
+            return removed
+
+    def get(self, job_id):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return None if job is None else job.summary(with_results=True)
+
+    def jobs(self):
+        with self._lock:
+            return [job.summary() for job in self._jobs.values()]
+
+    def close(self):
+        """Nincs több beküldés; a feed a sor kiürülése után véget ér"""
+        with self._lock:
+            self.closed = True
+            self._lock.notify_all()
+        self.wakeup.notify()
+
+    def _discard(self, job):
+        """Kiürült job eltávolítása a beküldő sorából"""
+        queue = self._queues[job.priority]
+        jobs = queue.get(job.submitter)
+        if jobs is not None and job in jobs:
+            jobs.remove(job)
+            if not jobs:
+                del queue[job.submitter]
+
+    def _prune(self):
+        """Régen lezárult jobok elfelejtése"""
+        limit = time.time() - JOB_RETENTION_SEC
+        for job_id in [job_id for job_id, job in self._jobs.items()
+                       if job.finished is not None and job.finished < limit]:
+            del self._jobs[job_id]
+
+    def _pick(self):
+        """Következő fájl: legmagasabb nem üres osztály, azon belül a legkevésbé kiszolgált beküldő"""
+        for level, priority in enumerate(PRIORITY_CLASSES):
+            queue = self._queues[priority]
+            if not queue:
+                continue
+            submitter = min(queue, key=lambda name: self._served[(priority, name)])
+            job = queue[submitter][0]
+            path = job.pending.popleft()
+            if not job.pending:
+                self._discard(job)
+            self._served[(priority, submitter)] += 1
+
+            now = time.time()
+            if job.first_started is None:
+                job.first_started = now
+            job.in_flight += 1
+            self._in_flight.setdefault(path, deque()).append(job)
+            self._waits[priority].append(now - job.submitted)
+            self.dispatched[priority] += 1
+            if any(self._queues[lower] for lower in PRIORITY_CLASSES[level + 1:]):
+                self.preempted += 1
+            return path
+        return None
+
+    def next_path(self, block=True, timeout=None):
+        """Következő kiadandó fájl; None, ha nincs (block: megvárja vagy a lezárást)"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._lock:
+            while True:
+                path = self._pick()
+                if path is not None or not block or self.closed:
+                    return path
+                remaining = None if deadline is None else deadline - time.time()
+                if remaining is not None and remaining <= 0:
+                    return None
+                self._lock.wait(remaining)
+
+    def feed(self, block=False):
+        """
+        Iterálható forrás a process_batch / PreforkPool.imap számára, minden fájlhatáron újra dönt
+        block=False: üres sornál IDLE (a pool közben gyűjti az eredményeket), lezárás + üres sor után vége
+        """
+        while True:
+            # Blokkoló módban is periodikusan visszatér, így a Ctrl+C nem ragad be
+            path = self.next_path(block=block, timeout=1.0 if block else None)
+            if path is not None:
+                yield path
+                continue
+            with self._lock:
+                if self.closed and not any(self._queues.values()):
+                    return
+            if not block:
+                yield IDLE
+
+    def complete(self, path, error=None, row=None, elapsed=0.0):
+        """Kiadott fájl nyugtázása; visszatér: a fájlt kérő Job (vagy None)"""
+        with self._lock:
+            waiting = self._in_flight.get(path)
+            if not waiting:
+                return None
+            job = waiting.popleft()
+            if not waiting:
+                del self._in_flight[path]
+            job.in_flight -= 1
+            if error is None:
+                job.done += 1
+            else:
+                job.failed += 1
+            entry = {'path': path, 'elapsed_sec': round(elapsed, 3)}
+            if error is not None:
+                entry['error'] = error
+            elif row is not None:
+                entry.update((key, row[key]) for key in ('BPM', 'Genre_1', 'Conf_1', 'Parent_Genre', 'Parent_Conf')
+                             if key in row)
+            job.results.append(entry)
+            if not job.pending and job.in_flight == 0:
+                job.finished = time.time()
+            return job
+
+    def metrics(self):
+        """Sor mélység osztályonként és beküldőnként, várakozási idő (p50 / p95 / max), futó fájlok"""
+        with self._lock:
+            classes = {}
+            for priority in PRIORITY_CLASSES:
+                queue = self._queues[priority]
+                waits = list(self._waits[priority])
+                p50, p95 = percentile(waits, 0.5), percentile(waits, 0.95)
+                classes[priority] = {
+                    'queued_files': sum(len(job.pending) for jobs in queue.values() for job in jobs),
+                    'queued_jobs': sum(len(jobs) for jobs in queue.values()),
+                    'by_submitter': dict((name, sum(len(job.pending) for job in jobs))
+                                         for name, jobs in queue.items()),
+                    'dispatched': self.dispatched[priority],
+                    'wait_p50_sec': None if p50 is None else round(p50, 3),
+                    'wait_p95_sec': None if p95 is None else round(p95, 3),
+                    'wait_max_sec': round(max(waits), 3) if waits else None,
+                }
+            statuses = {}
+            for job in self._jobs.values():
+                statuses[job.status] = statuses.get(job.status, 0) + 1
+            return {'classes': classes, 'in_flight': sum(len(jobs) for jobs in self._in_flight.values()),
+                    'jobs': statuses, 'preempted': self.preempted, 'closed': self.closed}
+
+
+def _make_handler(scheduler):
+    """HTTP végpontok: POST /jobs, GET /jobs, GET|DELETE /jobs/<id>, GET /metrics"""
+    from http.server import BaseHTTPRequestHandler
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status, body):
+            data = json.dumps(body, ensure_ascii=False).encode('utf-8')
+            self.send_response(status)
+            self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _job_id(self):
+            try:
+                return int(self.path.rstrip('/').rsplit('/', 1)[1])
+            except ValueError:
+                return None
+
+        def do_GET(self):
+            if self.path == '/metrics':
+                return self._send(200, scheduler.metrics())
+            if self.path.rstrip('/') == '/jobs':
+                return self._send(200, scheduler.jobs())
+            if self.path.startswith('/jobs/'):
+                job = scheduler.get(self._job_id())
+                return self._send(200, job) if job is not None else self._send(404, {'error': "Nincs ilyen job"})
+            self._send(404, {'error': "Ismeretlen végpont"})
+
+        def do_POST(self):
+            if self.path.rstrip('/') != '/jobs':
+                return self._send(404, {'error': "Ismeretlen végpont"})
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b'{}')
+                job = scheduler.submit(body.get('paths') or (), body.get('submitter') or 'default',
+                                       body.get('priority') or DEFAULT_PRIORITY)
+            except (ValueError, RuntimeError) as e:
+                return self._send(400, {'error': str(e)})
+            self._send(201, job.summary())
+
+        def do_DELETE(self):
+            if not self.path.startswith('/jobs/'):
+                return self._send(404, {'error': "Ismeretlen végpont"})
+            removed = scheduler.cancel(self._job_id())
+            if removed is None:
+                return self._send(404, {'error': "Nincs ilyen job"})
+            self._send(200, {'cancelled': removed})
+
+        def log_message(self, *args):
+            # A kérésnaplók nem keverednek a feldolgozási kiírásokkal
+            pass
+
+    return Handler
+
+
+def serve(args):
+    """Ütemező + HTTP végpont + feldolgozó hurok (soros vagy fork-olt workerekkel)"""
+    from http.server import ThreadingHTTPServer
+    from music_analyzer.mel_patches import PatchCache
+    from music_analyzer import MusicGenreClassifier
+    from music_analyzer.batch import result_row
+    from music_analyzer.prefork_workers import PreforkPool
+    from music_analyzer.result_store import ResultStore
+
+    classifier = MusicGenreClassifier(pooling=args.pooling, tempo=not args.no_bpm,
+                                      patch_cache=PatchCache(args.patch_cache) if args.patch_cache else None)
+    if not classifier.download_models():
+        print(f"❌ {classifier.load_error}")
+        return 1
+    pool = None
+    if args.workers > 1:
+        pool = PreforkPool(classifier, args.workers)
+        if not pool.start():
+            print("❌ Worker pool indítása sikertelen!")
+            return 1
+    elif not classifier.load_model():
+        print("❌ Modell betöltés sikertelen!")
+        return 1
+
+    scheduler = JobScheduler()
+    server = ThreadingHTTPServer((args.host, args.port), _make_handler(scheduler))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"🗂️  Job ütemező: http://{args.host}:{args.port} "
+          f"(osztályok: {' > '.join(PRIORITY_CLASSES)}, {args.workers} worker)")
+
+    store = ResultStore(args.db, classifier.labels) if args.db else None
+    if pool is not None:
+        analyzed = pool.imap(scheduler.feed(), wakeup=scheduler.wakeup)
+    else:
+        def analyze_serial():
+            for path in scheduler.feed(block=True):
+                start = time.time()
+                result = classifier.analyze_audio(path)
+                yield path, result, time.time() - start
+        analyzed = analyze_serial()
+
+    try:
+        for path, result, elapsed in analyzed:
+            error = None if result['success'] else result['error']
+            row = result_row(classifier, os.path.basename(path), result, elapsed) if error is None else None
+            job = scheduler.complete(path, error, row, elapsed)
+            if store is not None:
+                if error is None:
+                    store.add_result(path, row)
+                else:
+                    store.add_error(path, error)
+            label = f"#{job.id} {job.priority}/{job.submitter}" if job is not None else "?"
+            if error is None:
+                print(f"✅ [{label}] {path}: {row['Genre_1']} ({row['Conf_1']:.1%}), {elapsed:.1f}s")
+            else:
+                print(f"❌ [{label}] {path}: {error}")
+            if job is not None and job.finished is not None:
+                print(f"🏁 Job #{job.id} kész: {job.done} sikeres, {job.failed} hibás, {job.cancelled} törölve, "
+                      f"{job.finished - job.submitted:.1f}s")
+                if store is not None:
+                    store.flush()
+    except KeyboardInterrupt:
+        print("\n⚠️ Ütemező leállítva")
+    finally:
+        scheduler.close()
+        server.shutdown()
+        if pool is not None:
+            pool.shutdown()
+        if store is not None:
+            store.close()
+        print_metrics(scheduler.metrics())
+    return 0
+
+
+def print_metrics(metrics):
+    """Sor mélység és várakozási idők táblázata"""
+    def sec(value):
+        return f"{value:8.2f}" if value is not None else "       -"
+
+    print(f"\n📊 {'Osztály':<12} {'Sorban':>8} {'Jobok':>6} {'Kiadva':>8} {'p50 (s)':>8} {'p95 (s)':>8} {'max (s)':>8}")
+    print("-" * 66)
+    for priority, stats in metrics['classes'].items():
+        print(f"   {priority:<12} {stats['queued_files']:>8} {stats['queued_jobs']:>6} {stats['dispatched']:>8} "
+              f"{sec(stats['wait_p50_sec'])} {sec(stats['wait_p95_sec'])} {sec(stats['wait_max_sec'])}")
+        for submitter, depth in stats['by_submitter'].items():
+            print(f"      - {submitter}: {depth} fájl")
+    print(f"⚙️  Futó fájlok: {metrics['in_flight']}, megelőzések: {metrics['preempted']}, jobok: "
+          + (", ".join(f"{status}: {count}" for status, count in metrics['jobs'].items()) or "-"))
+
+
+def _request(url, method='GET', body=None):
+    """JSON kérés az ütemező HTTP végpontjára"""
+    from urllib.request import Request, urlopen
+    from urllib.error import HTTPError
+    data = json.dumps(body).encode('utf-8') if body is not None else None
+    request = Request(url, data=data, method=method, headers={'Content-Type': 'application/json'})
+    try:
+        with urlopen(request) as response:
+            return json.loads(response.read())
+    except HTTPError as e:
+        raise RuntimeError(json.loads(e.read()).get('error', str(e)))
+
+
+def main(argv=None):
+    """Job ütemező parancssor"""
+    parser = argparse.ArgumentParser(description="Prioritásos job ütemező (interaktív + tömeges terhelés)")
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f"HTTP cím (alap: {DEFAULT_HOST})")
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f"HTTP port (alap: {DEFAULT_PORT})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    serve_cmd = commands.add_parser('serve', help="Ütemező és feldolgozás indítása")
+    serve_cmd.add_argument('--workers', type=int, default=1, help="Fork-olt workerek száma (alap: 1)")
+    serve_cmd.add_argument('--pooling', choices=POOLING_METHODS, default=DEFAULT_POOLING,
+                           help=f"Aktivációk összesítése (alap: {DEFAULT_POOLING})")
+    serve_cmd.add_argument('--no-bpm', action='store_true', help="BPM számítás kihagyása")
+    serve_cmd.add_argument('--patch-cache', metavar='DIR', help="Mel patch gyorsítótár könyvtár")
+    serve_cmd.add_argument('--db', metavar='PATH', help="SQLite eredménytár")
+
+    submit_cmd = commands.add_parser('submit', help="Job beküldése")
+    submit_cmd.add_argument('paths', nargs='*', help="Audio fájlok")
+    submit_cmd.add_argument('--audio-dir', help=f"Zenei könyvtár (rekurzív, pl. {DEFAULT_AUDIO_DIR})")
+    submit_cmd.add_argument('--file-list', metavar='PATH', help="Útvonalak fájlból ('-' = stdin)")
+    submit_cmd.add_argument('--priority', choices=PRIORITY_CLASSES, default=DEFAULT_PRIORITY,
+                            help=f"Prioritási osztály (alap: {DEFAULT_PRIORITY})")
+    submit_cmd.add_argument('--submitter', default=os.environ.get('USER', 'default'),
+                            help="Beküldő neve (fair share egysége)")
+    submit_cmd.add_argument('--wait', action='store_true', help="Megvárja a job végét és kiírja az eredményt")
+
+    cancel_cmd = commands.add_parser('cancel', help="Job törlése")
+    cancel_cmd.add_argument('job_id', type=int)
+    status_cmd = commands.add_parser('status', help="Jobok (vagy egy job) állapota")
+    status_cmd.add_argument('job_id', type=int, nargs='?')
+    commands.add_parser('metrics', help="Sor mélység és várakozási idők")
+    args = parser.parse_args(argv)
+
+    if args.command == 'serve':
+        return serve(args)
+
+    url = f"http://{args.host}:{args.port}"
+    try:
+        if args.command == 'submit':
+            paths = [os.path.abspath(path) for path in args.paths]
+            if args.audio_dir or args.file_list:
+                base_dir = '' if args.file_list is not None else args.audio_dir
+                paths += [os.path.abspath(os.path.join(base_dir, path))
+                          for path, _ in discover(args.audio_dir or DEFAULT_AUDIO_DIR, args.file_list)]
+            job = _request(f"{url}/jobs", 'POST',
+                           {'paths': paths, 'submitter': args.submitter, 'priority': args.priority})
+            print(f"📥 Job #{job['id']}: {job['total']} fájl ({job['priority']}, {job['submitter']})")
+            if args.wait:
+                while job['status'] in ('queued', 'running'):
+                    time.sleep(STATUS_POLL_SEC)
+                    job = _request(f"{url}/jobs/{job['id']}")
+                print(f"🏁 {job['status']}: várakozás {job['wait_sec']:.2f}s, teljes {job['elapsed_sec']:.2f}s")
+                for entry in job['results']:
+                    if 'error' in entry:
+                        print(f"  ❌ {entry['path']}: {entry['error']}")
+                    else:
+                        print(f"  ✅ {entry['path']}: {entry.get('Genre_1')} ({entry.get('Conf_1', 0):.1%}), "
+                              f"BPM: {entry.get('BPM')}")
+
+        elif args.command == 'cancel':
+            removed = _request(f"{url}/jobs/{args.job_id}", 'DELETE')['cancelled']
+            print(f"🛑 Job #{args.job_id} törölve ({removed} fájl kivéve a sorból)")
+
+        elif args.command == 'status':
+            jobs = [_request(f"{url}/jobs/{args.job_id}")] if args.job_id else _request(f"{url}/jobs")
+            for job in jobs:
+                print(f"#{job['id']} {job['priority']}/{job['submitter']}: {job['status']}, "
+                      f"{job['done'] + job['failed']}/{job['total']} kész, {job['pending']} sorban, "
+                      f"várakozás {job['wait_sec']:.1f}s")
+
+        elif args.command == 'metrics':
+            print_metrics(_request(f"{url}/metrics"))
+    except (OSError, RuntimeError) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+NDJSON (JSON Lines) kimenet pipeline-okhoz: fájlonként egy tömör JSON sor a stdout-ra,
+amint a fájl elkészült (a hibák is); minden emberi kiírás a stderr-re kerül
+
+  find /mnt/zene -name '*.mp3' | python3 linux_essentia_speed.py --stdin --jsonl | jq .Genre_1
+"""
+import os
+import sys
+import json
+from contextlib import contextmanager, redirect_stdout
+
+
+def _json_default(value):
+    """numpy skalárok / tömbök JSON-ná"""
+    if hasattr(value, 'tolist'):
+        return value.tolist()
+    return str(value)
+
+
+class JsonlWriter:
+    """
+    Soronként egy eredmény, azonnali flush-sel; a sorok ugyanazokat a kulcsokat
+    használják, mint a CSV (fajl, BPM, Genre_1..5, Conf_1..5 ...) + path és ok
+    """
+    def __init__(self, stream):
+        self.stream = stream
+        self.written = 0
+        self.errors = 0
+        self.closed = False
+
+    def _write(self, record):
+        if self.closed:
+            return
+        try:
+            self.stream.write(json.dumps(record, ensure_ascii=False, separators=(',', ':'),
+                                         default=_json_default) + "\n")
+            self.stream.flush()
+        except BrokenPipeError:
+            # A fogyasztó lezárta a pipe-ot (pl. | head): a kilépéskori flush se dobjon hibát
+            self.closed = True
+            os.dup2(os.open(os.devnull, os.O_WRONLY), self.stream.fileno())
+            raise
+        self.written += 1
+
+    def add(self, path, row):
+        """Sikeres eredmény (CSV-stílusú sor)"""
+        record = {'path': path, 'ok': True}
+        record.update(row)
+        if isinstance(record.get('Genre_ids'), str):
+            # A CSV szöveges id listája NDJSON-ban egész szám tömb
+            record['Genre_ids'] = [int(i) for i in record['Genre_ids'].split()]
+        self._write(record)
+
+    def add_error(self, path, error, filename=None):
+        """Hibás fájl (a hibák CSV-jével azonos fajl / hiba kulcsokkal)"""
+        self.errors += 1
+        self._write({'path': path, 'ok': False, 'fajl': filename or os.path.basename(path), 'hiba': error})
+
+
+@contextmanager
+def human_output(jsonl):
+    """
+    jsonl=True: JsonlWriter az eredeti stdout-ra, a blokkon belül minden print a stderr-re megy
+    jsonl=False: None, a kimenet változatlan
+    """
+    if not jsonl:
+        yield None
+        return
+    writer = JsonlWriter(sys.stdout)
+    with redirect_stdout(sys.stderr):
+        yield writer
@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Különválasztott mel front end + patch gyorsítótár a Discogs EffNethez
+Parancssori belépési pont; a modul: music_analyzer.mel_patches (python3 -m music_analyzer.mel_patches is ugyanez)
+"""
+import sys
+
+from music_analyzer.mel_patches import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,32 @@
+"""
+Essentia zene műfaj elemző könyvtárként: analyze_many() lusta generátor, Result,
+valamint a scriptek közös MusicGenreClassifier osztálya
+A segédmodulok (dekóderek, eredménytár, munkasor, worker pool ...) is a csomagban vannak,
+relatív importokkal; a csomag a repo gyökere nélkül is használható
+
+A nyilvános nevek első hozzáféréskor töltődnek be: a könnyű almodulok (pl. result_store,
+audio_probe) importja nem húzza be az osztályozót és a numpy-t
+"""
+import importlib
+
+_EXPORTS = {
+    'analyze_many': 'api',
+    'Result': 'api',
+    'MusicGenreClassifier': 'classifier',
+    'MODELS_DIR': 'classifier',
+    'essentia_version': 'classifier',
+}
+
+__all__ = ['analyze_many', 'Result', 'MusicGenreClassifier', 'MODELS_DIR', 'essentia_version']
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module('.' + _EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
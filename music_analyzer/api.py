@@ -0,0 +1,108 @@
+"""
+Beágyazható Python API: analyze_many(paths) lustán, a befejezés sorrendjében adja az eredményeket
+
+    from music_analyzer import analyze_many
+    for result in analyze_many(paths, workers=4, tempo=False):
+        print(result.path, result.genre, result.confidence)
+
+Nincs kiírás, CSV és rögzített könyvtár; a modell az első eredmény kérésekor töltődik be,
+egyszerre legfeljebb `workers` fájl van folyamatban (korlátos memória)
+"""
+import os
+import time
+
+from .genre_pooling import DEFAULT_POOLING
+from .prefork_workers import PreforkPool
+from .classifier import MODELS_DIR, MusicGenreClassifier
+
+
+class Result:
+    """Egy fájl elemzési eredménye (hiba esetén ok=False és error)"""
+    __slots__ = ('path', 'ok', 'error', 'bpm', 'audio_length', 'genres', 'genre_ids', 'scores',
+                 'parent', 'parent_scores', 'trimmed', 'descriptors', 'heads', 'stages', 'elapsed')
+
+    def __init__(self, path, ok, error=None, bpm=None, audio_length=None, genres=(), genre_ids=(), scores=None,
+                 parent=None, parent_scores=None, trimmed=0.0, descriptors=None, heads=None, stages=None,
+                 elapsed=0.0):
+        self.path = path
+        self.ok = ok
+        self.error = error
+        self.bpm = bpm
+        self.audio_length = audio_length
+        self.genres = genres
+        # A top műfajok osztály indexei (a scores / címkefájl indexei)
+        self.genre_ids = genre_ids
+        self.scores = scores
+        # Legerősebb fő műfaj (név, részesedés) + részesedések a GenreHierarchy.parents sorrendjében
+        self.parent = parent
+        self.parent_scores = parent_scores
+        self.trimmed = trimmed
+        self.descriptors = descriptors or {}
+        self.heads = heads or {}
+        # Szakaszonkénti idő (decode, trim, bpm, descriptors, resample, predict, pooling)
+        self.stages = stages or {}
+        self.elapsed = elapsed
+
+    @classmethod
+    def from_analysis(cls, path, result, elapsed):
+        """Az analyze_audio() szótárából"""
+        if not result['success']:
+            return cls(path, False, error=result['error'], elapsed=elapsed)
+        return cls(path, True, bpm=result['bpm'], audio_length=result['audio_length'],
+                   genres=[(genre.replace('---', ' / '), float(conf)) for genre, conf in result['genres']],
+                   genre_ids=result['genre_ids'], scores=result['scores'], parent=result['parent'],
+                   parent_scores=result['parent_scores'], trimmed=result['trimmed'],
+                   descriptors=result['descriptors'], heads=result['heads'],
+                   stages=result.get('stages'), elapsed=elapsed)
+
+    @property
+    def genre(self):
+        """Legvalószínűbb műfaj (None, ha hibás)"""
+        return self.genres[0][0] if self.genres else None
+
+    @property
+    def confidence(self):
+        return self.genres[0][1] if self.genres else None
+
+    def __repr__(self):
+        if not self.ok:
+            return f"Result({self.path!r}, error={self.error!r})"
+        return f"Result({self.path!r}, genre={self.genre!r}, confidence={self.confidence:.3f}, bpm={self.bpm})"
+
+
+def analyze_many(paths, *, workers=1, tempo=True, pooling=DEFAULT_POOLING, models_dir=MODELS_DIR,
+                 classifier=None, verbose=False, **options):
+    """
+    Fájlok elemzése, Result objektumok a befejezés sorrendjében (generátor)
+
+    paths: tetszőleges (akár végtelen) iterálható útvonal; csak a szabad workerek
+    számára olvasunk belőle előre. workers > 1: fork-olt, felügyelt worker pool
+    közös, bemelegített modellel. options: a MusicGenreClassifier további
+    paraméterei (trim, descriptors, heads, decoder, resample)
+
+    A modell betöltése az első next() híváskor történik; betöltési hibánál RuntimeError
+    """
+    if classifier is None:
+        classifier = MusicGenreClassifier(models_dir=models_dir, pooling=pooling, tempo=tempo,
+                                          verbose=verbose, **options)
+    paths = (os.fspath(path) for path in paths)
+
+    if workers <= 1:
+        if not classifier.prepare():
+            raise RuntimeError(classifier.load_error)
+        for path in paths:
+            start = time.time()
+            result = classifier.analyze_audio(path)
+            yield Result.from_analysis(path, result, time.time() - start)
+        return
+
+    if not classifier.download_models():
+        raise RuntimeError(classifier.load_error)
+    pool = PreforkPool(classifier, workers, verbose=verbose)
+    if not pool.start():
+        raise RuntimeError(classifier.load_error)
+    try:
+        for path, result, elapsed in pool.imap(paths):
+            yield Result.from_analysis(path, result, elapsed)
+    finally:
+        pool.shutdown()
@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Cserélhető dekóder backendek: Essentia MonoLoader (alap) és ffmpeg alfolyamat-pool
+Mindkettő mono float32 jelet ad a kért mintavételi frekvencián, így ugyanaz az
+elemző kód fut rajtuk; a backend formátumonként benchmark eredmény alapján választható
+
+Használat:
+  python3 audio_decoders.py --audio-dir audio_mp3 benchmark
+  python3 audio_decoders.py show
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import importlib.util
+import argparse
+import threading
+import subprocess
+
+import numpy as np
+
+from .library_discovery import DEFAULT_AUDIO_DIR, SUPPORTED_FORMATS, discover
+
+DECODER_CHOICES = ('auto', 'monoloader', 'ffmpeg')
+DEFAULT_DECODER = 'auto'
+DEFAULT_BENCHMARK_PATH = "decoder_benchmark.json"
+# Egyszerre futó ffmpeg folyamatok felső korlátja
+FFMPEG_MAX_PROCS = max(2, (os.cpu_count() or 2) // 2)
+# Benchmark: formátumonként ennyi mintafájl
+BENCHMARK_FILES_PER_FORMAT = 3
+BENCHMARK_SAMPLE_RATE = 44100
+
+
+class DecodeError(RuntimeError):
+    """Dekódolási hiba (a backend nevével)"""
+
+
+class MonoLoaderDecoder:
+    """Essentia MonoLoader (a korábbi egyetlen dekóder)"""
+    name = 'monoloader'
+
+    def available(self):
+        # Csak keresés: az essentia.standard import (TensorFlow-val) az első dekódolásig vár
+        return importlib.util.find_spec('essentia') is not None
+
+    def decode(self, path, sample_rate):
+        """Mono float32 jel a kért frekvencián"""
+        import essentia.standard as es
+        return es.MonoLoader(filename=path, sampleRate=sample_rate)()
+
+    def decode_rates(self, path, sample_rates):
+        """Több frekvencián (sorban)"""
+        return [self.decode(path, rate) for rate in sample_rates]
+
+
+class FFmpegDecoder:
+    """
+    ffmpeg alfolyamatok: nyers f32le PCM a stdout-on, a keverés mono-ra (-ac 1) és
+    az újramintavételezés (-ar) az ffmpeg-ben történik; a párhuzamos folyamatok
+    száma korlátos (pool), több frekvencia egyszerre, külön folyamatokban
+    """
+    name = 'ffmpeg'
+
+    def __init__(self, binary=None, max_procs=FFMPEG_MAX_PROCS):
+        self.binary = binary or shutil.which('ffmpeg')
+        self._slots = threading.BoundedSemaphore(max_procs)
+
+    def available(self):
+        return self.binary is not None
+
+    def _command(self, path, sample_rate):
+        return [self.binary, '-nostdin', '-hide_banner', '-loglevel', 'error', '-i', path,
+                '-vn', '-f', 'f32le', '-acodec', 'pcm_f32le', '-ac', '1', '-ar', str(sample_rate), 'pipe:1']
+
+    def _spawn(self, path, sample_rate):
+        self._slots.acquire()
+        try:
+            return subprocess.Popen(self._command(path, sample_rate), stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        except OSError:
+            self._slots.release()
+            raise
+
+    def _collect(self, process, path):
+        try:
+            pcm, stderr = process.communicate()
+        finally:
+            self._slots.release()
+        if process.returncode != 0:
+            message = stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise DecodeError(f"ffmpeg hiba ({os.path.basename(path)}): {message[-1] if message else process.returncode}")
+        # Írható tömb, ugyanúgy, mint a MonoLoader kimenete
+        return np.frombuffer(pcm, dtype=np.float32).copy()
+
+    def decode(self, path, sample_rate):
+        """Mono float32 jel a kért frekvencián"""
+        if self.binary is None:
+            raise DecodeError("ffmpeg nem található")
+        return self._collect(self._spawn(path, sample_rate), path)
+
+    def decode_rates(self, path, sample_rates):
+        """Több frekvencia párhuzamosan (frekvenciánként egy folyamat)"""
+        if self.binary is None:
+            raise DecodeError("ffmpeg nem található")
+        processes = [self._spawn(path, rate) for rate in sample_rates]
+        return [self._collect(process, path) for process in processes]
+
+
+BACKENDS = {
+    'monoloader': MonoLoaderDecoder,
+    'ffmpeg': FFmpegDecoder,
+}
+
+
+def load_benchmark(path=DEFAULT_BENCHMARK_PATH):
+    """Benchmark eredmény: {kiterjesztés: {'backend': név, ...}} (hiányzó fájl: üres)"""
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('formats', {})
+
+
+class AudioDecoder:
+    """
+    Formátumonként választott backend ('auto': benchmark alapján, különben MonoLoader)
+    Sikertelen dekódolásnál a másik elérhető backenddel újrapróbálja
+    """
+    def __init__(self, choice=DEFAULT_DECODER, benchmark_path=DEFAULT_BENCHMARK_PATH):
+        if choice not in DECODER_CHOICES:
+            raise ValueError(f"Ismeretlen dekóder: {choice}")
+        self.backends = dict((name, cls()) for name, cls in BACKENDS.items())
+        self.backends = dict((name, b) for name, b in self.backends.items() if b.available())
+        if not self.backends:
+            raise RuntimeError("Nincs elérhető dekóder (essentia vagy ffmpeg kell)")
+
+        if choice == 'auto':
+            self.default = 'monoloader' if 'monoloader' in self.backends else next(iter(self.backends))
+        else:
+            self.default = choice
+        if self.default not in self.backends:
+            raise RuntimeError(f"A választott dekóder nem elérhető: {self.default}")
+
+        self.by_format = {}
+        if choice == 'auto':
+            for ext, entry in load_benchmark(benchmark_path).items():
+                if entry.get('backend') in self.backends:
+                    self.by_format[ext] = entry['backend']
+
+    def backend_for(self, path):
+        """A fájl formátumához választott backend"""
+        name = self.by_format.get(os.path.splitext(path)[1].lower(), self.default)
+        return self.backends[name]
+
+    def _with_fallback(self, path, method, *args):
+        backend = self.backend_for(path)
+        try:
+            return getattr(backend, method)(path, *args)
+        except Exception as first_error:
+            for other in self.backends.values():
+                if other is backend:
+                    continue
+                try:
+                    return getattr(other, method)(path, *args)
+                except Exception:
+                    pass
+            raise first_error
+
+    def decode(self, path, sample_rate):
+        """Mono float32 jel a kért frekvencián"""
+        return self._with_fallback(path, 'decode', sample_rate)
+
+    def decode_rates(self, path, sample_rates):
+        """Ugyanaz a fájl több frekvencián (ffmpeg-nél párhuzamosan)"""
+        return self._with_fallback(path, 'decode_rates', sample_rates)
+
+    def describe(self):
+        """Rövid leírás a fejléchez"""
+        if not self.by_format:
+            return self.default
+        choices = ", ".join(f"{ext}: {name}" for ext, name in sorted(self.by_format.items()))
+        return f"{self.default} (benchmark szerint: {choices})"
+
+
+def run_benchmark(audio_dir, out_path, files_per_format=BENCHMARK_FILES_PER_FORMAT,
+                  sample_rate=BENCHMARK_SAMPLE_RATE):
+    """
+    Formátumonként néhány fájl dekódolása minden elérhető backenddel
+    Mérték: dekódolási idő / audio másodperc; a hibátlan backendek közül a leggyorsabb nyer
+    """
+    backends = [cls() for cls in BACKENDS.values()]
+    backends = [b for b in backends if b.available()]
+    samples = {}
+    for path, _ in discover(audio_dir):
+        ext = os.path.splitext(path)[1].lower()
+        if len(samples.setdefault(ext, [])) < files_per_format:
+            samples[ext].append(os.path.join(audio_dir, path))
+
+    formats = {}
+    for ext in SUPPORTED_FORMATS:
+        if not samples.get(ext):
+            continue
+        results = {}
+        for backend in backends:
+            elapsed = audio_sec = 0.0
+            failures = 0
+            for path in samples[ext]:
+                start = time.perf_counter()
+                try:
+                    audio = backend.decode(path, sample_rate)
+                except Exception:
+                    failures += 1
+                    continue
+                elapsed += time.perf_counter() - start
+                audio_sec += len(audio) / float(sample_rate)
+            cost = elapsed / audio_sec if audio_sec > 0 else None
+            results[backend.name] = {'sec_per_audio_sec': cost, 'failures': failures, 'files': len(samples[ext])}
+            print(f"  {ext:6} {backend.name:11} "
+                  + (f"{1.0 / cost:8.0f}x realtime" if cost else "       -        ")
+                  + (f"  ❌ {failures} hiba" if failures else ""))
+
+        usable = [(r['sec_per_audio_sec'], name) for name, r in results.items()
+                  if r['failures'] == 0 and r['sec_per_audio_sec'] is not None]
+        formats[ext] = {'backend': min(usable)[1] if usable else None, 'results': results}
+
+    with open(out_path, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'sample_rate': sample_rate,
+                   'formats': formats}, f, indent=2)
+    return formats
+
+
+def main(argv=None):
+    """Dekóder benchmark parancssor"""
+    parser = argparse.ArgumentParser(description="Dekóder backendek összehasonlítása formátumonként")
+    parser.add_argument('--audio-dir', default=DEFAULT_AUDIO_DIR, help="Mintafájlok könyvtára")
+    parser.add_argument('--out', default=DEFAULT_BENCHMARK_PATH, help="Benchmark eredmény (JSON)")
+    commands = parser.add_subparsers(dest='command', required=True)
+    bench_cmd = commands.add_parser('benchmark', help="Backendek mérése és a választás mentése")
+    bench_cmd.add_argument('--files', type=int, default=BENCHMARK_FILES_PER_FORMAT, help="Fájl / formátum")
+    commands.add_parser('show', help="Mentett választás megjelenítése")
+    args = parser.parse_args(argv)
+
+    if args.command == 'benchmark':
+        print(f"⏱️  Dekóder benchmark: {args.audio_dir}")
+        formats = run_benchmark(args.audio_dir, args.out, args.files)
+        if not formats:
+            print("⚠️ Nincs mintafájl")
+            return 1
+        print(f"💾 Mentve: {args.out}")
+    else:
+        formats = load_benchmark(args.out)
+        if not formats:
+            print(f"⚠️ Nincs benchmark eredmény: {args.out}")
+            return 1
+
+    for ext, entry in sorted(formats.items()):
+        print(f"  {ext:6} -> {entry.get('backend') or '-'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Metaadat-only probe: hossz, mintavételi frekvencia, csatornák, bitráta dekódolás nélkül
+Fejléc olvasás (MP3 / WAV / FLAC / OGG / M4A), fallback: es.MetadataReader,
+végső esetben méret alapú becslés
+
+Használat:
+  python3 audio_probe.py --audio-dir /mnt/zene --min-duration 60
+"""
+import os
+import sys
+import struct
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+
+from .library_discovery import DEFAULT_AUDIO_DIR, discover
+from .scheduling import estimate_duration, plan_schedule
+from .benchmark_store import DEFAULT_HISTORY_PATH, calibrated_cost
+
+# Párhuzamos probe szálak (I/O kötött, hálózati meghajtón sokat számít)
+PROBE_THREADS = 16
+# MP3 frame sync keresési ablak az ID3 tag után
+MP3_SYNC_WINDOW = 64 * 1024
+# OGG: az utolsó lapot ennyi byte-on belül keressük a fájl végén
+OGG_TAIL = 64 * 1024
+
+_MP3_BITRATES = {
+    # (MPEG1?, layer) -> kbit/s táblázat
+    (True, 1): [0, 32, 64, 96, 128, 160, 192, 224, 256, 288, 320, 352, 384, 416, 448],
+    (True, 2): [0, 32, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320, 384],
+    (True, 3): [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    (False, 1): [0, 32, 48, 56, 64, 80, 96, 112, 128, 144, 160, 176, 192, 224, 256],
+    (False, 2): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+    (False, 3): [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_MP3_SAMPLE_RATES = [44100, 48000, 32000]
+
+
+class ProbeResult:
+    """Egy fájl probe eredménye (None = ismeretlen)"""
+    __slots__ = ('path', 'size', 'duration', 'sample_rate', 'channels', 'bitrate', 'method', 'error')
+
+    def __init__(self, path, size, duration=None, sample_rate=None, channels=None,
+                 bitrate=None, method=None, error=None):
+        self.path = path
+        self.size = size
+        self.duration = duration
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.bitrate = bitrate
+        self.method = method
+        self.error = error
+
+
+def _skip_id3v2(f):
+    """ID3v2 tag átugrása, visszatér: az audio adat kezdete"""
+    f.seek(0)
+    header = f.read(10)
+    if len(header) == 10 and header[:3] == b'ID3':
+        size = (header[6] << 21) | (header[7] << 14) | (header[8] << 7) | header[9]
+        footer = 10 if header[5] & 0x10 else 0
+        return 10 + size + footer
+    return 0
+
+
+def _probe_mp3(f, size):
+    """MPEG audio frame fejléc + Xing/Info/VBRI (VBR) vagy CBR számítás"""
+    start = _skip_id3v2(f)
+    f.seek(start)
+    window = f.read(MP3_SYNC_WINDOW)
+
+    for pos in range(len(window) - 4):
+        b0, b1, b2, b3 = window[pos:pos + 4]
+        if b0 != 0xFF or (b1 & 0xE0) != 0xE0:
+            continue
+        version = (b1 >> 3) & 3       # 0 = MPEG2.5, 2 = MPEG2, 3 = MPEG1
+        layer = 4 - ((b1 >> 1) & 3)   # 1, 2, 3
+        bitrate_index = b2 >> 4
+        rate_index = (b2 >> 2) & 3
+        if version == 1 or layer == 4 or bitrate_index in (0, 15) or rate_index == 3:
+            continue
+
+        mpeg1 = version == 3
+        bitrate = _MP3_BITRATES[(mpeg1, layer)][bitrate_index] * 1000
+        sample_rate = _MP3_SAMPLE_RATES[rate_index] >> {3: 0, 2: 1, 0: 2}[version]
+        channels = 1 if (b3 >> 6) == 3 else 2
+        samples_per_frame = 384 if layer == 1 else (1152 if mpeg1 or layer == 2 else 576)
+
+        # VBR fejléc az első frame-ben
+        side_info = (17 if channels == 1 else 32) if mpeg1 else (9 if channels == 1 else 17)
+        frames = None
+        xing = window[pos + 4 + side_info:pos + 4 + side_info + 12]
+        if xing[:4] in (b'Xing', b'Info'):
+            flags = struct.unpack('>I', xing[4:8])[0]
+            if flags & 1:
+                frames = struct.unpack('>I', xing[8:12])[0]
+        elif window[pos + 36:pos + 40] == b'VBRI':
+            frames = struct.unpack('>I', window[pos + 50:pos + 54])[0]
+
+        audio_bytes = size - start - pos
+        if frames:
+            duration = frames * samples_per_frame / sample_rate
+            bitrate = int(audio_bytes * 8 / duration) if duration > 0 else bitrate
+        else:
+            # CBR: az ID3v1 tag (128 byte a végén) nem audio
+            f.seek(max(0, size - 128))
+            if f.read(3) == b'TAG':
+                audio_bytes -= 128
+            duration = audio_bytes * 8.0 / bitrate
+        return ProbeResult(None, size, duration, sample_rate, channels, bitrate, 'header')
+
+    return None
+
+
+def _probe_wav(f, size):
+    """RIFF/WAVE: fmt és data chunk"""
+    f.seek(0)
+    header = f.read(12)
+    if len(header) < 12 or header[:4] != b'RIFF' or header[8:12] != b'WAVE':
+        return None
+
+    channels = sample_rate = byte_rate = None
+    while True:
+        chunk = f.read(8)
+        if len(chunk) < 8:
+            return None
+        chunk_id, chunk_size = chunk[:4], struct.unpack('<I', chunk[4:])[0]
+        if chunk_id == b'fmt ':
+            fmt = f.read(chunk_size)
+            _, channels, sample_rate, byte_rate = struct.unpack('<HHII', fmt[:12])
+            f.seek(chunk_size & 1, os.SEEK_CUR)
+        elif chunk_id == b'data':
+            if not byte_rate:
+                return None
+            # Streamelt WAV-nál a méret mező 0 vagy 0xFFFFFFFF
+            if chunk_size in (0, 0xFFFFFFFF):
+                chunk_size = size - f.tell()
+            return ProbeResult(None, size, chunk_size / byte_rate, sample_rate, channels,
+                               byte_rate * 8, 'header')
+        else:
+            f.seek(chunk_size + (chunk_size & 1), os.SEEK_CUR)
+
+
+def _probe_flac(f, size):
+    """FLAC STREAMINFO blokk"""
+    start = _skip_id3v2(f)
+    f.seek(start)
+    if f.read(4) != b'fLaC':
+        return None
+    block = f.read(4)
+    if len(block) < 4 or block[0] & 0x7F != 0:
+        return None
+    info = f.read(34)
+    if len(info) < 34:
+        return None
+    packed = int.from_bytes(info[10:18], 'big')
+    sample_rate = packed >> 44
+    channels = ((packed >> 41) & 0x7) + 1
+    total_samples = packed & 0xFFFFFFFFF
+    if not sample_rate or not total_samples:
+        return None
+    duration = total_samples / sample_rate
+    return ProbeResult(None, size, duration, sample_rate, channels, int(size * 8 / duration), 'header')
+
+
+def _probe_ogg(f, size):
+    """OGG Vorbis / Opus: azonosító fejléc + utolsó lap granule pozíciója"""
+    f.seek(0)
+    page = f.read(4096)
+    if page[:4] != b'OggS':
+        return None
+    segments = page[26]
+    packet = page[27 + segments:]
+
+    if packet[:7] == b'\x01vorbis':
+        channels = packet[11]
+        sample_rate = struct.unpack('<I', packet[12:16])[0]
+        pre_skip = 0
+        granule_rate = sample_rate
+    elif packet[:8] == b'OpusHead':
+        channels = packet[9]
+        pre_skip = struct.unpack('<H', packet[10:12])[0]
+        sample_rate = struct.unpack('<I', packet[12:16])[0] or 48000
+        granule_rate = 48000
+    else:
+        return None
+
+    f.seek(max(0, size - OGG_TAIL))
+    tail = f.read()
+    last = tail.rfind(b'OggS')
+    if last < 0 or last + 14 > len(tail):
+        return None
+    granule = struct.unpack('<q', tail[last + 6:last + 14])[0]
+    duration = max(0, granule - pre_skip) / granule_rate
+    if duration <= 0:
+        return None
+    return ProbeResult(None, size, duration, sample_rate, channels, int(size * 8 / duration), 'header')
+
+
+def _iter_atoms(f, start, end):
+    """MP4 atomok (típus, tartalom kezdete, tartalom vége) egy tartományban"""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        header = f.read(8)
+        if len(header) < 8:
+            return
+        atom_size, atom_type = struct.unpack('>I4s', header)
+        header_size = 8
+        if atom_size == 1:
+            atom_size = struct.unpack('>Q', f.read(8))[0]
+            header_size = 16
+        elif atom_size == 0:
+            atom_size = end - pos
+        if atom_size < header_size:
+            return
+        yield atom_type, pos + header_size, pos + atom_size
+        pos += atom_size
+
+
+def _find_atom(f, start, end, path):
+    """Beágyazott atom keresése (pl. moov/trak/mdia)"""
+    for atom_type, body, atom_end in _iter_atoms(f, start, end):
+        if atom_type == path[0]:
+            if len(path) == 1:
+                return body, atom_end
+            found = _find_atom(f, body, atom_end, path[1:])
+            if found:
+                return found
+    return None
+
+
+def _probe_m4a(f, size):
+    """MP4/M4A: moov/mvhd (hossz) + az első audio stsd bejegyzés (csatornák, frekvencia)"""
+    moov = _find_atom(f, 0, size, [b'moov'])
+    if moov is None:
+        return None
+    mvhd = _find_atom(f, moov[0], moov[1], [b'mvhd'])
+    if mvhd is None:
+        return None
+    f.seek(mvhd[0])
+    version = f.read(1)[0]
+    f.seek(mvhd[0] + (20 if version == 1 else 12))
+    if version == 1:
+        timescale, duration_units = struct.unpack('>IQ', f.read(12))
+    else:
+        timescale, duration_units = struct.unpack('>II', f.read(8))
+    if not timescale:
+        return None
+    duration = duration_units / timescale
+
+    channels = sample_rate = None
+    for atom_type, body, atom_end in _iter_atoms(f, moov[0], moov[1]):
+        if atom_type != b'trak':
+            continue
+        stsd = _find_atom(f, body, atom_end, [b'mdia', b'minf', b'stbl', b'stsd'])
+        if stsd is None:
+            continue
+        # stsd: verzió/flag (4) + darabszám (4), majd az első sample entry
+        f.seek(stsd[0] + 8)
+        entry = f.read(36)
+        if len(entry) == 36 and entry[4:8] in (b'mp4a', b'alac'):
+            channels = struct.unpack('>H', entry[24:26])[0]
+            sample_rate = struct.unpack('>I', entry[32:36])[0] >> 16
+            break
+
+    return ProbeResult(None, size, duration, sample_rate, channels,
+                       int(size * 8 / duration) if duration > 0 else None, 'header')
+
+
+_HEADER_PROBES = {
+    '.mp3': _probe_mp3,
+    '.wav': _probe_wav,
+    '.flac': _probe_flac,
+    '.ogg': _probe_ogg,
+    '.m4a': _probe_m4a,
+}
+
+
+def _probe_metadata_reader(file_path, size):
+    """Fallback: Essentia MetadataReader (taglib, szintén dekódolás nélkül)"""
+    try:
+        import essentia.standard as es
+    except ImportError:
+        return None
+    outputs = es.MetadataReader(filename=file_path, failOnError=True)()
+    # ... tagPool, duration, bitrate, sampleRate, channels
+    duration, bitrate, sample_rate, channels = outputs[-4:]
+    if not duration:
+        return None
+    return ProbeResult(None, size, float(duration), int(sample_rate), int(channels),
+                       int(bitrate) * 1000, 'metadata')
+
+
+def probe_file(path, file_path=None, size=None):
+    """Egy fájl probe-ja: fejléc -> MetadataReader -> méret alapú becslés"""
+    file_path = file_path or path
+    try:
+        if size is None:
+            size = os.stat(file_path).st_size
+        result = None
+        parser = _HEADER_PROBES.get(os.path.splitext(file_path)[1].lower())
+        if parser is not None:
+            with open(file_path, 'rb') as f:
+                result = parser(f, size)
+        if result is None:
+            result = _probe_metadata_reader(file_path, size)
+        if result is None:
+            result = ProbeResult(None, size, estimate_duration(file_path, size), method='estimate')
+        result.path = path
+        return result
+    except Exception as e:
+        return ProbeResult(path, size, error=str(e))
+
+
+def probe_files(audio_files, audio_dir='', sizes=None, threads=PROBE_THREADS):
+    """Probe párhuzamosan (szálakon): {fájl: ProbeResult}"""
+    sizes = sizes or {}
+    with ThreadPoolExecutor(max_workers=threads) as executor:
+        results = executor.map(
+            lambda path: probe_file(path, os.path.join(audio_dir, path), sizes.get(path)),
+            audio_files
+        )
+        return dict((result.path, result) for result in results)
+
+
+def filter_by_duration(audio_files, probes, min_duration=None, max_duration=None):
+    """Hossz szerinti szűrés, visszatér: (megtartott fájlok, kihagyott fájlok)"""
+    kept, skipped = [], []
+    for path in audio_files:
+        duration = probes[path].duration
+        if duration is not None and (
+            (min_duration is not None and duration < min_duration)
+            or (max_duration is not None and duration > max_duration)
+        ):
+            skipped.append(path)
+        else:
+            kept.append(path)
+    return kept, skipped
+
+
+def format_duration(seconds):
+    """Másodperc -> óó:pp:mm"""
+    seconds = int(round(seconds))
+    return f"{seconds // 3600:d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def probe_durations(probes):
+    """{fájl: hossz} a sikeres probe-okból (plan_schedule durations paraméteréhez)"""
+    return dict((path, probe.duration) for path, probe in probes.items() if probe.duration is not None)
+
+
+def print_probe_summary(audio_files, probes, eta=None, workers=1):
+    """Összes audio hossz, probe módszerek és ETA / realtime előrejelzés"""
+    known = [probes[path] for path in audio_files if probes[path].duration is not None]
+    total_audio = sum(probe.duration for probe in known)
+    methods = {}
+    for probe in known:
+        methods[probe.method] = methods.get(probe.method, 0) + 1
+    failed = [path for path in audio_files if probes[path].error]
+
+    print(f"🔎 Probe: {len(audio_files)} fájl, összes audio: {format_duration(total_audio)}"
+          f" ({', '.join(f'{method}: {count}' for method, count in sorted(methods.items()))})")
+    if failed:
+        print(f"⚠️ Probe hiba: {len(failed)} fájl (pl. {failed[0]}: {probes[failed[0]].error})")
+    if eta:
+        print(f"⏳ Becsült feldolgozási idő (ETA): {format_duration(eta)} "
+              f"({total_audio / eta:.1f}x realtime, {workers} worker)")
+    return total_audio
+
+
+def main(argv=None):
+    """Önálló probe parancssor: statisztika és ETA elemzés nélkül"""
+    parser = argparse.ArgumentParser(description="Audio metaadat probe (dekódolás nélkül)")
+    parser.add_argument('--audio-dir', default=DEFAULT_AUDIO_DIR, help="Zenei könyvtár (rekurzív)")
+    parser.add_argument('--file-list', metavar='PATH', help="Útvonalak fájlból ('-' = stdin)")
+    parser.add_argument('--min-duration', type=float, metavar='SEC', help="Rövidebb fájlok kihagyása")
+    parser.add_argument('--max-duration', type=float, metavar='SEC', help="Hosszabb fájlok kihagyása")
+    parser.add_argument('--workers', type=int, default=1, help="Worker szám az ETA becsléshez")
+    parser.add_argument('--benchmark-history', default=DEFAULT_HISTORY_PATH, metavar='PATH',
+                        help="Benchmark előzmény tár: az ETA költsége a gép alapvonalából")
+    parser.add_argument('--verbose', action='store_true', help="Fájlonkénti részletek")
+    args = parser.parse_args(argv)
+
+    entries = discover(args.audio_dir, args.file_list)
+    audio_files = [path for path, _ in entries]
+    base_dir = '' if args.file_list is not None else args.audio_dir
+    probes = probe_files(audio_files, base_dir, dict(entries))
+    audio_files, skipped = filter_by_duration(audio_files, probes, args.min_duration, args.max_duration)
+
+    if args.verbose:
+        for path in audio_files:
+            probe = probes[path]
+            if probe.error:
+                print(f"  ❌ {path}: {probe.error}")
+                continue
+            print(f"  {format_duration(probe.duration)}  {probe.sample_rate or '-':>6} Hz  "
+                  f"{probe.channels or '-'} ch  {(probe.bitrate or 0) // 1000:>4} kbps  [{probe.method}]  {path}")
+
+    if skipped:
+        print(f"⏭️  Hossz szerint kihagyva: {len(skipped)} fájl")
+    # Elemzési mód nélkül csak a gép benchmark alapvonala használható
+    cost, cost_source = calibrated_cost(path=args.benchmark_history)
+    plan = plan_schedule(audio_files, dict(entries), args.workers, durations=probe_durations(probes),
+                         cost_per_audio_sec=cost)
+    print_probe_summary(audio_files, probes, plan.predicted_makespan, args.workers)
+    print(f"💲 Költség: {cost:.3f} mp / audio mp ({cost_source})")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,412 @@
+"""
+Batch feldolgozás, eredmény mentés és a teljes futás (run) - közös a három elemző scriptben
+"""
+import os
+import time
+from datetime import datetime
+
+from .audio_decoders import AudioDecoder
+from .mel_patches import PatchCache
+from .result_store import ResultStore
+from .columnar_output import ColumnarWriter, PYARROW_AVAILABLE
+from .library_discovery import check_audio_directory, stream_paths
+from .work_queue import QueueFeeder, open_queue
+from .prefork_workers import PreforkPool, print_mode_comparison
+from .memory_budget import MemoryBudget
+from .scheduling import plan_schedule, print_schedule_report
+from .cascade import CascadeClassifier, cascade_options, print_cascade_report, describe_cascade
+from .prefetch_io import Prefetcher
+from .audio_probe import probe_files, filter_by_duration, probe_durations, print_probe_summary
+from .benchmark_store import calibrated_cost, record_cost, record_worker_mode, run_mode
+from .classifier import MusicGenreClassifier, essentia_version
+
+
+def result_row(classifier, filename, result, analysis_time):
+    """Sikeres elemzés CSV / eredménytár sora (top 5 műfaj, fő műfaj, leírók, fejek)"""
+    row = {
+        'fajl': filename,
+        'BPM': result['bpm'],
+        'audio_hossz_sec': round(result['audio_length'], 1),
+        'feldolgozasi_ido_sec': round(analysis_time, 1),
+        'feldolgozas_ideje': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'pooling': classifier.pooling
+    }
+    if classifier.trim != 'off':
+        row['levagott_arany'] = round(result['trimmed'], 3)
+    if 'peak_rss_mb' in result:
+        # Workeres módban: a fájl csúcs memóriája (RSS növekmény)
+        row['csucs_memoria_mb'] = round(result['peak_rss_mb'], 1)
+    if 'cascade' in result:
+        # Kaszkád módban: melyik út adta az eredményt, és mennyi volt az első menet
+        row['kaszkad'] = result['cascade']
+        row['kaszkad_gyors_sec'] = round(result['fast_sec'], 2)
+    row.update(result['descriptors'])
+    row.update(result['heads'])
+    
+    # Top 5 műfaj hozzáadása
+    for i, (genre, conf) in enumerate(result['genres'], 1):
+        row[f'Genre_{i}'] = genre.replace('---', ' / ')
+        row[f'Conf_{i}'] = round(float(conf), 4)
+    # Fő műfaj + a műfajok tömör azonosítói (a modell osztály indexei)
+    row.update(classifier.hierarchy.row_columns(result['genre_ids'], result['parent_scores']))
+    return row
+
+
+def process_batch(classifier, audio_files, audio_dir, store=None, columnar=None, on_done=None,
+                  pool=None, prefetch=None, jsonl=None):
+    """
+    Batch feldolgozás TensorFlow modellel
+    (store megadásakor az eredmények batch-enként az SQLite tárba kerülnek,
+    columnar megadásakor a teljes aktivációs vektor Parquet/Arrow fájlba)
+
+    audio_files lehet lista vagy munkasorból táplált iterálható (QueueFeeder),
+    on_done(fajl, hiba, eredmény) minden fájl után meghívódik,
+    pool (PreforkPool) megadásakor az elemzés a fork-olt workerekben fut,
+    prefetch (Prefetcher) megadásakor a dekóder az előolvasott helyi másolatból olvas,
+    jsonl (JsonlWriter) megadásakor minden eredmény azonnal egy NDJSON sor a stdout-on
+    """
+    try:
+        total_files = len(audio_files)
+    except TypeError:
+        # Munkasor / stdin (előolvasóval is): a fájlok száma előre nem ismert
+        total_files = '?'
+    print("\n🚀 TENSORFLOW BATCH FELDOLGOZÁS")
+    print(f"📂 Fájlok száma: {total_files}")
+    print("="*60)
+    
+    results = []
+    errors = []
+    start_time = datetime.now()
+    total_audio_time = 0
+    total_trimmed_time = 0
+    
+    # Párhuzamos módban az eredmények a befejezés sorrendjében érkeznek
+    if pool is not None:
+        analyzed = pool.imap(audio_files, audio_dir, resolve=prefetch.path if prefetch is not None else None)
+    else:
+        analyzed = ((filename, None, None) for filename in audio_files)
+    
+    for idx, (filename, result, analysis_time) in enumerate(analyzed, 1):
+        file_path = os.path.join(audio_dir, filename)
+        
+        print(f"\n[{idx}/{total_files}] {filename}")
+        print("-" * 50)
+        
+        # Elemzés
+        if result is None:
+            analysis_start = time.time()
+            result = classifier.analyze_audio(prefetch.path(filename) if prefetch is not None else file_path)
+            analysis_time = time.time() - analysis_start
+        if prefetch is not None:
+            prefetch.release(filename)
+        
+        if not result['success']:
+            print(f"    ❌ Hiba: {result['error']}")
+            errors.append({'fajl': filename, 'hiba': result['error']})
+            if store is not None:
+                store.add_error(file_path, result['error'])
+            if jsonl is not None:
+                jsonl.add_error(file_path, result['error'], filename)
+            if on_done is not None:
+                on_done(filename, result['error'], result)
+            continue
+        
+        # Eredmények megjelenítése
+        print(f"    ✅ BPM: {result['bpm']}")
+        print(f"    ⏱️  Feldolgozási idő: {analysis_time:.1f}s")
+        print(f"    🎼 Audio hossz: {result['audio_length']:.1f}s")
+        if classifier.trim != 'off':
+            print(f"    ✂️  Levágott arány: {result['trimmed']:.1%}")
+        if 'peak_rss_mb' in result:
+            print(f"    🐏 Csúcs memória: +{result['peak_rss_mb']:.0f} MB")
+        if 'cascade' in result:
+            print(f"    🪜 Kaszkád: {result['cascade']} út (első menet: {result['fast_sec']:.1f}s)")
+        if result['descriptors']:
+            print("    🎹 " + ", ".join(f"{column}: {value}" for column, value in result['descriptors'].items()))
+        for name, value in result['heads'].items():
+            if not name.endswith('_conf'):
+                print(f"    🧠 {name}: {value} ({result['heads'][name + '_conf']:.1%})")
+        print("    🏆 Top műfajok:")
+        
+        for i, (genre, conf) in enumerate(result['genres'], 1):
+            clean_genre = genre.replace('---', ' / ')
+            print(f"      {i}. {clean_genre}: {conf:.1%}")
+
+        # CSV adatok összeállítása
+        row = result_row(classifier, filename, result, analysis_time)
+        print(f"    🌳 Fő műfaj: {row['Parent_Genre']} ({row['Parent_Conf']:.1%})")
+
+        results.append(row)
+        if store is not None:
+            store.add_result(file_path, row)
+        if columnar is not None:
+            columnar.add(file_path, row, result['scores'])
+        if jsonl is not None:
+            jsonl.add(file_path, row)
+        if on_done is not None:
+            on_done(filename, None, result)
+        total_audio_time += result['audio_length']
+        total_trimmed_time += result['audio_length'] * result['trimmed']
+        
+        print("    ✅ Sikeres feldolgozás")
+    
+    # Összesített statisztikák
+    processing_time = (datetime.now() - start_time).total_seconds()
+    
+    print(f"\n{'='*60}")
+    print("📊 BATCH FELDOLGOZÁS BEFEJEZVE")
+    print(f"{'='*60}")
+    print(f"⏱️  Teljes feldolgozási idő: {processing_time:.1f}s")
+    print(f"🎼 Összes audio idő: {total_audio_time:.1f}s")
+    if classifier.trim != 'off' and total_audio_time > 0:
+        print(f"✂️  Levágott csend / zaj: {total_trimmed_time:.1f}s ({total_trimmed_time / total_audio_time:.1%})")
+    print(f"📊 Sebesség: {total_audio_time/processing_time:.1f}x realtime" if processing_time > 0 else "")
+    print(f"✅ Sikeres fájlok: {len(results)}")
+    print(f"❌ Hibás fájlok: {len(errors)}")
+    
+    return results, errors, processing_time
+
+
+def save_results(results, errors, prefix, write_csv=True):
+    """Eredmények mentése fejlett statisztikákkal (<prefix>_eredmenyek_<idő>.csv)"""
+    # Csak mentéskor kell - az API pandas nélkül is használható
+    import pandas as pd
+
+    saved_files = []
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    
+    # Sikeres eredmények mentése
+    if results:
+        df = pd.DataFrame(results)
+        if write_csv:
+            results_file = f"{prefix}_eredmenyek_{timestamp}.csv"
+            df.to_csv(results_file, index=False, encoding='utf-8-sig')
+            print(f"\n💾 Eredmények mentve: {results_file}")
+            saved_files.append(results_file)
+        
+        # Részletes statisztikák
+        print("\n📈 RÉSZLETES STATISZTIKÁK:")
+        print("-" * 40)
+        print(f"  • Fájlok száma: {len(df)}")
+        print(f"  • Átlagos BPM: {df['BPM'].mean():.1f}")
+        print(f"  • BPM tartomány: {df['BPM'].min():.1f} - {df['BPM'].max():.1f}")
+        print(f"  • Átlagos feldolgozási idő: {df['feldolgozasi_ido_sec'].mean():.1f}s")
+        
+        # Legnépszerűbb műfajok
+        if 'Genre_1' in df.columns:
+            top_genres = df['Genre_1'].value_counts().head(3)
+            print("  • Legnépszerűbb műfajok:")
+            for genre, count in top_genres.items():
+                print(f"    - {genre}: {count} fájl")
+        
+        # Konfidencia statisztikák
+        if 'Conf_1' in df.columns:
+            print(f"  • Átlagos konfidencia: {df['Conf_1'].mean():.1%}")
+            print(f"  • Magas konfidencia (>50%): {(df['Conf_1'] > 0.5).sum()} fájl")
+        
+        if 'Parent_Genre' in df.columns:
+            print("  • Fő műfajok:")
+            for parent, count in df['Parent_Genre'].value_counts().head(3).items():
+                print(f"    - {parent}: {count} fájl")
+    
+    # Hibák mentése
+    if errors and write_csv:
+        df_errors = pd.DataFrame(errors)
+        errors_file = f"{prefix}_hibak_{timestamp}.csv"
+        df_errors.to_csv(errors_file, index=False, encoding='utf-8-sig')
+        print(f"\n⚠️ Hibák mentve: {errors_file}")
+        saved_files.append(errors_file)
+    
+    return saved_files
+
+
+def run(args, config, jsonl=None):
+    """
+    A három elemző script közös futása a feldolgozott kapcsolókkal (jsonl: JsonlWriter vagy None)
+    config: a platform beállításai - 'banner' (fejléc sorok), 'resample' (MusicGenreClassifier),
+    'prefix' (CSV fájlnév), opcionálisan 'before_load' (a modell betöltése előtt hívódik)
+    """
+    banner = config['banner']
+    print(banner[0])
+    print("="*60)
+    for line in banner[1:]:
+        print(line)
+    print(f"🧮 Pooling: {args.pooling} (összes patch)")
+    print("="*60)
+    
+    if args.columnar and not PYARROW_AVAILABLE:
+        print("❌ Az oszlopos kimenethez pyarrow szükséges (pip install pyarrow)")
+        return 1
+    
+    try:
+        # Osztályozó inicializálása
+        classifier = (CascadeClassifier if args.cascade else MusicGenreClassifier)(
+            pooling=args.pooling, trim=args.trim, descriptors=args.descriptors or (),
+            heads=args.heads, decoder=AudioDecoder(args.decoder, args.decoder_benchmark),
+            tempo=not args.no_bpm, patch_cache=PatchCache(args.patch_cache) if args.patch_cache else None,
+            resample=config['resample'],
+            **cascade_options(args)
+        )
+        print(f"🎧 Dekóder: {classifier.decoder.describe()}")
+        if args.patch_cache:
+            print(f"📦 Mel patch gyorsítótár: {args.patch_cache}")
+        if args.cascade:
+            print(describe_cascade(classifier))
+        
+        # Modell fájlok letöltése
+        print("\n1️⃣ Modell fájlok ellenőrzése...")
+        if not classifier.download_models():
+            print("❌ Modell letöltés sikertelen!")
+            return 1
+        
+        # Audio fájlok keresése (vagy megosztott munkasor)
+        feeder = None
+        plan = None
+        probes = None
+        if args.queue:
+            print(f"\n2️⃣ Munkasor csatlakozás: {args.queue}")
+            feeder = QueueFeeder(open_queue(args.queue), args.worker_id, wait=args.queue_wait)
+            audio_files, audio_dir = feeder, ''
+            print(f"🖧 Worker: {feeder.worker_id}")
+        elif args.stdin:
+            # Folyamatos bemenet: nincs előzetes lista, így probe és ütemezés sem
+            print("\n2️⃣ Útvonalak stdin-ről (folyamatosan)...")
+            audio_files, audio_dir, sizes = stream_paths(shard=args.shard), '', None
+        else:
+            print("\n2️⃣ Audio fájlok keresése...")
+            audio_files, audio_dir, sizes = check_audio_directory(
+                args.audio_dir, args.file_list, args.shard, recursive=not args.no_recursive
+            )
+            if audio_files and not args.no_probe:
+                # Metaadat probe dekódolás nélkül: pontos hossz, szűrés, ETA
+                probes = probe_files(audio_files, audio_dir, sizes)
+                audio_files, skipped = filter_by_duration(
+                    audio_files, probes, args.min_duration, args.max_duration
+                )
+                if skipped:
+                    print(f"⏭️  Hossz szerint kihagyva: {len(skipped)} fájl")
+            if audio_files:
+                # ETA költség: a gépen ebben a módban mért, különben a benchmark alapvonal, különben állandó
+                cost, cost_source = calibrated_cost(run_mode(args, config['resample']), args.benchmark_history)
+                # Kiosztási sorrend: prioritásos fájlok előre, a többi hossz szerint
+                plan = plan_schedule(
+                    audio_files, sizes, args.workers, args.schedule, args.priority or (),
+                    durations=probe_durations(probes) if probes else None, cost_per_audio_sec=cost
+                )
+                audio_files = plan.order
+                if probes:
+                    print_probe_summary(audio_files, probes, plan.predicted_makespan, args.workers)
+                print(f"🗓️  Ütemezés: {plan.method}, becsült makespan: {plan.predicted_makespan:.0f}s"
+                      + (f", {plan.priority_count} prioritásos fájl elöl" if plan.priority_count else ""))
+                print(f"💲 Költség: {cost:.3f} mp / audio mp ({cost_source})")
+        
+        if feeder is None and not audio_files:
+            print("\n⚠️ Nincs feldolgozható fájl!")
+            print(f"📁 Helyezz audio fájlokat a '{args.audio_dir}' könyvtárba")
+            print("🎵 Támogatott formátumok: MP3, WAV, FLAC, OGG, M4A")
+            return 0
+        
+        # Modell betöltése (prefork: a workerek fork előtt a szülő modelljét öröklik,
+        # naive: a fork a szülő betöltése előtt történik, minden worker sajátot tölt)
+        print("\n3️⃣ TensorFlow modell betöltése...")
+        # Essentia (és vele a TensorFlow) csak itt töltődik be: a --help és az üres futás ezt nem fizeti
+        try:
+            print(f"✅ Essentia betöltve (verzió: {essentia_version()})")
+        except ImportError:
+            print("❌ Hiba: Essentia nincs telepítve!")
+            print("Telepítés: pip install essentia-tensorflow")
+            return 1
+        if config.get('before_load') is not None:
+            config['before_load']()
+        pool = None
+        if args.workers > 1 or args.isolate or args.memory_budget:
+            pool = PreforkPool(
+                classifier, args.workers, args.worker_mode,
+                timeout_base=args.file_timeout, timeout_per_mb=args.timeout_per_mb,
+                budget=MemoryBudget(args.memory_budget, probe_durations(probes) if probes else None)
+                if args.memory_budget else None
+            )
+            if not pool.start():
+                print("❌ Worker pool indítása sikertelen!")
+                return 1
+        if not classifier.load_model():
+            print("❌ Modell betöltés sikertelen!")
+            return 1
+        
+        # Batch feldolgozás
+        print("\n4️⃣ TensorFlow batch feldolgozás...")
+        prefetch = None
+        if args.prefetch > 0 and feeder is None:
+            # Előolvasás: a következő fájlok már másolódnak, amíg az aktuális elemzés fut
+            prefetch = Prefetcher(audio_files, audio_dir, args.prefetch, args.prefetch_mb, args.scratch_dir, sizes)
+            audio_files = prefetch
+        store = ResultStore(args.db, classifier.labels) if args.db else None
+        columnar = None
+        if args.columnar:
+            # Az extra oszlopok sémája előre, a beállításokból (nem az első row group soraiból)
+            extra_columns = classifier.extra_columns()
+            if pool is not None:
+                extra_columns['csucs_memoria_mb'] = False
+            columnar = ColumnarWriter(args.columnar, classifier.labels, extra_columns)
+        try:
+            results, errors, proc_time = process_batch(
+                classifier, audio_files, audio_dir, store=store, columnar=columnar,
+                on_done=feeder.done if feeder is not None else None, pool=pool, prefetch=prefetch,
+                jsonl=jsonl
+            )
+        finally:
+            if pool is not None:
+                pool.shutdown()
+                pool.report()
+            if prefetch is not None:
+                prefetch.close()
+                print(prefetch.summary())
+            if feeder is not None:
+                feeder.queue.close()
+            if store is not None:
+                store.close()
+            if columnar is not None:
+                columnar.close()
+        
+        # A mért költség a következő futás ETA-jához (gépenként és módonként)
+        mode = run_mode(args, config['resample'])
+        record_cost(mode, results, args.benchmark_history)
+        if pool is not None:
+            # Prefork vs. naive: a másik worker mód legutóbbi, azonos beállítású futásával egymás mellett
+            summary = pool.summary(len(results) + len(errors), proc_time)
+            print_mode_comparison(record_worker_mode(mode, summary, args.benchmark_history))
+        
+        # Eredmények mentése
+        print("\n5️⃣ Eredmények mentése...")
+        saved_files = save_results(results, errors, config['prefix'], write_csv=store is None and jsonl is None)
+        if store is not None:
+            print(f"🗄️  Eredménytár frissítve: {args.db}")
+            print(f"   CSV export: python3 result_store.py --db {args.db} export")
+            saved_files.append(args.db)
+        if columnar is not None:
+            print(f"🧊 Oszlopos kimenet: {args.columnar} ({columnar.rows_written} sor, teljes aktivációk)")
+            saved_files.append(args.columnar)
+        
+        if feeder is not None:
+            print(feeder.summary())
+        if plan is not None:
+            print_schedule_report(plan, results, proc_time)
+        print_cascade_report(results)
+        
+        print("\n🎉 FELDOLGOZÁS BEFEJEZVE!")
+        print(f"💾 Mentett fájlok: {', '.join(saved_files)}")
+        print(f"⏱️  Teljes idő: {proc_time:.1f} másodperc")
+        
+        return 0
+        
+    except BrokenPipeError:
+        print("\n⚠️ A kimeneti pipe lezárult, feldolgozás leállítva")
+        return 1
+    except KeyboardInterrupt:
+        print("\n\n⚠️ Feldolgozás megszakítva")
+        return 1
+    except Exception as e:
+        print(f"\n❌ Váratlan hiba: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Benchmark előzmény tár (SQLite) és a futás előtti ETA költség (mp / audio mp)
+Könnyű modul (csak standard könyvtár): a metaadat-only probe és az elemzők --help / ETA
+útja ezt tölti be, a mérést végző benchmark_history (modell, numpy) nélkül
+"""
+import os
+import json
+import time
+import sqlite3
+import hashlib
+import platform
+
+from .scheduling import DEFAULT_COST_PER_AUDIO_SEC
+
+DEFAULT_HISTORY_PATH = "benchmark_history.sqlite"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    created TEXT NOT NULL,
+    label TEXT,
+    host TEXT NOT NULL,
+    fingerprint TEXT NOT NULL,
+    config TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    samples TEXT NOT NULL,
+    is_baseline INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_runs_host ON runs(host, is_baseline);
+CREATE TABLE IF NOT EXISTS mode_costs (
+    host TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    cost_per_audio_sec REAL NOT NULL,
+    files INTEGER NOT NULL,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (host, mode)
+);
+CREATE TABLE IF NOT EXISTS worker_modes (
+    host TEXT NOT NULL,
+    mode TEXT NOT NULL,
+    workers INTEGER NOT NULL,
+    worker_mode TEXT NOT NULL,
+    summary TEXT NOT NULL,
+    updated TEXT NOT NULL,
+    PRIMARY KEY (host, mode, workers, worker_mode)
+);
+"""
+# Ennél kevesebb sikeres fájlból mért költség nem kerül mentésre (bemelegítés, zaj)
+MIN_COST_FILES = 3
+
+
+def host_key():
+    """A gép kulcsa: csak a hardver / OS (csomagverzió és git nélkül)"""
+    hardware = [platform.system(), platform.machine(), platform.processor() or platform.machine(), os.cpu_count()]
+    return hashlib.sha1(json.dumps(hardware).encode('utf-8')).hexdigest()[:12]
+
+
+def run_mode(args, resample):
+    """Az elemzés költségét befolyásoló beállítások (az ETA költség kulcsa) a parancssori kapcsolókból"""
+    return {
+        'tempo': not args.no_bpm,
+        'decoder': args.decoder,
+        'resample': resample,
+        'trim': args.trim,
+        'cascade': bool(args.cascade),
+        'patch_cache': bool(args.patch_cache),
+        'heads': args.heads is not None,
+        'descriptors': sorted(args.descriptors or ()),
+    }
+
+
+def _baseline_matches(config, mode):
+    """A benchmark alapvonal (soros, alapbeállítású elemzés) ugyanazt méri-e, mint a mód"""
+    from .silence_trim import DEFAULT_TRIM_MODE
+    return (config.get('tempo') == mode['tempo'] and config.get('decoder') == mode['decoder']
+            and config.get('resample', 'essentia') == mode['resample'] and mode['trim'] == DEFAULT_TRIM_MODE
+            and not mode['cascade'] and not mode['patch_cache']
+            and not mode['heads'] and not mode['descriptors'])
+
+
+class BenchmarkHistory:
+    """Benchmark futások SQLite tárban; gépenként egy kijelölt alapvonal"""
+    def __init__(self, path=DEFAULT_HISTORY_PATH):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.executescript(SCHEMA)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def save(self, record):
+        """Futás mentése; az új sor azonosítója"""
+        with self.conn:
+            cursor = self.conn.execute(
+                "INSERT INTO runs (created, label, host, fingerprint, config, summary, samples) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record['created'], record.get('label'), record['host'], json.dumps(record['fingerprint']),
+                 json.dumps(record['config']), json.dumps(record['summary']), json.dumps(record['samples']))
+            )
+        return cursor.lastrowid
+
+    def _record(self, row):
+        run_id, created, label, host, fingerprint, config, summary, samples, is_baseline = row
+        return {'id': run_id, 'created': created, 'label': label, 'host': host,
+                'fingerprint': json.loads(fingerprint), 'config': json.loads(config),
+                'summary': json.loads(summary), 'samples': json.loads(samples), 'is_baseline': bool(is_baseline)}
+
+    def get(self, run_id):
+        row = self.conn.execute("SELECT * FROM runs WHERE id = ?", (run_id,)).fetchone()
+        return self._record(row) if row else None
+
+    def runs(self, limit=20):
+        """Legutóbbi futások (legújabb elöl)"""
+        return [self._record(row) for row in
+                self.conn.execute("SELECT * FROM runs ORDER BY id DESC LIMIT ?", (limit,))]
+
+    def baseline_for(self, host):
+        """A géphez kijelölt alapvonal (None, ha nincs)"""
+        row = self.conn.execute("SELECT * FROM runs WHERE host = ? AND is_baseline = 1 ORDER BY id DESC LIMIT 1",
+                                (host,)).fetchone()
+        return self._record(row) if row else None
+
+    def mode_cost(self, host, mode):
+        """Mentett költség a géphez és módhoz: (mp / audio mp, fájlok, időpont) vagy None"""
+        return self.conn.execute(
+            "SELECT cost_per_audio_sec, files, updated FROM mode_costs WHERE host = ? AND mode = ?",
+            (host, json.dumps(mode, sort_keys=True))
+        ).fetchone()
+
+    def save_mode_cost(self, host, mode, cost, files):
+        """A legutóbbi futásban mért költség mentése (a korábbit felülírja)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO mode_costs (host, mode, cost_per_audio_sec, files, updated) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (host, json.dumps(mode, sort_keys=True), cost, files, time.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    def worker_modes(self, host, mode, workers):
+        """A géphez, módhoz és workerszámhoz mentett worker mód összesítők: {worker mód: (összesítő, időpont)}"""
+        rows = self.conn.execute(
+            "SELECT worker_mode, summary, updated FROM worker_modes WHERE host = ? AND mode = ? AND workers = ?",
+            (host, json.dumps(mode, sort_keys=True), workers)
+        )
+        return dict((worker_mode, (json.loads(summary), updated)) for worker_mode, summary, updated in rows)
+
+    def save_worker_mode(self, host, mode, summary):
+        """Worker mód összesítő mentése (az azonos módú korábbit felülírja)"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO worker_modes (host, mode, workers, worker_mode, summary, updated) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (host, json.dumps(mode, sort_keys=True), summary['workers'], summary['worker_mode'],
+                 json.dumps(summary), time.strftime("%Y-%m-%d %H:%M:%S"))
+            )
+
+    def set_baseline(self, run_id):
+        """Futás kijelölése alapvonalnak (a gép korábbi alapvonala megszűnik)"""
+        record = self.get(run_id)
+        if record is None:
+            raise KeyError(run_id)
+        with self.conn:
+            self.conn.execute("UPDATE runs SET is_baseline = 0 WHERE host = ?", (record['host'],))
+            self.conn.execute("UPDATE runs SET is_baseline = 1 WHERE id = ?", (run_id,))
+        return record
+
+
+def calibrated_cost(mode=None, path=DEFAULT_HISTORY_PATH):
+    """
+    ETA költség (mp / audio mp) és a forrása szövegesen: a gépen a módhoz mentett mérés,
+    különben az egyező módú benchmark alapvonal, különben a beépített állandó
+    (mode None: csak az alapvonal, módtól függetlenül)
+    """
+    if path and os.path.exists(path):
+        host = host_key()
+        with BenchmarkHistory(path) as history:
+            saved = history.mode_cost(host, mode) if mode is not None else None
+            if saved is not None:
+                cost, files, updated = saved
+                return cost, f"mért ebben a módban: előző futás, {files} fájl, {updated}"
+            baseline = history.baseline_for(host)
+        if baseline is not None and baseline['summary']['realtime_x'] and (
+                mode is None or _baseline_matches(baseline['config'], mode)):
+            return 1.0 / baseline['summary']['realtime_x'], \
+                f"a gép benchmark alapvonala: #{baseline['id']}, {baseline['summary']['realtime_x']}x realtime"
+    return DEFAULT_COST_PER_AUDIO_SEC, "beépített alapérték - nincs mérés ezen a gépen ebben a módban"
+
+
+def record_cost(mode, results, path=DEFAULT_HISTORY_PATH):
+    """A futás mért költségének mentése a következő ETA-hoz (sikeres eredménysorokból); True, ha mentve"""
+    audio_total = sum(row['audio_hossz_sec'] for row in results)
+    busy_total = sum(row['feldolgozasi_ido_sec'] for row in results)
+    if not path or len(results) < MIN_COST_FILES or audio_total <= 0 or busy_total <= 0:
+        return False
+    with BenchmarkHistory(path) as history:
+        history.save_mode_cost(host_key(), mode, busy_total / audio_total, len(results))
+    return True
+
+
+def record_worker_mode(mode, summary, path=DEFAULT_HISTORY_PATH):
+    """
+    Worker pool futás összesítőjének mentése (MIN_COST_FILES fájltól) és a gépen ugyanilyen módú,
+    workerszámú futások mindkét worker módban: {worker mód: (összesítő, időpont)}
+    """
+    current = {summary['worker_mode']: (summary, time.strftime("%Y-%m-%d %H:%M:%S"))}
+    if not path:
+        return current
+    host = host_key()
+    with BenchmarkHistory(path) as history:
+        if summary['files'] >= MIN_COST_FILES:
+            history.save_worker_mode(host, mode, summary)
+        saved = history.worker_modes(host, mode, summary['workers'])
+    saved.update(current)
+    return saved
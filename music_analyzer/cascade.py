@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Kétlépcsős kaszkád: olcsó első menet minden fájlon, teljes elemzés csak a bizonytalanokra
+
+Első menet: a jel közepéből egy rövid részlet, gyors tempó szinttel (BeatTrackerDegara).
+Ha a top-1 konfidencia vagy a top-1 / top-2 különbség a küszöb alatt van, a fájl a teljes
+úton is lefut - a már dekódolt jelből, így a dekódolás nem ismétlődik
+"""
+import time
+
+from .classifier import MusicGenreClassifier
+
+DEFAULT_EXCERPT_SEC = 30.0
+# Egy EffNet patch ~2 s; ennél rövidebb részlet nem ad értelmes első menetet
+MIN_EXCERPT_SEC = 5.0
+DEFAULT_MIN_CONFIDENCE = 0.4
+DEFAULT_MIN_MARGIN = 0.1
+FAST_BEAT_TRACKER = 'degara'
+
+
+class _LastDecode:
+    """Dekóder az utolsó fájl jeleinek megőrzésével (a teljes menet ugyanazt a jelet kapja)"""
+    def __init__(self, decoder):
+        self.decoder = decoder
+        self._path = None
+        self._signals = {}
+
+    def _cached(self, path, key, decode):
+        if path != self._path:
+            self._path, self._signals = path, {}
+        if key not in self._signals:
+            self._signals[key] = decode()
+        return self._signals[key]
+
+    def decode(self, path, sample_rate):
+        return self._cached(path, sample_rate, lambda: self.decoder.decode(path, sample_rate))
+
+    def decode_rates(self, path, sample_rates):
+        return self._cached(path, tuple(sample_rates), lambda: self.decoder.decode_rates(path, sample_rates))
+
+    def describe(self):
+        return self.decoder.describe()
+
+    def clear(self):
+        self._path, self._signals = None, {}
+
+
+class CascadeClassifier(MusicGenreClassifier):
+    """
+    MusicGenreClassifier kaszkád módban: ugyanaz a modell mindkét menethez, a PreforkPool és az
+    API változatlanul használja. Az eredményben 'cascade': 'gyors' vagy 'teljes', 'fast_sec': az első menet ideje
+    """
+    def __init__(self, *args, cascade_excerpt=DEFAULT_EXCERPT_SEC, min_confidence=DEFAULT_MIN_CONFIDENCE,
+                 min_margin=DEFAULT_MIN_MARGIN, **kwargs):
+        super().__init__(*args, **kwargs)
+        if cascade_excerpt < MIN_EXCERPT_SEC:
+            raise ValueError(f"A részlet legalább {MIN_EXCERPT_SEC:.0f}s legyen: {cascade_excerpt}")
+        self.cascade_excerpt = cascade_excerpt
+        self.min_confidence = min_confidence
+        self.min_margin = min_margin
+
+    def is_confident(self, result):
+        """Az első menet elfogadható: top-1 konfidencia és top-1 / top-2 különbség a küszöbök felett"""
+        confidences = [conf for _, conf in result['genres']]
+        margin = confidences[0] - confidences[1] if len(confidences) > 1 else confidences[0]
+        return confidences[0] >= self.min_confidence and margin >= self.min_margin
+
+    def extra_columns(self):
+        columns = super().extra_columns()
+        columns.update(kaszkad=True, kaszkad_gyors_sec=False)
+        return columns
+
+    def analyze_audio(self, file_path, excerpt=None, beat_tracker=None):
+        if excerpt is not None or beat_tracker is not None:
+            return super().analyze_audio(file_path, excerpt, beat_tracker)
+        if not isinstance(self._decoder, _LastDecode):
+            self._decoder = _LastDecode(self.decoder)
+        try:
+            start = time.perf_counter()
+            fast = super().analyze_audio(file_path, self.cascade_excerpt, FAST_BEAT_TRACKER)
+            fast_sec = time.perf_counter() - start
+            if fast['success'] and self.is_confident(fast):
+                fast.update(cascade='gyors', fast_sec=fast_sec)
+                return fast
+            self._log("    🔁 Bizonytalan első menet: teljes elemzés...")
+            result = super().analyze_audio(file_path)
+            if result['success']:
+                result.update(cascade='teljes', fast_sec=fast_sec)
+                result['stages']['fast_pass'] = fast_sec
+            return result
+        finally:
+            self._decoder.clear()
+
+
+def cascade_options(args):
+    """A CascadeClassifier kulcsszó paraméterei a parancssori kapcsolókból (kaszkád nélkül üres)"""
+    if not args.cascade:
+        return {}
+    return {'cascade_excerpt': args.cascade_excerpt, 'min_confidence': args.cascade_confidence,
+            'min_margin': args.cascade_margin}
+
+
+def describe_cascade(classifier):
+    """Egysoros leírás a fejléchez"""
+    return (f"🪜 Kaszkád: {classifier.cascade_excerpt:.0f}s részlet + {FAST_BEAT_TRACKER} tempó, teljes elemzés, "
+            f"ha top-1 < {classifier.min_confidence:.0%} vagy top-1 / top-2 különbség < {classifier.min_margin:.0%}")
+
+
+def print_cascade_report(results):
+    """Eszkalációs arány és megtakarított idő a sikeres sorokból (kaszkad, kaszkad_gyors_sec oszlopok)"""
+    rows = [row for row in results if 'kaszkad' in row]
+    if not rows:
+        return
+    fast = [row for row in rows if row['kaszkad'] == 'gyors']
+    escalated = [row for row in rows if row['kaszkad'] == 'teljes']
+    actual = sum(row['feldolgozasi_ido_sec'] for row in rows)
+
+    print("\n🪜 KASZKÁD")
+    print("-" * 40)
+    print(f"  • Gyors úton: {len(fast)} fájl, teljes elemzésre eszkalálva: {len(escalated)} "
+          f"({len(escalated) / len(rows):.1%})")
+    # A teljes út költsége audio másodpercenként az eszkalált fájlok második menetéből
+    # (a dekódolás az első menetben volt, így a megtakarítás alsó becslés)
+    full_time = sum(row['feldolgozasi_ido_sec'] - row['kaszkad_gyors_sec'] for row in escalated)
+    full_audio = sum(row['audio_hossz_sec'] for row in escalated)
+    if full_audio > 0 and actual > 0:
+        estimated = full_time / full_audio * sum(row['audio_hossz_sec'] for row in fast) + full_time
+        saved = estimated - actual
+        print(f"  • Becsült idő csak teljes elemzéssel: {estimated:.1f}s, tényleges: {actual:.1f}s")
+        print(f"  • Megtakarítás (legalább): {saved:.1f}s ({saved / estimated:.1%})")
+    else:
+        print("  • Megtakarítás: nincs eszkalált fájl a teljes út költségének becsléséhez")
@@ -0,0 +1,398 @@
+"""
+Egyetlen MusicGenreClassifier a három elemző script és a Python API számára
+Az Essentia és a modell első használatkor töltődik be (lusta betöltés)
+"""
+import io
+import os
+import json
+import time
+import urllib.request
+from contextlib import redirect_stderr
+
+import numpy as np
+
+from .genre_pooling import DEFAULT_POOLING, pool_activations, top_k_batch
+from .genre_hierarchy import GenreHierarchy
+from .descriptors import DescriptorExtractor, TEXT_COLUMNS
+from .audio_decoders import AudioDecoder
+from .classifier_heads import EMBEDDING_OUTPUT, GENRE_HEAD_FILES, GENRE_HEAD_METADATA, HeadModel, \
+    MultiHeadPredictor, discover_heads, head_columns
+from .mel_patches import HOP_SIZE, PATCH_HOP_SIZE, SAMPLE_RATE, MelFrontEnd, PatchPredictor
+from .silence_trim import DEFAULT_TRIM_MODE, trim_silence, cut_regions
+
+MODELS_DIR = "models"
+MODEL_FILES = {
+    "classifier_model.pb": "https://essentia.upf.edu/models/music-style-classification/discogs-effnet/discogs-effnet-bs64-1.pb",
+    "classifier_labels.json": "https://essentia.upf.edu/models/music-style-classification/discogs-effnet/discogs-effnet-bs64-1.json"
+}
+
+# 16 kHz jel előállítása: 'essentia' = Resample a 44 kHz-es jelből, 'decoder' = a dekóder adja
+RESAMPLE_MODES = ('essentia', 'decoder')
+# Tempó szintek: 'multifeature' = BeatTrackerMultiFeature (5 onset függvény, pontosabb),
+# 'degara' = BeatTrackerDegara (egy onset függvény, többszörösen gyorsabb)
+BEAT_TRACKERS = ('multifeature', 'degara')
+
+_essentia_standard = None
+
+
+def excerpt_slice(length, sample_rate, seconds):
+    """A jel közepéből seconds hosszú szakasz indexei (rövidebb jelnél az egész)"""
+    size = max(1, int(seconds * sample_rate))
+    if size >= length:
+        return slice(0, length)
+    start = (length - size) // 2
+    return slice(start, start + size)
+
+
+def essentia_standard():
+    """essentia.standard első használatkor, csendesített naplózással"""
+    global _essentia_standard
+    if _essentia_standard is None:
+        with redirect_stderr(io.StringIO()):
+            import essentia
+            import essentia.standard as es
+            try:
+                essentia.log.silent()
+                essentia.log.setLevel(essentia.EAlgorithmLogLevel.SILENT)
+            except Exception:
+                pass
+        _essentia_standard = es
+    return _essentia_standard
+
+
+def essentia_version():
+    """Essentia betöltése (ezzel a TensorFlow is) és a verziója; ImportError, ha nincs telepítve"""
+    essentia_standard()
+    import essentia
+    return getattr(essentia, '__version__', '?')
+
+
+class StageTimer:
+    """Szakaszonkénti idő egy elemzésen belül: lap(név) az előző jelölés óta eltelt időt könyveli"""
+    def __init__(self):
+        self.stages = {}
+        self._mark = time.perf_counter()
+
+    def lap(self, name):
+        now = time.perf_counter()
+        self.stages[name] = self.stages.get(name, 0.0) + now - self._mark
+        self._mark = now
+
+
+class MusicGenreClassifier:
+    """
+    Műfaj osztályozó TensorFlow modellel (Discogs EffNet) + opcionális BPM, leírók, fejek
+    """
+    def __init__(self, models_dir=MODELS_DIR, pooling=DEFAULT_POOLING, trim=DEFAULT_TRIM_MODE, descriptors=(),
+                 heads=None, decoder=None, tempo=True, resample='essentia', patch_cache=None,
+                 beat_tracker='multifeature', excerpt=None, verbose=True):
+        if resample not in RESAMPLE_MODES:
+            raise ValueError(f"Ismeretlen resample mód: {resample}")
+        if beat_tracker not in BEAT_TRACKERS:
+            raise ValueError(f"Ismeretlen beat tracker: {beat_tracker}")
+        self.models_dir = models_dir
+        self.model_loaded = False
+        self.load_error = None
+        self.predictor = None
+        self.labels = None
+        self.hierarchy = None
+        self.pooling = pooling
+        self.trim = trim
+        self.descriptors = DescriptorExtractor(descriptors, log=self._log) if descriptors else None
+        # None: egyetlen modell, lista: multi-head mód (üres lista = minden fej a <models>/heads-ben)
+        self.head_names = heads
+        self.heads = []
+        # False: csak műfaj (BPM nélkül, egyetlen 16 kHz-es dekódolás)
+        self.tempo = tempo
+        self.resample = resample
+        self.beat_tracker = beat_tracker
+        # Csak a jel közepéből ennyi másodperc (None = teljes jel) - olcsó első menethez
+        self.excerpt = excerpt
+        # PatchCache: külön mel front end, a patch-ek számonként egyszer (találatnál nincs dekódolás)
+        self.patch_cache = patch_cache
+        self.front_end = None
+        self.verbose = verbose
+        # Dekóder backend (alap: MonoLoader, vagy formátumonként a benchmark szerint), első használatkor
+        self._decoder = decoder
+
+    @property
+    def decoder(self):
+        if self._decoder is None:
+            self._decoder = AudioDecoder()
+        return self._decoder
+
+    def _log(self, message):
+        if self.verbose:
+            print(message)
+
+    def download_models(self):
+        """Modell fájlok letöltése"""
+        files_to_check = dict(MODEL_FILES)
+        if self.head_names is not None:
+            # Multi-head: a műfaj az embeddingekre tanított fejből jön
+            files_to_check.update(GENRE_HEAD_FILES)
+
+        os.makedirs(self.models_dir, exist_ok=True)
+
+        for filename, url in files_to_check.items():
+            file_path = os.path.join(self.models_dir, filename)
+            if not os.path.exists(file_path):
+                self._log(f"📥 Letöltés: {filename}...")
+                try:
+                    urllib.request.urlretrieve(url, file_path)
+                    size_mb = os.path.getsize(file_path) / (1024*1024)
+                    self._log(f"✅ {filename} letöltve ({size_mb:.1f} MB)")
+                except Exception as e:
+                    self.load_error = f"Letöltési hiba ({filename}): {e}"
+                    self._log(f"❌ {self.load_error}")
+                    return False
+            else:
+                size_mb = os.path.getsize(file_path) / (1024*1024)
+                self._log(f"✅ {filename} létezik ({size_mb:.1f} MB)")
+
+        return True
+
+    def load_model(self):
+        """Modell és címkék betöltése (egyszer)"""
+        if self.model_loaded:
+            return True
+
+        model_path = os.path.join(self.models_dir, "classifier_model.pb")
+        labels_path = os.path.join(self.models_dir, "classifier_labels.json")
+
+        if not os.path.exists(model_path) or not os.path.exists(labels_path):
+            self.load_error = f"Modell fájlok hiányoznak ({self.models_dir})"
+            self._log(f"❌ {self.load_error}")
+            return False
+
+        try:
+            self._log("🤖 TensorFlow modell betöltése...")
+            start_time = time.time()
+            es = essentia_standard()
+
+            # Modell betöltése csendben
+            genre_head = None
+            with redirect_stderr(io.StringIO()):
+                if self.patch_cache is not None:
+                    # Front end külön: a gráf közvetlenül a mel patch-eket kapja
+                    self.front_end = MelFrontEnd()
+                if self.head_names is None:
+                    if self.patch_cache is not None:
+                        self.predictor = PatchPredictor(model_path)
+                    else:
+                        self.predictor = es.TensorflowPredictEffnetDiscogs(graphFilename=model_path)
+                else:
+                    # Backbone egyszer (embedding kimenet), a fejek az embeddingeken
+                    self.heads = discover_heads(os.path.join(self.models_dir, "heads"), names=self.head_names)
+                    genre_head = HeadModel.from_metadata(os.path.join(self.models_dir, GENRE_HEAD_METADATA),
+                                                         name='genre')
+                    backbone = PatchPredictor(model_path, EMBEDDING_OUTPUT) if self.patch_cache is not None else None
+                    self.predictor = MultiHeadPredictor(model_path, genre_head, self.heads, backbone=backbone)
+
+            # Címkék betöltése
+            with open(labels_path, "r") as f:
+                labels_info = json.load(f)
+            self.labels = labels_info["classes"]
+            if genre_head is not None and list(genre_head.labels) != self.labels:
+                # Multi-head módban a műfaj aktivációk a fej saját osztály sorrendjében jönnek
+                self._log(f"⚠️ A műfaj fej címkéi ({len(genre_head.labels)}) eltérnek a classifier_labels.json "
+                          f"sorrendjétől ({len(self.labels)}): a fej metaadata érvényes")
+                self.labels = list(genre_head.labels)
+            # Stílus -> fő műfaj index mátrix egyszer, betöltéskor
+            self.hierarchy = GenreHierarchy(self.labels)
+
+            load_time = time.time() - start_time
+            self._log(f"✅ Modell betöltve ({load_time:.1f}s, {len(self.labels)} műfaj)")
+            if self.head_names is not None:
+                self._log(f"🧠 Multi-head: {len(self.heads)} további fej "
+                          f"({', '.join(h.name for h in self.heads) or '-'})")
+            self.model_loaded = True
+            return True
+
+        except Exception as e:
+            self.load_error = f"Modell betöltési hiba: {e}"
+            self._log(f"❌ {self.load_error}")
+            return False
+
+    def prepare(self):
+        """Letöltés + betöltés, ha még nem történt meg (a lusta API első elemzése előtt)"""
+        return self.model_loaded or (self.download_models() and self.load_model())
+
+    def trim_audio(self, audio, sample_rate):
+        """Csend / zajszerű szakaszok levágása (levágott jel, arány, megtartott szakaszok)"""
+        if self.trim == 'off':
+            return audio, 0.0, None
+        return trim_silence(audio, sample_rate, use_flatness=self.trim == 'noise')
+
+    def extra_columns(self):
+        """
+        A beállításokból adódó opcionális eredmény oszlopok: {oszlop: szöveges-e}
+        (levágott arány, leírók, fej oszlopok - a fejek a load_model után ismertek)
+        """
+        columns = {}
+        if self.trim != 'off':
+            columns['levagott_arany'] = False
+        if self.descriptors is not None:
+            columns.update((column, column in TEXT_COLUMNS) for column in self.descriptors.columns)
+        for head in self.heads:
+            columns[head.name] = True
+            columns[f"{head.name}_conf"] = False
+        return columns
+
+    def describe_audio(self, audio, sample_rate):
+        """Bekapcsolt leírók a már dekódolt jelen ({oszlop: érték})"""
+        if self.descriptors is None:
+            return {}
+        self._log("    🎹 Leírók számítása...")
+        return self.descriptors.compute(audio, sample_rate)
+
+    def predict(self, audio_16k):
+        """
+        Műfaj aktivációk + multi-head módban a további fejek oszlopai (egy backbone futás)
+        audio_16k patch gyorsítótáras módban a (n_patches, 128, 96) mel patch-ek
+        """
+        with redirect_stderr(io.StringIO()):
+            if self.head_names is None:
+                return self.predictor(audio_16k), {}
+            activations, head_activations = self.predictor(audio_16k)
+        return activations, head_columns(head_activations, self.heads, self.pooling)
+
+    def _cache_variant(self):
+        """A gyorsítótár kulcs része: ami a 16 kHz-es jelet (és így a patch-eket) befolyásolja"""
+        source = 'decode' if not self.tempo or self.resample == 'decoder' else 'resample'
+        variant = f"trim={self.trim};16k={source}"
+        # A mentett BPM a beat tracker szintjétől függ (az alapértelmezett kulcs változatlan)
+        if self.tempo and self.beat_tracker != 'multifeature':
+            variant += f";bpm={self.beat_tracker}"
+        return variant
+
+    def _cached_patches(self, file_path):
+        """Használható gyorsítótár bejegyzés (leírókhoz a jel kell, BPM-hez a mentett érték)"""
+        if self.patch_cache is None or self.descriptors is not None:
+            return None
+        cached = self.patch_cache.get(file_path, self._cache_variant())
+        if cached is None or (self.tempo and cached['bpm'] is None):
+            return None
+        return cached
+
+    def estimate_bpm(self, audio_44k, beat_tracker):
+        """BPM a beat-ek közti medián távolságból"""
+        es = essentia_standard()
+        if beat_tracker == 'degara':
+            ticks = es.BeatTrackerDegara()(audio_44k)
+        else:
+            ticks, _ = es.BeatTrackerMultiFeature()(audio_44k)
+        return 60.0 / np.median(np.diff(ticks)) if len(ticks) > 1 else 0
+
+    def analyze_audio(self, file_path, excerpt=None, beat_tracker=None):
+        """
+        Audio elemzés: BPM (44 kHz, ha tempo) + TensorFlow műfaj predikció (16 kHz)
+        Patch gyorsítótár találatnál csak inferencia (dekódolás és mel front end nélkül)
+        excerpt / beat_tracker: a példány beállításának felülírása egy hívásra (kaszkád első menet);
+        részlettel a gyorsítótár nem íródik
+        Hiba esetén {'success': False, 'error': ...}, kivételt nem dob
+        """
+        excerpt = excerpt if excerpt is not None else self.excerpt
+        beat_tracker = beat_tracker or self.beat_tracker
+        try:
+            if not self.prepare():
+                return {'success': False, 'error': self.load_error}
+            self._log(f"  🎵 Feldolgozás: {os.path.basename(file_path)}")
+            timer = StageTimer()
+
+            bpm = 0
+            cached = self._cached_patches(file_path)
+            timer.lap('cache')
+            if cached is not None:
+                # Találat: nincs dekódolás és spektrogram, csak inferencia
+                self._log("    📦 Mel patch-ek a gyorsítótárból...")
+                audio_16k = cached['patches']
+                if excerpt is not None:
+                    # A részletnek megfelelő középső patch-ek
+                    patches_per_sec = SAMPLE_RATE / HOP_SIZE / PATCH_HOP_SIZE
+                    audio_16k = audio_16k[excerpt_slice(len(audio_16k), patches_per_sec, excerpt)]
+                audio_length, trimmed = cached['audio_length'], cached['trimmed']
+                bpm = cached['bpm'] or 0
+                descriptor_values = {}
+            elif not self.tempo:
+                # Csak műfaj elemzés - egyetlen 16 kHz-es dekódolás, 30-50% gyorsabb
+                audio_16k = self.decoder.decode(file_path, 16000)
+                audio_length = len(audio_16k) / 16000.0
+                timer.lap('decode')
+                audio_16k, trimmed, _ = self.trim_audio(audio_16k, 16000)
+                if excerpt is not None:
+                    audio_16k = audio_16k[excerpt_slice(len(audio_16k), 16000, excerpt)]
+                timer.lap('trim')
+                descriptor_values = self.describe_audio(audio_16k, 16000)
+                timer.lap('descriptors')
+            else:
+                if self.resample == 'decoder':
+                    # Dekódolás mindkét frekvencián egy lépésben (ffmpeg backendnél párhuzamosan)
+                    audio_44k, audio_16k = self.decoder.decode_rates(file_path, (44100, 16000))
+                else:
+                    self._log("    🎵 Audio betöltés (44kHz)...")
+                    audio_44k, audio_16k = self.decoder.decode(file_path, 44100), None
+                audio_length = len(audio_44k) / 44100.0
+                timer.lap('decode')
+                audio_44k, trimmed, regions = self.trim_audio(audio_44k, 44100)
+                if regions is not None and audio_16k is not None:
+                    # Ugyanazok a szakaszok a 16kHz-es jelből
+                    audio_16k = cut_regions(audio_16k, 16000, regions)
+                if excerpt is not None:
+                    audio_44k = audio_44k[excerpt_slice(len(audio_44k), 44100, excerpt)]
+                    if audio_16k is not None:
+                        audio_16k = audio_16k[excerpt_slice(len(audio_16k), 16000, excerpt)]
+                timer.lap('trim')
+
+                self._log("    📊 BPM számítás...")
+                es = essentia_standard()
+                bpm = self.estimate_bpm(audio_44k, beat_tracker)
+                timer.lap('bpm')
+                descriptor_values = self.describe_audio(audio_44k, 44100)
+                timer.lap('descriptors')
+
+                if audio_16k is None:
+                    self._log("    🔄 Essentia resample...")
+                    audio_16k = es.Resample(inputSampleRate=44100, outputSampleRate=16000)(audio_44k)
+                timer.lap('resample')
+
+            if self.patch_cache is not None and cached is None:
+                self._log("    🎛️  Mel patch-ek számítása és mentése...")
+                audio_16k = self.front_end(audio_16k)
+                if excerpt is None:
+                    self.patch_cache.put(file_path, self._cache_variant(), audio_16k, audio_length, trimmed,
+                                         bpm if self.tempo else None)
+                timer.lap('melspectrogram')
+
+            self._log("    🤖 Műfaj predikció..." if self.tempo else "    🤖 Műfaj predikció (BPM kihagyva)...")
+            activations, head_values = self.predict(audio_16k)
+            timer.lap('predict')
+
+            # Top 5 műfaj (vectorizált pooling + argpartition top-k) + fő műfaj részesedések
+            scores = pool_activations(activations, self.pooling)
+            top_indices, top_values = top_k_batch(scores)
+            genre_results = [(self.labels[i], float(v)) for i, v in zip(top_indices[0], top_values[0])]
+            parent_scores = self.hierarchy.parent_scores(scores)
+            parent_index, parent_share = self.hierarchy.top_parent(parent_scores)
+            timer.lap('pooling')
+
+            return {
+                'success': True,
+                'bpm': round(bpm, 1),
+                'genres': genre_results,
+                'genre_ids': top_indices[0].tolist(),
+                'scores': scores,
+                'parent_scores': parent_scores,
+                'parent': (self.hierarchy.parents[int(parent_index)], float(parent_share)),
+                'audio_length': audio_length,  # másodperc (levágás előtt)
+                'trimmed': trimmed,
+                'descriptors': descriptor_values,
+                'heads': head_values,
+                'stages': timer.stages  # szakaszonkénti idő másodpercben (benchmark)
+            }
+
+        except Exception as e:
+            return {
+                'success': False,
+                'error': str(e)
+            }
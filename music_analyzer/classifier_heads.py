@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Multi-head mód: a Discogs EffNet backbone fájlonként egyszer fut (embedding kimenet),
+a műfaj és a további kis osztályozó fejek (hangulat, hangszer, ének / instrumentális)
+ugyanazokon az embeddingeken
+
+Fejek: models/heads/<név>.pb + <név>.json (Essentia modell metaadat: classes, schema)
+"""
+import os
+import re
+import json
+
+import numpy as np
+
+from .genre_pooling import DEFAULT_POOLING, pool_activations
+
+HEADS_DIR = os.path.join("models", "heads")
+
+# A backbone embedding kimenete (PartitionedCall:0 = a beépített műfaj aktivációk)
+EMBEDDING_OUTPUT = "PartitionedCall:1"
+
+# Műfaj fej az embeddingekhez (ugyanaz a 400 Discogs stílus, mint a teljes modellben)
+GENRE_HEAD_MODEL = "genre_discogs400-discogs-effnet-1.pb"
+GENRE_HEAD_METADATA = "genre_discogs400-discogs-effnet-1.json"
+GENRE_HEAD_FILES = {
+    GENRE_HEAD_MODEL: "https://essentia.upf.edu/models/classification-heads/genre_discogs400/"
+                      "genre_discogs400-discogs-effnet-1.pb",
+    GENRE_HEAD_METADATA: "https://essentia.upf.edu/models/classification-heads/genre_discogs400/"
+                         "genre_discogs400-discogs-effnet-1.json",
+}
+
+
+def head_name(file_name):
+    """Rövid fej név a fájlnévből (mood_happy-discogs-effnet-1.json -> mood_happy)"""
+    stem = os.path.splitext(os.path.basename(file_name))[0]
+    return re.sub(r'-discogs-effnet.*$', '', stem)
+
+
+class HeadModel:
+    """Egy osztályozó fej az EffNet embeddingeken"""
+    def __init__(self, name, graph_path, labels, input_name, output_name):
+        self.name = name
+        self.graph_path = graph_path
+        self.labels = labels
+        self.input_name = input_name
+        self.output_name = output_name
+        self.predictor = None
+
+    @classmethod
+    def from_metadata(cls, metadata_path, name=None):
+        """Fej a mellette lévő .pb-ből és a JSON metaadatból (classes, schema)"""
+        with open(metadata_path, "r") as f:
+            metadata = json.load(f)
+        graph_path = os.path.splitext(metadata_path)[0] + ".pb"
+        if not os.path.exists(graph_path):
+            raise FileNotFoundError(f"Hiányzó fej modell: {graph_path}")
+
+        schema = metadata.get("schema", {})
+        inputs = schema.get("inputs") or [{"name": "model/Placeholder"}]
+        outputs = schema.get("outputs") or [{"name": "model/Softmax"}]
+        predictions = [o for o in outputs if o.get("output_purpose") == "predictions"] or outputs
+        return cls(name or head_name(metadata_path), graph_path, metadata["classes"],
+                   inputs[0]["name"], predictions[0]["name"])
+
+    def load(self):
+        """TensorflowPredict2D példány (egyszer, fork előtt)"""
+        if self.predictor is None:
+            from .classifier import essentia_standard
+            self.predictor = essentia_standard().TensorflowPredict2D(
+                graphFilename=self.graph_path, input=self.input_name, output=self.output_name
+            )
+        return self.predictor
+
+    def __call__(self, embeddings):
+        """(n_patches, 1280) embedding -> (n_patches, n_classes) aktiváció"""
+        return self.load()(embeddings)
+
+
+def discover_heads(heads_dir=HEADS_DIR, names=None):
+    """
+    Fejek a könyvtárból (minden .json, amihez .pb tartozik)
+    names: csak ezek (rövid név vagy fájlnév tő), None / üres = mind
+    """
+    if not os.path.isdir(heads_dir):
+        if names:
+            raise FileNotFoundError(f"Fej könyvtár nem található: {heads_dir}")
+        return []
+
+    heads = []
+    for entry in sorted(os.listdir(heads_dir)):
+        if not entry.endswith(".json"):
+            continue
+        stem = os.path.splitext(entry)[0]
+        if names and head_name(entry) not in names and stem not in names:
+            continue
+        heads.append(HeadModel.from_metadata(os.path.join(heads_dir, entry)))
+
+    missing = set(names or ()) - set(h.name for h in heads) - set(
+        os.path.splitext(os.path.basename(h.graph_path))[0] for h in heads
+    )
+    if missing:
+        raise FileNotFoundError(f"Nem található fej: {', '.join(sorted(missing))} ({heads_dir})")
+    return heads
+
+
+class MultiHeadPredictor:
+    """
+    Backbone (embedding) egyszer + műfaj fej + tetszőleges számú további fej
+    backbone: kész hívható (pl. mel patch-eken futó PatchPredictor), alap: a teljes EffNet a jelen
+    """
+    def __init__(self, backbone_path, genre_head, heads, backbone=None):
+        if backbone is None:
+            from .classifier import essentia_standard
+            es = essentia_standard()
+            backbone = es.TensorflowPredictEffnetDiscogs(graphFilename=backbone_path, output=EMBEDDING_OUTPUT)
+        self.backbone = backbone
+        self.genre_head = genre_head
+        self.heads = heads
+        genre_head.load()
+        for head in heads:
+            head.load()
+
+    def __call__(self, audio_16k):
+        """(műfaj aktivációk, {fej név: aktivációk}) egyetlen backbone futásból (jel vagy mel patch-ek)"""
+        embeddings = self.backbone(audio_16k)
+        return self.genre_head(embeddings), dict((head.name, head(embeddings)) for head in self.heads)
+
+
+def head_columns(head_activations, heads, pooling=DEFAULT_POOLING):
+    """
+    Fej kimenetek eredmény oszlopokká: <fej> = legerősebb címke, <fej>_conf = konfidencia
+    A patch-ek összesítése ugyanazzal a pooling módszerrel, mint a műfajnál
+    """
+    columns = {}
+    for head in heads:
+        scores = pool_activations(head_activations[head.name], pooling)
+        best = int(np.argmax(scores))
+        columns[head.name] = head.labels[best]
+        columns[f"{head.name}_conf"] = round(float(scores[best]), 4)
+    return columns
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Oszlopos kimenet (Parquet / Arrow IPC) a teljes aktivációs vektorral
+A 400 osztályos vektor float16 fixed-size listaként, a műfajok és a fő műfaj dictionary-kódolva
+(az index a modell osztály / szülő indexe), row group-onként írva, ahogy az eredmények beérkeznek
+"""
+import os
+import json
+import importlib.util
+
+import numpy as np
+
+from .genre_pooling import POOLING_METHODS, top_k_batch
+from .genre_hierarchy import GenreHierarchy, display_name
+from .result_store import is_extra_column
+
+# Opcionális függőség - csak az oszlopos kimenethez kell; az import ~1-1.5s,
+# ezért csak a tényleges írásnál / olvasásnál töltődik be (--help, CSV futás nem fizeti)
+PYARROW_AVAILABLE = importlib.util.find_spec('pyarrow') is not None
+
+# Ennyi sor kerül egy row group-ba / record batch-be
+ROW_GROUP_SIZE = 1024
+TOP_K = 5
+
+# Ezek a kiterjesztések Arrow IPC (Feather v2) fájlt jelentenek, minden más Parquet
+ARROW_EXTENSIONS = ('.arrow', '.feather', '.ipc')
+
+
+def _arrow():
+    """pyarrow és pyarrow.parquet (első híváskor importálva)"""
+    if not PYARROW_AVAILABLE:
+        raise RuntimeError("pyarrow nincs telepítve (pip install pyarrow)")
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    return pa, pq
+
+
+class ColumnarWriter:
+    """
+    Inkrementális Parquet / Arrow író a teljes aktivációs vektorokkal
+    extra_columns: {oszlop: szöveges-e} - az opcionális oszlopok (levágott arány, leírók, fejek)
+    ismert típussal, a séma ezekből előre épül, nem az első row group soraiból
+    """
+    def __init__(self, path, labels, extra_columns=None, row_group_size=ROW_GROUP_SIZE):
+        pa, _ = _arrow()
+
+        self.path = path
+        self.labels = labels
+        self.row_group_size = row_group_size
+        self.n_classes = len(labels)
+        self.is_arrow = os.path.splitext(path)[1].lower() in ARROW_EXTENSIONS
+        self.rows_written = 0
+
+        # Fix szótár minden batch-hez: az index a modell osztály indexe, ill. a fő műfaj indexe
+        self.hierarchy = GenreHierarchy(labels)
+        self._genre_dictionary = pa.array([display_name(label) for label in labels])
+        self._parent_dictionary = pa.array(self.hierarchy.parents)
+        self._pooling_dictionary = pa.array(POOLING_METHODS)
+
+        self.schema = None
+        self.extra_types = dict(extra_columns or {})
+        self.extra_columns = []
+        self._dropped = set()
+        self._writer = None
+        self._pending = []
+
+    def _open(self, rows):
+        """
+        Séma és író létrehozása az első batch-nél: a megadott extra oszlopok a megadott típussal,
+        az előre nem ismert extra oszlopok az első batch soraiból, az első nem üres érték típusával
+        (szöveg / float32)
+        """
+        pa, pq = _arrow()
+        extra_types = dict(self.extra_types)
+        guessed = {}
+        for row in rows:
+            for key, value in row.items():
+                if is_extra_column(key) and key not in extra_types and guessed.get(key) is None:
+                    guessed[key] = None if value is None else isinstance(value, str)
+        extra_types.update(guessed)
+        self.extra_columns = list(extra_types)
+
+        genre_type = pa.dictionary(pa.int16(), pa.string())
+        fields = [
+            pa.field('path', pa.string()),
+            pa.field('fajl', pa.string()),
+            pa.field('BPM', pa.float32()),
+            pa.field('audio_hossz_sec', pa.float32()),
+            pa.field('feldolgozasi_ido_sec', pa.float32()),
+            pa.field('feldolgozas_ideje', pa.string()),
+            pa.field('pooling', pa.dictionary(pa.int8(), pa.string())),
+        ]
+        for column, is_text in extra_types.items():
+            fields.append(pa.field(column, pa.string() if is_text else pa.float32()))
+        for i in range(1, TOP_K + 1):
+            fields.append(pa.field(f'Genre_{i}', genre_type))
+            fields.append(pa.field(f'Conf_{i}', pa.float32()))
+        fields.append(pa.field('Parent_Genre', pa.dictionary(pa.int8(), pa.string())))
+        fields.append(pa.field('Parent_Conf', pa.float32()))
+        fields.append(pa.field('activations', pa.list_(pa.float16(), self.n_classes)))
+
+        # Az aktivációs vektor indexeihez tartozó eredeti címkék
+        metadata = {'labels': json.dumps(self.labels), 'parents': json.dumps(self.hierarchy.parents),
+                    'activation_dtype': 'float16'}
+        self.schema = pa.schema(fields, metadata=metadata)
+
+        if self.is_arrow:
+            self._writer = pa.ipc.new_file(self.path, self.schema)
+        else:
+            self._writer = pq.ParquetWriter(self.path, self.schema, compression='zstd')
+
+    def add(self, path, row, scores):
+        """Egy eredmény hozzáadása (CSV-stílusú sor + összesített aktivációk)"""
+        scores = np.asarray(scores, dtype=np.float32)
+        if scores.shape != (self.n_classes,):
+            raise ValueError(f"Aktivációs vektor alak: {scores.shape}, várt: ({self.n_classes},)")
+        self._pending.append((path, row, scores))
+        if len(self._pending) >= self.row_group_size:
+            self.flush()
+
+    def _pooling_indices(self, rows):
+        """Pooling módszer szótár-kódolása (fix szótár a POOLING_METHODS alapján)"""
+        pa, _ = _arrow()
+        indices = [POOLING_METHODS.index(row['pooling']) for row in rows]
+        return pa.DictionaryArray.from_arrays(pa.array(indices, type=pa.int8()), self._pooling_dictionary)
+
+    def _warn_dropped(self, rows):
+        """A sémában nem szereplő, később megjelenő extra oszlopokról egyszeri figyelmeztetés"""
+        for row in rows:
+            for key in row:
+                if is_extra_column(key) and key not in self.extra_columns and key not in self._dropped:
+                    self._dropped.add(key)
+                    print(f"⚠️ Oszlopos kimenet: a(z) '{key}' oszlop nincs a sémában, kimarad")
+
+    def flush(self):
+        """Összegyűlt sorok kiírása egy row group-ként"""
+        if not self._pending:
+            return
+
+        pa, _ = _arrow()
+        paths = [p for p, _, _ in self._pending]
+        rows = [r for _, r, _ in self._pending]
+        if self._writer is None:
+            self._open(rows)
+        self._warn_dropped(rows)
+        matrix = np.stack([s for _, _, s in self._pending])
+
+        # Top-k és a fő műfaj részesedések az egész batch-re egyszerre (egy mátrixszorzás)
+        top_indices, top_values = top_k_batch(matrix, TOP_K)
+        parent_indices, parent_values = self.hierarchy.top_parent(self.hierarchy.parent_scores(matrix))
+
+        columns = [
+            pa.array(paths, type=pa.string()),
+            pa.array([r['fajl'] for r in rows], type=pa.string()),
+            pa.array([r.get('BPM') for r in rows], type=pa.float32()),
+            pa.array([r.get('audio_hossz_sec') for r in rows], type=pa.float32()),
+            pa.array([r.get('feldolgozasi_ido_sec') for r in rows], type=pa.float32()),
+            pa.array([r.get('feldolgozas_ideje') for r in rows], type=pa.string()),
+            self._pooling_indices(rows),
+        ]
+        for column, field in zip(self.extra_columns, self.schema.types[len(columns):]):
+            columns.append(pa.array([r.get(column) for r in rows], type=field))
+        for i in range(TOP_K):
+            columns.append(pa.DictionaryArray.from_arrays(
+                pa.array(top_indices[:, i].astype(np.int16)), self._genre_dictionary
+            ))
+            columns.append(pa.array(top_values[:, i].astype(np.float32)))
+        columns.append(pa.DictionaryArray.from_arrays(
+            pa.array(parent_indices.astype(np.int8)), self._parent_dictionary
+        ))
+        columns.append(pa.array(parent_values.astype(np.float32)))
+
+        flat = pa.array(matrix.astype(np.float16).ravel(), type=pa.float16())
+        columns.append(pa.FixedSizeListArray.from_arrays(flat, self.n_classes))
+
+        batch = pa.RecordBatch.from_arrays(columns, schema=self.schema)
+        if self.is_arrow:
+            self._writer.write_batch(batch)
+        else:
+            self._writer.write_table(pa.Table.from_batches([batch]), row_group_size=len(self._pending))
+
+        self.rows_written += len(self._pending)
+        self._pending = []
+
+    def close(self):
+        """Maradék sorok kiírása és a fájl lezárása"""
+        self.flush()
+        if self._writer is None:
+            self._open([])
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def read_activations(path):
+    """
+    Oszlopos kimenet visszaolvasása: (tábla, (n, n_classes) float16 mátrix, címkék)
+    """
+    pa, pq = _arrow()
+    if os.path.splitext(path)[1].lower() in ARROW_EXTENSIONS:
+        with pa.memory_map(path) as source:
+            table = pa.ipc.open_file(source).read_all()
+    else:
+        table = pq.read_table(path)
+
+    labels = json.loads(table.schema.metadata[b'labels'])
+    column = table.column('activations').combine_chunks()
+    matrix = column.flatten().to_numpy(zero_copy_only=False).reshape(len(table), len(labels))
+    return table, matrix, labels
+
+
+def self_test():
+    """
+    Séma ellenőrzés két kis row group-pal: az első batch-ben csak üres 'hangnem' (leíró hiba),
+    a fej oszlop csak a második batch-ben jelenik meg - egyik sem veszhet el; True, ha minden rendben
+    """
+    import tempfile
+
+    labels = [f"{parent}---{child}" for parent in ('Rock', 'Electronic') for child in ('A', 'B', 'C')]
+    extra_columns = {'hangnem': True, 'hangnem_erosseg': False, 'mood': True, 'mood_conf': False}
+    base = {'BPM': 120.0, 'audio_hossz_sec': 60.0, 'feldolgozasi_ido_sec': 1.0,
+            'feldolgozas_ideje': '2026-01-01 00:00:00', 'pooling': POOLING_METHODS[0]}
+    rows = [
+        dict(base, fajl='a.mp3', hangnem=None, hangnem_erosseg=None),
+        dict(base, fajl='b.mp3', hangnem=None, hangnem_erosseg=None),
+        dict(base, fajl='c.mp3', hangnem='A minor', hangnem_erosseg=0.8, mood='happy', mood_conf=0.9),
+    ]
+    checks = []
+
+    def check(name, ok):
+        print(f"  {'✅' if ok else '❌'} {name}")
+        checks.append(ok)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for extension in ('.parquet', '.arrow'):
+            path = os.path.join(tmp, 'selftest' + extension)
+            with ColumnarWriter(path, labels, extra_columns, row_group_size=2) as writer:
+                for i, row in enumerate(rows):
+                    writer.add(row['fajl'], row, np.eye(len(labels), dtype=np.float32)[i])
+            table, matrix, _ = read_activations(path)
+            check(f"{extension}: üresen kezdődő szöveges oszlop később szöveggel",
+                  table.column('hangnem').to_pylist() == [None, None, 'A minor'])
+            check(f"{extension}: csak a második row group-ban megjelenő oszlop megmarad",
+                  table.column('mood').to_pylist() == [None, None, 'happy']
+                  and table.column('mood_conf').to_pylist()[2] is not None)
+            check(f"{extension}: sorok és aktivációk", len(table) == 3 and matrix.shape == (3, len(labels)))
+    return all(checks)
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Opcionális zenei leírók (hangnem, hangosság, táncolhatóság) a már dekódolt jelen
+Nincs újabb dekódolás: ugyanaz a puffer, amin a BPM számítás fut
+
+A keretezés + ablakozás + spektrum fájlonként egyszer fut (spectra), a hangnem (HPCP) ebből
+számol; a hangosság (EBU R128: K-súlyozott 400 ms-os blokkok) és a táncolhatóság (DFA) időtartománybeli,
+saját blokkokkal dolgozik, spektrumot nem használ - ezeknél nincs megosztható keretezés
+"""
+import numpy as np
+
+DESCRIPTORS = ('key', 'loudness', 'danceability')
+
+# Leíró -> eredmény oszlopok (a CSV / SQLite / Parquet kimenetben)
+DESCRIPTOR_COLUMNS = {
+    'key': ('hangnem', 'hangnem_erosseg'),
+    'loudness': ('loudness_lufs', 'loudness_range_lu'),
+    'danceability': ('tancolhatosag',),
+}
+# A közös spektrumot használó leírók (a többi időtartománybeli)
+SPECTRAL_DESCRIPTORS = ('key',)
+# Szöveges leíró oszlopok (a többi szám)
+TEXT_COLUMNS = ('hangnem',)
+# A spektrum keretezése (a KeyExtractor alapbeállításai: 4096 / 4096, Hann ablak)
+FRAME_SIZE = 4096
+HOP_SIZE = 4096
+# HPCP / hangnem beállítások (a KeyExtractor alapértékei)
+KEY_PROFILE = 'bgate'
+MIN_FREQUENCY = 25
+MAX_FREQUENCY = 3500
+PEAK_THRESHOLD = 0.0001
+
+
+class DescriptorExtractor:
+    """
+    Leírók számítása egy dekódolt mono jelen
+    Az Essentia algoritmusok mintavételi frekvenciánként egyszer jönnek létre
+    és fájlról fájlra újrahasznosulnak (nincs fájlonkénti konfigurálás)
+    """
+    def __init__(self, names, log=print):
+        unknown = [name for name in names if name not in DESCRIPTORS]
+        if unknown:
+            raise ValueError(f"Ismeretlen leíró: {', '.join(unknown)}")
+        self.names = tuple(names)
+        self.log = log
+        self._algorithms = {}
+
+    @property
+    def columns(self):
+        """A bekapcsolt leírók oszlopnevei"""
+        return [column for name in self.names for column in DESCRIPTOR_COLUMNS[name]]
+
+    def _algorithm(self, name, sample_rate):
+        """Algoritmus példány (lusta létrehozás, cache-elve)"""
+        algorithm = self._algorithms.get((name, sample_rate))
+        if algorithm is None:
+            from .classifier import essentia_standard
+            es = essentia_standard()
+            if name == 'spectrum':
+                algorithm = (es.Windowing(type='hann', size=FRAME_SIZE), es.Spectrum(size=FRAME_SIZE))
+            elif name == 'key':
+                algorithm = (
+                    es.SpectralPeaks(sampleRate=sample_rate, minFrequency=MIN_FREQUENCY, maxFrequency=MAX_FREQUENCY,
+                                     magnitudeThreshold=PEAK_THRESHOLD, maxPeaks=60, orderBy='magnitude'),
+                    es.SpectralWhitening(sampleRate=sample_rate, maxFrequency=MAX_FREQUENCY),
+                    es.HPCP(sampleRate=sample_rate, size=12, minFrequency=MIN_FREQUENCY, maxFrequency=MAX_FREQUENCY,
+                            weightType='cosine', nonLinear=False),
+                    es.Key(profileType=KEY_PROFILE, pcpSize=12),
+                )
+            elif name == 'loudness':
+                algorithm = (es.StereoMuxer(), es.LoudnessEBUR128(sampleRate=sample_rate))
+            else:
+                algorithm = es.Danceability(sampleRate=sample_rate)
+            self._algorithms[(name, sample_rate)] = algorithm
+        return algorithm
+
+    def spectra(self, audio, sample_rate):
+        """Ablakozott keretek magnitúdó spektruma ((n_keret, FRAME_SIZE / 2 + 1) mátrix), egyszer fájlonként"""
+        from .classifier import essentia_standard
+        es = essentia_standard()
+        window, spectrum = self._algorithm('spectrum', sample_rate)
+        frames = es.FrameGenerator(audio, frameSize=FRAME_SIZE, hopSize=HOP_SIZE, startFromZero=True)
+        return np.array([spectrum(window(frame)) for frame in frames], dtype=np.float32)
+
+    def _key(self, audio, sample_rate, spectra):
+        # Keretenkénti HPCP a közös spektrumból, a hangnem az átlagolt profilból (mint a KeyExtractor)
+        peaks, whitening, hpcp, key_algorithm = self._algorithm('key', sample_rate)
+        profiles = []
+        for magnitudes in spectra:
+            frequencies, peak_magnitudes = peaks(magnitudes)
+            profiles.append(hpcp(frequencies, whitening(magnitudes, frequencies, peak_magnitudes)))
+        if not profiles:
+            raise ValueError("túl rövid jel a hangnemhez")
+        profile = np.mean(profiles, axis=0)
+        profile = (profile / max(float(profile.max()), 1e-12)).astype(np.float32)
+        key, scale, strength, _ = key_algorithm(profile)
+        return {'hangnem': f"{key} {scale}", 'hangnem_erosseg': round(float(strength), 3)}
+
+    def _loudness(self, audio, sample_rate, spectra):
+        # EBU R128 sztereó bemenetet vár: a mono jel mindkét csatornára (dual mono)
+        muxer, loudness = self._algorithm('loudness', sample_rate)
+        _, _, integrated, loudness_range = loudness(muxer(audio, audio))
+        return {'loudness_lufs': round(float(integrated), 2), 'loudness_range_lu': round(float(loudness_range), 2)}
+
+    def _danceability(self, audio, sample_rate, spectra):
+        danceability, _ = self._algorithm('danceability', sample_rate)(audio)
+        return {'tancolhatosag': round(float(danceability), 3)}
+
+    def compute(self, audio, sample_rate):
+        """
+        Bekapcsolt leírók egy jelre: {oszlop: érték}
+        Egy leíró hibája nem buktatja el a fájlt, az oszlopai üresek maradnak (figyelmeztetés a log-on)
+        """
+        values = {}
+        spectra = None
+        for name in self.names:
+            try:
+                if name in SPECTRAL_DESCRIPTORS and spectra is None:
+                    spectra = self.spectra(audio, sample_rate)
+                values.update(getattr(self, '_' + name)(audio, sample_rate, spectra))
+            except Exception as e:
+                self.log(f"    ⚠️ {name} leíró hiba: {e}")
+                values.update((column, None) for column in DESCRIPTOR_COLUMNS[name])
+        return values
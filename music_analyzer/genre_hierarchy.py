@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Fő műfaj (szülő) összesítés a Discogs 'Szülő---Stílus' címkékből
+A stílus -> szülő hozzárendelés egyszer, index mátrixként épül fel; a szülő pontszámok
+egyetlen mátrixszorzással jönnek (akár egy egész batch aktivációira egyszerre)
+
+A megjelenítési név ('Funk / Soul / Disco') nem bontható vissza egyértelműen,
+ezért a szülő mindig az eredeti címkéből és az osztály indexéből származik
+"""
+import numpy as np
+
+LABEL_SEPARATOR = '---'
+DISPLAY_SEPARATOR = ' / '
+
+
+def display_name(label):
+    """'Electronic---House' -> 'Electronic / House'"""
+    return label.replace(LABEL_SEPARATOR, DISPLAY_SEPARATOR)
+
+
+def encode_ids(indices):
+    """Osztály indexek tömör szöveges alakja a CSV / NDJSON sorokhoz ('208 197 3')"""
+    return " ".join(str(int(i)) for i in indices)
+
+
+class GenreHierarchy:
+    """
+    Stílus -> szülő index: parent_of[stílus] = szülő index, matrix (n_stílus, n_szülő) 0/1
+    A szülők az első előfordulás sorrendjében (stabil, a címkefájlból determinisztikus)
+    """
+    def __init__(self, labels):
+        self.labels = list(labels)
+        parent_index = {}
+        parent_of = [parent_index.setdefault(label.split(LABEL_SEPARATOR, 1)[0], len(parent_index))
+                     for label in self.labels]
+        self.parents = list(parent_index)
+        self.parent_of = np.array(parent_of, dtype=np.int16)
+        self.matrix = np.zeros((len(self.labels), len(self.parents)), dtype=np.float32)
+        self.matrix[np.arange(len(self.labels)), self.parent_of] = 1.0
+
+    def parent_scores(self, scores):
+        """
+        (n_classes,) vagy (n_files, n_classes) aktivációk -> szülőnkénti részesedés
+        (a stílusok aktivációjának összege a teljes aktivációs tömeg arányában, soronként 1)
+        """
+        totals = np.asarray(scores, dtype=np.float32) @ self.matrix
+        mass = totals.sum(axis=-1, keepdims=True)
+        return totals / np.maximum(mass, 1e-12)
+
+    def top_parent(self, parent_scores):
+        """Legerősebb szülő (indexek, részesedések) - batch-re vagy egyetlen vektorra"""
+        parent_scores = np.asarray(parent_scores)
+        indices = np.argmax(parent_scores, axis=-1)
+        return indices, np.take_along_axis(parent_scores, np.expand_dims(indices, -1), axis=-1)[..., 0]
+
+    def row_columns(self, genre_ids, parent_scores):
+        """Eredménysor oszlopai: fő műfaj (név, id, részesedés) + a top műfajok osztály indexei"""
+        index, share = self.top_parent(parent_scores)
+        return {
+            'Parent_Genre': self.parents[int(index)],
+            'Parent_id': int(index),
+            'Parent_Conf': round(float(share), 4),
+            'Genre_ids': encode_ids(genre_ids),
+        }
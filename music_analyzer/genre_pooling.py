@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Aktivációk összesítése a teljes számon (minden patch-en)
+Vektorizált pooling + batch top-k a Discogs EffNet kimenetéhez
+"""
+import numpy as np
+
+# Választható pooling módszerek (CLI: --pooling)
+POOLING_METHODS = ('mean', 'max', 'trimmed', 'weighted', 'first')
+DEFAULT_POOLING = 'mean'
+
+# Trimmed-mean: ennyi arányt vágunk le mindkét végéről patch-enként
+DEFAULT_TRIM = 0.1
+
+
+def _as_patch_matrix(activations):
+    """Aktivációk (n_patches, n_classes) float32 mátrixként"""
+    matrix = np.asarray(activations, dtype=np.float32)
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    if matrix.ndim != 2 or matrix.shape[0] == 0:
+        raise ValueError(f"Érvénytelen aktiváció alak: {matrix.shape}")
+    return matrix
+
+
+def trimmed_mean(matrix, trim=DEFAULT_TRIM):
+    """Osztályonkénti átlag a szélső patch-ek levágásával"""
+    n_patches = matrix.shape[0]
+    cut = int(n_patches * trim)
+    if cut == 0:
+        return matrix.mean(axis=0)
+    # Oszloponkénti rendezés, majd a két vég levágása egyetlen szeleteléssel
+    ordered = np.sort(matrix, axis=0)
+    return ordered[cut:n_patches - cut].mean(axis=0)
+
+
+def confidence_weighted(matrix):
+    """Súlyozott átlag - a patch súlya a legerősebb aktivációja"""
+    weights = matrix.max(axis=1)
+    total = weights.sum()
+    if total <= 0:
+        return matrix.mean(axis=0)
+    return weights @ matrix / total
+
+
+def pool_activations(activations, method=DEFAULT_POOLING, trim=DEFAULT_TRIM):
+    """
+    (n_patches, n_classes) aktivációk összesítése egy (n_classes,) vektorrá
+    """
+    matrix = _as_patch_matrix(activations)
+
+    if method == 'mean':
+        return matrix.mean(axis=0)
+    if method == 'max':
+        return matrix.max(axis=0)
+    if method == 'trimmed':
+        return trimmed_mean(matrix, trim)
+    if method == 'weighted':
+        return confidence_weighted(matrix)
+    if method == 'first':
+        # Régi viselkedés: csak az első patch
+        return matrix[0]
+
+    raise ValueError(f"Ismeretlen pooling módszer: {method}")
+
+
+def top_k_batch(scores, k=5):
+    """
+    Batch top-k argpartition-nel több fájlra egyszerre
+
+    scores: (n_files, n_classes) mátrix (vagy egyetlen (n_classes,) vektor)
+    Visszatérés: (indexek, értékek), mindkettő (n_files, k), csökkenő sorrendben
+    """
+    scores = np.asarray(scores)
+    if scores.ndim == 1:
+        scores = scores[np.newaxis, :]
+
+    k = min(k, scores.shape[1])
+    # Rendezetlen top-k soronként, majd csak a k elem rendezése
+    top = np.argpartition(scores, -k, axis=1)[:, -k:]
+    top_values = np.take_along_axis(scores, top, axis=1)
+    order = np.argsort(-top_values, axis=1)
+    top = np.take_along_axis(top, order, axis=1)
+    return top, np.take_along_axis(top_values, order, axis=1)
+
+
+def top_genres(scores, labels, k=5):
+    """Egy fájl top-k műfaja (címke, konfidencia) párokként"""
+    indices, values = top_k_batch(scores, k)
+    return [(labels[i], float(v)) for i, v in zip(indices[0], values[0])]
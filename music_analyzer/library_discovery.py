@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""
+Zenei könyvtár bejárása: rekurzív os.scandir, fájllista / stdin bemenet,
+determinisztikus node sharding (--shard i/n) útvonal hash alapján
+"""
+import os
+import sys
+import hashlib
+import argparse
+
+SUPPORTED_FORMATS = ('.mp3', '.wav', '.flac', '.ogg', '.m4a')
+DEFAULT_AUDIO_DIR = "audio_mp3"
+
+
+def is_supported(name):
+    """Támogatott audio kiterjesztés-e"""
+    return name.lower().endswith(SUPPORTED_FORMATS)
+
+
+def parse_shard(value):
+    """'i/n' shard specifikáció (0 <= i < n) argparse típusként"""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Érvénytelen shard: '{value}' (formátum: i/n, pl. 0/4)")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"Érvénytelen shard: '{value}' (0 <= i < n kell)")
+    return index, count
+
+
+def shard_of(path, count):
+    """
+    Útvonal shard indexe - stabil hash, minden gépen és futásban ugyanaz
+    (a Python beépített hash()-e folyamatonként véletlenített, ezért nem jó)
+    """
+    digest = hashlib.blake2b(path.encode('utf-8', 'surrogateescape'), digest_size=8).digest()
+    return int.from_bytes(digest, 'big') % count
+
+
+def scan_directory(root, recursive=True):
+    """
+    Audio fájlok bejárása os.scandir-rel: (relatív útvonal, méret) párok
+    A méret a DirEntry stat eredményéből jön, nincs külön getsize hívás
+    """
+    stack = [root]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        elif is_supported(entry.name) and entry.is_file():
+                            yield os.path.relpath(entry.path, root), entry.stat().st_size
+                    except OSError:
+                        # Eltűnt / elérhetetlen bejegyzés - kihagyjuk
+                        continue
+        except OSError as e:
+            print(f"⚠️ Könyvtár nem olvasható: {current} ({e})", file=sys.stderr)
+
+
+def read_file_list(source):
+    """
+    Útvonalak fájllistából vagy stdin-ről ('-'): (útvonal, méret) párok
+    Üres és '#' kezdetű sorok kihagyva, nem létező fájlok figyelmeztetéssel
+    """
+    stream = sys.stdin if source == '-' else open(source, 'r', encoding='utf-8')
+    try:
+        for line in stream:
+            path = line.strip()
+            if not path or path.startswith('#'):
+                continue
+            if not is_supported(path):
+                continue
+            try:
+                yield path, os.stat(path).st_size
+            except OSError as e:
+                print(f"⚠️ Fájl nem elérhető: {path} ({e.strerror})", file=sys.stderr)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def stream_paths(stream=None, shard=None):
+    """
+    Útvonalak folyamatosan, ahogy a bemenetre (alap: stdin) érkeznek - nincs előzetes
+    beolvasás és rendezés, így az első eredmény az első sor után elkészülhet
+    Minden útvonal továbbmegy (a hibás / nem támogatott fájl hibaeredményt kap)
+    """
+    stream = stream or sys.stdin
+    for line in stream:
+        path = line.strip()
+        if not path or path.startswith('#'):
+            continue
+        if shard is not None and shard_of(path, shard[1]) != shard[0]:
+            continue
+        yield path
+
+
+def discover(audio_dir=DEFAULT_AUDIO_DIR, file_list=None, shard=None, recursive=True):
+    """
+    Feldolgozandó fájlok (útvonal, méret) listája rendezve, shard szűréssel
+
+    file_list megadásakor a könyvtár helyett a listából olvasunk ('-' = stdin)
+    shard: (i, n) pár - csak a hash szerint i-edik szeletbe eső fájlok
+    """
+    if file_list is not None:
+        entries = read_file_list(file_list)
+    else:
+        entries = scan_directory(audio_dir, recursive)
+
+    if shard is not None:
+        index, count = shard
+        entries = (entry for entry in entries if shard_of(entry[0], count) == index)
+
+    return sorted(entries)
+
+
+def check_audio_directory(audio_dir=DEFAULT_AUDIO_DIR, file_list=None, shard=None, recursive=True):
+    """
+    Audio könyvtár ellenőrzése (vagy fájllista beolvasása)
+    Visszatér: (fájlok, alapkönyvtár, {fájl: méret byte-ban})
+    """
+    if file_list is None and not os.path.exists(audio_dir):
+        os.makedirs(audio_dir, exist_ok=True)
+        print(f"📁 '{audio_dir}' könyvtár létrehozva")
+        return [], audio_dir, {}
+
+    entries = discover(audio_dir, file_list, shard, recursive)
+    audio_files = [path for path, _ in entries]
+    total_mb = sum(size for _, size in entries) / (1024*1024)
+
+    # Fájllistánál az útvonalak önállóak, nincs közös könyvtár
+    base_dir = '' if file_list is not None else audio_dir
+    source = "stdin" if file_list == '-' else (file_list or audio_dir)
+    shard_text = f", shard {shard[0]}/{shard[1]}" if shard else ""
+
+    if audio_files:
+        print(f"📁 Talált fájlok ({len(audio_files)}, {total_mb:.1f} MB, forrás: {source}{shard_text}):")
+        for i, (path, size) in enumerate(entries[:5], 1):
+            print(f"  {i}. {path} ({size / (1024*1024):.1f} MB)")
+        if len(audio_files) > 5:
+            print(f"  ... és még {len(audio_files) - 5} fájl")
+    else:
+        print(f"📁 Nincs feldolgozható fájl (forrás: {source}{shard_text})")
+
+    return audio_files, base_dir, dict(entries)
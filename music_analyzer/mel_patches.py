@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Különválasztott mel front end + patch gyorsítótár a Discogs EffNethez
+A TensorflowPredictEffnetDiscogs minden hívásnál újraszámolja a mel spektrogramot; itt a
+modell bemenete (128 frame × 96 sáv patch-ek) számonként egyszer készül, float16-ként
+tömörítve a gyorsítótárba kerül, a későbbi futások (új fej, más pooling, újrafuttatás)
+dekódolás és spektrogram nélkül, közvetlenül a gráfba töltik
+
+Használat:
+  python3 linux_essentia_speed.py --patch-cache patch_cache
+  python3 mel_patches.py stats --dir patch_cache
+"""
+import os
+import sys
+import json
+import hashlib
+import argparse
+import tempfile
+
+import numpy as np
+
+# A TensorflowPredictEffnetDiscogs alapbeállításai (a front endnek pontosan ezekkel kell egyeznie)
+SAMPLE_RATE = 16000
+FRAME_SIZE = 512
+HOP_SIZE = 256
+N_BANDS = 96
+PATCH_SIZE = 128
+PATCH_HOP_SIZE = 62
+# A bs64 gráf rögzített batch mérettel fut: az utolsó batch nullákkal töltődik ki
+BATCH_SIZE = 64
+INPUT_NODE = "serving_default_melspectrogram"
+ACTIVATIONS_OUTPUT = "PartitionedCall:0"
+
+# Változik, ha a front end kimenete megváltozik - a régi bejegyzések így nem találatok
+FRONT_END_VERSION = 1
+# Tartalom ujjlenyomat: a teljes fájl hash-e (útvonal független, így a prefetch scratch másolata
+# és az áthelyezett fájl is találat; az azonos méretű, elején / végén egyező újrakódolás vagy
+# középen szerkesztett fájl viszont nem kaphatja egy másik szám patch-eit)
+FINGERPRINT_CHUNK = 1024 * 1024
+DEFAULT_CACHE_DIR = "patch_cache"
+
+
+def content_fingerprint(path, chunk=FINGERPRINT_CHUNK):
+    """Tartalom azonosító: sha1(méret + a teljes tartalom), chunk-onként olvasva"""
+    digest = hashlib.sha1()
+    digest.update(str(os.path.getsize(path)).encode('ascii'))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class MelFrontEnd:
+    """16 kHz mono jel -> (n_patches, 128, 96) float32 mel patch-ek (TensorflowInputMusiCNN)"""
+    def __init__(self):
+        from .classifier import essentia_standard
+        es = essentia_standard()
+        self._frames = es.FrameGenerator
+        self._mel = es.TensorflowInputMusiCNN()
+
+    def __call__(self, audio_16k):
+        frames = [self._mel(frame) for frame in
+                  self._frames(audio_16k, frameSize=FRAME_SIZE, hopSize=HOP_SIZE, startFromZero=True,
+                               validFrameThresholdRatio=1)]
+        if len(frames) < PATCH_SIZE:
+            raise ValueError(f"Túl rövid jel: {len(frames)} frame, egy patch-hez {PATCH_SIZE} kell")
+        mel = np.asarray(frames, dtype=np.float32)
+        # Átfedő patch-ek másolás nélküli nézetként, majd egyetlen másolás
+        windows = np.lib.stride_tricks.sliding_window_view(mel, PATCH_SIZE, axis=0)[::PATCH_HOP_SIZE]
+        return np.ascontiguousarray(windows.transpose(0, 2, 1))
+
+
+class PatchPredictor:
+    """A backbone gráf közvetlenül mel patch-eken (TensorflowPredict, rögzített batch mérettel)"""
+    def __init__(self, graph_path, output=ACTIVATIONS_OUTPUT):
+        from .classifier import essentia_standard
+        import essentia
+        self._pool_class = essentia.Pool
+        self.output = output
+        self.predictor = essentia_standard().TensorflowPredict(
+            graphFilename=graph_path, inputs=[INPUT_NODE], outputs=[output]
+        )
+
+    def __call__(self, patches):
+        """(n_patches, 128, 96) -> (n_patches, n_out) - batch-enként, az utolsó kitöltve"""
+        n_patches = len(patches)
+        outputs = []
+        for start in range(0, n_patches, BATCH_SIZE):
+            batch = np.zeros((BATCH_SIZE, 1, PATCH_SIZE, N_BANDS), dtype=np.float32)
+            chunk = patches[start:start + BATCH_SIZE]
+            batch[:len(chunk), 0] = chunk
+            pool = self._pool_class()
+            pool.set(INPUT_NODE, batch)
+            result = np.asarray(self.predictor(pool)[self.output], dtype=np.float32)
+            outputs.append(result.reshape(BATCH_SIZE, -1)[:len(chunk)])
+        return np.concatenate(outputs)
+
+
+class PatchCache:
+    """
+    Mel patch-ek számonként egy .npz fájlban (float16, tömörítve) + a dekódoláshoz kötött
+    értékek (hossz, levágott arány, BPM), így a találat teljesen kihagyja a dekódolást
+    A kulcs: tartalom ujjlenyomat + a 16 kHz-es jelet befolyásoló beállítások (trim, resample)
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        # Az utolsó fájl ujjlenyomata (stat kulccsal): a hiány utáni put nem olvassa újra a fájlt
+        self._last_fingerprint = (None, None)
+        os.makedirs(directory, exist_ok=True)
+
+    def _fingerprint(self, file_path):
+        stat = os.stat(file_path)
+        key = (file_path, stat.st_size, stat.st_mtime_ns, stat.st_ino)
+        if self._last_fingerprint[0] != key:
+            self._last_fingerprint = (key, content_fingerprint(file_path))
+        return self._last_fingerprint[1]
+
+    def _path(self, file_path, variant):
+        key = hashlib.sha1(f"{self._fingerprint(file_path)}|{variant}|{FRONT_END_VERSION}".encode('utf-8'))
+        key = key.hexdigest()
+        return os.path.join(self.directory, key[:2], key + ".npz")
+
+    def get(self, file_path, variant):
+        """{'patches': float32, 'audio_length', 'trimmed', 'bpm' (None, ha nem számolt)} vagy None"""
+        path = self._path(file_path, variant)
+        try:
+            with np.load(path) as data:
+                meta = json.loads(str(data['meta']))
+                meta['patches'] = data['patches'].astype(np.float32)
+        except (OSError, KeyError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return meta
+
+    def put(self, file_path, variant, patches, audio_length, trimmed, bpm=None):
+        """Bejegyzés atomikus írása (ideiglenes fájl + átnevezés - párhuzamos workerek mellett is)"""
+        path = self._path(file_path, variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        meta = {'audio_length': float(audio_length), 'trimmed': float(trimmed),
+                'bpm': None if bpm is None else float(bpm)}
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                np.savez_compressed(f, patches=np.asarray(patches, dtype=np.float16), meta=json.dumps(meta))
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def stats(self):
+        """(bejegyzések száma, teljes méret byte-ban)"""
+        count = size = 0
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if name.endswith(".npz"):
+                    count += 1
+                    size += os.path.getsize(os.path.join(root, name))
+        return count, size
+
+
+def main(argv=None):
+    """Patch gyorsítótár parancssor"""
+    parser = argparse.ArgumentParser(description="Mel patch gyorsítótár (Discogs EffNet bemenet)")
+    parser.add_argument('--dir', default=DEFAULT_CACHE_DIR, help="Gyorsítótár könyvtár")
+    commands = parser.add_subparsers(dest='command', required=True)
+    commands.add_parser('stats', help="Bejegyzések száma és mérete")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.dir):
+        print(f"❌ Gyorsítótár nem található: {args.dir}", file=sys.stderr)
+        return 1
+    count, size = PatchCache(args.dir).stats()
+    print(f"📦 {count} szám, {size / (1024 * 1024):.1f} MB"
+          + (f" ({size / count / 1024:.0f} KB / szám)" if count else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
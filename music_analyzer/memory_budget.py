@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Memória keret alapú beengedés és worker skálázás a PreforkPoolhoz
+
+Egy fájl csúcs memóriája a hosszal nő (két teljes float32 jel + a TF aktivációk), így fix
+workerszámnál a hosszú fájlok kifuttathatják a gépet a memóriából, a rövidek pedig kihasználatlanul
+hagyják. A workerek fájlonként mérik a csúcs RSS növekményt, ebből online lineáris modell
+(alap + MB / audio másodperc) becsüli a következő fájlok költségét. Egy fájl csak akkor indul,
+ha a becsült összes memória (szülő + workerek alapja + futó fájlok) a kereten belül marad.
+A pool a keret szerint workert indít vagy állít le
+"""
+import os
+import time
+
+from .scheduling import estimate_duration
+
+# A modell kezdeti feltevése: ~200 MB állandó (TF aktivációk, batch pufferek) + 0.6 MB / audio mp
+# (44.1 kHz és 16 kHz float32 teljes jel, mel patch-ek, dekóder pufferek)
+PRIOR_BASE_MB = 200.0
+PRIOR_PER_SEC_MB = 0.6
+# A feltevés súlya megfigyelésekben (két pont: rövid és hosszú szám)
+PRIOR_WEIGHT = 2.0
+PRIOR_DURATIONS = (30.0, 600.0)
+# Biztonsági ráhagyás a becslésen
+ESTIMATE_MARGIN = 0.15
+# Ismeretlen hossz (nincs probe, nincs méret) esetén
+FALLBACK_DURATION = 300.0
+
+# Ennyi soron következő fájl közül választható olyan, ami belefér a keretbe
+ADMISSION_LOOKAHEAD = 16
+# Ennyiszer előzhető meg a sor eleje, utána csak ő indulhat (nem éhezhet ki a hosszú fájl)
+MAX_SKIPS = 8
+# Ennyi ideig tétlen (keret miatt várakozó) worker leáll, a memóriája felszabadul
+SCALE_DOWN_AFTER_SEC = 10.0
+# Worker alap memória, amíg nincs mért érték (prefork módban a privát lapok)
+WORKER_FALLBACK_MB = 100.0
+
+_UNITS = {'k': 1.0 / 1024, 'm': 1.0, 'g': 1024.0, 't': 1024.0 * 1024}
+
+
+def parse_memory(value):
+    """'8G', '512M', '6000' (MB) -> MB"""
+    text = str(value).strip().lower().rstrip('b')
+    scale = _UNITS.get(text[-1:], None)
+    number = text[:-1] if scale is not None else text
+    try:
+        megabytes = float(number) * (scale or 1.0)
+    except ValueError:
+        raise ValueError(f"Érvénytelen memória méret: {value} (pl. 8G, 512M)")
+    if megabytes <= 0:
+        raise ValueError(f"A memória keretnek pozitívnak kell lennie: {value}")
+    return megabytes
+
+
+class MemoryModel:
+    """Fájlonkénti csúcs memória = alap + meredekség × hossz (súlyozott legkisebb négyzetek, prior pontokkal)"""
+    def __init__(self, base_mb=PRIOR_BASE_MB, per_sec_mb=PRIOR_PER_SEC_MB, margin=ESTIMATE_MARGIN):
+        self.margin = margin
+        self.samples = 0
+        self.max_observed_mb = 0.0
+        # Elégséges statisztikák: Σw, Σw·x, Σw·y, Σw·x², Σw·x·y
+        self._sums = [0.0] * 5
+        for duration in PRIOR_DURATIONS:
+            self._add(duration, base_mb + per_sec_mb * duration, PRIOR_WEIGHT / len(PRIOR_DURATIONS))
+        self.base_mb, self.per_sec_mb = base_mb, per_sec_mb
+
+    def _add(self, x, y, weight=1.0):
+        sums = self._sums
+        sums[0] += weight
+        sums[1] += weight * x
+        sums[2] += weight * y
+        sums[3] += weight * x * x
+        sums[4] += weight * x * y
+
+    def observe(self, duration, peak_mb):
+        """Egy mért fájl (hossz mp-ben, csúcs RSS növekmény MB-ban)"""
+        self._add(duration, peak_mb)
+        self.samples += 1
+        self.max_observed_mb = max(self.max_observed_mb, peak_mb)
+        n, sx, sy, sxx, sxy = self._sums
+        denominator = n * sxx - sx * sx
+        if denominator > 0:
+            slope = max(0.0, (n * sxy - sx * sy) / denominator)
+            self.base_mb, self.per_sec_mb = max(0.0, (sy - slope * sx) / n), slope
+
+    def estimate(self, duration):
+        """Becsült csúcs (MB) ráhagyással"""
+        return (self.base_mb + self.per_sec_mb * duration) * (1.0 + self.margin)
+
+
+class MemoryBudget:
+    """
+    Beengedés: melyik soron következő fájl indulhat a keretben, és kell-e worker indítás / leállítás
+    durations: {fájl: hossz} (probe), ennek hiányában méret / névleges bitráta
+    """
+    def __init__(self, budget_mb, durations=None, min_workers=1, model=None):
+        self.budget_mb = budget_mb
+        self.durations = durations or {}
+        self.min_workers = min_workers
+        self.model = model or MemoryModel()
+        self.waits = 0
+        self.over_budget = 0
+        self.peak_estimated_mb = 0.0
+        self.scale_ups = 0
+        self.scale_downs = 0
+        self.worker_range = None
+        self._skips = 0
+        self._blocked_since = None
+
+    def duration(self, filename, file_path):
+        """Hossz másodpercben: probe, különben méret alapú becslés"""
+        if filename in self.durations:
+            return self.durations[filename]
+        try:
+            return estimate_duration(file_path, os.stat(file_path).st_size)
+        except OSError:
+            return FALLBACK_DURATION
+
+    def fits(self, cost, used_mb):
+        return used_mb + cost <= self.budget_mb
+
+    def choose(self, candidates, used_mb, running):
+        """
+        candidates: [(fájl, becsült MB)] sorrendben; used_mb: szülő + workerek + futó fájlok becslése
+        Visszatér: a választott index vagy None (várni kell). Futó fájl nélkül a legkisebb mindig indul
+        """
+        if not candidates:
+            return None
+        eligible = candidates[:1] if self._skips >= MAX_SKIPS else candidates
+        for index, (_, cost) in enumerate(eligible):
+            if self.fits(cost, used_mb):
+                self._skips = self._skips + 1 if index > 0 else 0
+                self._admitted(used_mb + cost)
+                return index
+        if running == 0:
+            # Egyedül sem fér bele: a haladás fontosabb, de jelezzük
+            self.over_budget += 1
+            index = min(range(len(eligible)), key=lambda i: eligible[i][1])
+            self._skips = 0
+            self._admitted(used_mb + eligible[index][1])
+            return index
+        if self._blocked_since is None:
+            self.waits += 1
+            self._blocked_since = time.time()
+        return None
+
+    def _admitted(self, total_mb):
+        self._blocked_since = None
+        self.peak_estimated_mb = max(self.peak_estimated_mb, total_mb)
+
+    def can_grow(self, used_mb, worker_mb, next_cost):
+        """Új worker indítható: az alapja és a következő fájl is belefér"""
+        return used_mb + worker_mb + next_cost <= self.budget_mb
+
+    def should_shrink(self, workers):
+        """A keret miatt régóta várakozó tétlen worker leállítható"""
+        return (workers > self.min_workers and self._blocked_since is not None
+                and time.time() - self._blocked_since > SCALE_DOWN_AFTER_SEC)
+
+    def scaled(self, workers, delta=0):
+        """Workerszám változás nyilvántartása (a várakozási óra újraindul)"""
+        if delta > 0:
+            self.scale_ups += 1
+        elif delta < 0:
+            self.scale_downs += 1
+            self._blocked_since = time.time()
+        low, high = self.worker_range or (workers, workers)
+        self.worker_range = (min(low, workers), max(high, workers))
+
+    def report(self):
+        """Keret kihasználtság, modell illesztés, skálázás"""
+        model = self.model
+        print(f"\n🐏 MEMÓRIA KERET: {self.budget_mb:.0f} MB")
+        print("-" * 60)
+        print(f"  • Becsült csúcs használat: {self.peak_estimated_mb:.0f} MB "
+              f"({self.peak_estimated_mb / self.budget_mb:.0%})")
+        print(f"  • Modell ({model.samples} mért fájl): {model.base_mb:.0f} MB + "
+              f"{model.per_sec_mb:.2f} MB / audio mp, legnagyobb mért: {model.max_observed_mb:.0f} MB")
+        if self.worker_range:
+            print(f"  • Workerek: {self.worker_range[0]}-{self.worker_range[1]} "
+                  f"(+{self.scale_ups} / -{self.scale_downs} skálázás)")
+        print(f"  • Keret miatti várakozás: {self.waits}x, kereten felül (egyedül) indított fájl: {self.over_budget}")
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Előolvasó I/O réteg hálózati (NFS / SMB) zenei könyvtárakhoz
+A következő N fájl háttérszálakon helyi scratch területre másolódik (alapból /dev/shm,
+azaz memória), korlátos darabszámmal és byte kerettel; a dekóder a helyi másolatból olvas
+"""
+import os
+import sys
+import time
+import shutil
+import tempfile
+import itertools
+import threading
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+DEFAULT_PREFETCH_MB = 512
+PREFETCH_THREADS = 2
+# Olvasási blokk méret (nagy, szekvenciális olvasás a hálózati meghajtón)
+READ_CHUNK = 4 * 1024 * 1024
+# Memória alapú scratch, ha elérhető (Linux)
+SHM_DIR = "/dev/shm"
+
+
+def default_scratch_dir():
+    """Alapértelmezett scratch: /dev/shm (RAM), különben a rendszer temp könyvtára"""
+    if os.path.isdir(SHM_DIR) and os.access(SHM_DIR, os.W_OK):
+        return SHM_DIR
+    return tempfile.gettempdir()
+
+
+def _advise(fd, advice):
+    """posix_fadvise tipp, ahol a platform támogatja (Linux); máshol no-op"""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, 0, 0, advice)
+        except OSError:
+            pass
+
+
+class Prefetcher:
+    """
+    Sorrendtartó előolvasás: iterálva a fájlneveket adja vissza (ugyanabban a sorrendben),
+    közben a következő `depth` fájl már másolódik; path() a helyi másolat útvonala
+    (ha még nincs kész, vár rá - ez a stall idő), release() felszabadítja a helyet
+    """
+    def __init__(self, audio_files, audio_dir='', depth=4, memory_mb=DEFAULT_PREFETCH_MB,
+                 scratch_dir=None, sizes=None, threads=PREFETCH_THREADS):
+        self.audio_files = audio_files
+        self.audio_dir = audio_dir
+        self.depth = max(1, depth)
+        self.budget = memory_mb * 1024 * 1024
+        self.sizes = sizes or {}
+        self.scratch = tempfile.mkdtemp(prefix="essentia_prefetch_", dir=scratch_dir or default_scratch_dir())
+
+        self._executor = ThreadPoolExecutor(max_workers=threads)
+        self._cond = threading.Condition()
+        self._futures = {}
+        self._reserved = {}
+        self._in_flight_bytes = 0
+        self._order = deque()
+        self._counter = itertools.count()
+        self._closed = False
+        self._source_done = False
+
+        self.stats = {'files': 0, 'bytes': 0, 'read_sec': 0.0, 'stall_sec': 0.0, 'stalls': 0, 'fallbacks': 0}
+        self._feeder = threading.Thread(target=self._feed, name="prefetch-feeder", daemon=True)
+        self._feeder.start()
+
+    def __len__(self):
+        return len(self.audio_files)
+
+    def _size_of(self, source):
+        """Fájlméret (a bejárásból, ha ismert)"""
+        size = self.sizes.get(source)
+        if size is None:
+            try:
+                size = os.stat(os.path.join(self.audio_dir, source)).st_size
+            except OSError:
+                size = 0
+        return size
+
+    def _feed(self):
+        """Háttérszál: a forrás sorrendjében ütemezi a másolásokat, a kereten belül"""
+        for filename in self.audio_files:
+            size = self._size_of(filename)
+            with self._cond:
+                # Egy fájl mindig mehet, különben a darab- és byte keret a határ
+                while not self._closed and self._reserved and (
+                    len(self._reserved) >= self.depth or self._in_flight_bytes + size > self.budget
+                ):
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self._reserved[filename] = size
+                self._in_flight_bytes += size
+                self._futures[filename] = self._executor.submit(self._copy, filename)
+                self._order.append(filename)
+                self._cond.notify_all()
+        with self._cond:
+            self._source_done = True
+            self._cond.notify_all()
+
+    def _copy(self, filename):
+        """Forrás -> helyi másolat nagy blokkokban; hiba esetén az eredeti útvonal"""
+        source = os.path.join(self.audio_dir, filename)
+        start = time.time()
+        copied = 0
+        try:
+            with open(source, 'rb', buffering=0) as src:
+                _advise(src.fileno(), getattr(os, 'POSIX_FADV_SEQUENTIAL', 0))
+                _advise(src.fileno(), getattr(os, 'POSIX_FADV_WILLNEED', 0))
+                # Sorszám + eredeti név: a naplóban felismerhető, ütközésmentes
+                local_path = os.path.join(self.scratch, f"{next(self._counter):06d}_{os.path.basename(filename)}")
+                with open(local_path, 'xb') as dst:
+                    buffer = bytearray(READ_CHUNK)
+                    view = memoryview(buffer)
+                    while True:
+                        n = src.readinto(buffer)
+                        if not n:
+                            break
+                        dst.write(view[:n])
+                        copied += n
+                # A forrást többet nem olvassuk: ne foglalja a page cache-t
+                _advise(src.fileno(), getattr(os, 'POSIX_FADV_DONTNEED', 0))
+        except OSError as e:
+            print(f"⚠️ Előolvasás sikertelen, közvetlen olvasás: {filename} ({e.strerror})", file=sys.stderr)
+            with self._cond:
+                self.stats['fallbacks'] += 1
+            return source
+
+        with self._cond:
+            self.stats['files'] += 1
+            self.stats['bytes'] += copied
+            self.stats['read_sec'] += time.time() - start
+        return local_path
+
+    def __iter__(self):
+        """Fájlnevek a forrás sorrendjében (a másolás már a háttérben fut)"""
+        while True:
+            with self._cond:
+                while not self._order and not self._source_done and not self._closed:
+                    self._cond.wait()
+                if not self._order:
+                    return
+                filename = self._order.popleft()
+            yield filename
+
+    def path(self, filename):
+        """Helyi útvonal a dekóderhez (blokkol, amíg a másolat elkészül)"""
+        future = self._futures.get(filename)
+        if future is None:
+            return os.path.join(self.audio_dir, filename)
+        if not future.done():
+            start = time.time()
+            local_path = future.result()
+            with self._cond:
+                self.stats['stall_sec'] += time.time() - start
+                self.stats['stalls'] += 1
+            return local_path
+        return future.result()
+
+    def release(self, filename):
+        """Feldolgozott fájl helyi másolatának törlése, a keret felszabadítása"""
+        future = self._futures.pop(filename, None)
+        if future is None:
+            return
+        local_path = future.result()
+        if local_path.startswith(self.scratch):
+            try:
+                os.remove(local_path)
+            except OSError:
+                pass
+        with self._cond:
+            self._in_flight_bytes -= self._reserved.pop(filename, 0)
+            self._cond.notify_all()
+
+    def close(self):
+        """Háttérszálak leállítása, scratch könyvtár törlése"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._feeder.join(timeout=5.0)
+        self._executor.shutdown(wait=True)
+        shutil.rmtree(self.scratch, ignore_errors=True)
+
+    def summary(self):
+        """Áteresztőképesség és várakozási (stall) idő"""
+        stats = self.stats
+        mb = stats['bytes'] / (1024*1024)
+        rate = mb / stats['read_sec'] if stats['read_sec'] > 0 else 0.0
+        lines = [
+            f"📦 Előolvasás ({self.depth} fájl / {self.budget // (1024*1024)} MB, {self.scratch}):",
+            f"  • Beolvasva: {stats['files']} fájl, {mb:.1f} MB, {rate:.1f} MB/s",
+            f"  • Dekóder várakozás (I/O stall): {stats['stall_sec']:.1f}s ({stats['stalls']} alkalom)",
+        ]
+        if stats['fallbacks']:
+            lines.append(f"  • Közvetlen olvasás (sikertelen előolvasás): {stats['fallbacks']} fájl")
+        return "\n".join(lines)
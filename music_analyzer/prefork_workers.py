@@ -0,0 +1,561 @@
+#!/usr/bin/env python3
+"""
+Pre-fork worker pool: a szülő egyszer tölti be és melegíti be a modellt,
+majd fork-olja a workereket, amelyek copy-on-write módon osztoznak a
+csak olvasott lapokon (TF gráf, címkelista)
+
+Összehasonlításként 'naive' módban minden worker saját modellt tölt be,
+a pool pedig workerenként jelenti az RSS/PSS-t és a modell készenléti idejét.
+
+Felügyelet: minden fájl fájlmérettel skálázott időkorlát alatt fut; az elakadt
+workert a watchdog leállítja, az összeomlottat (natív crash) újraindítja,
+a fájl pedig okkal együtt a hibák közé kerül.
+"""
+import os
+import gc
+import sys
+import time
+import signal
+import platform
+import multiprocessing as mp
+from multiprocessing.connection import wait
+
+import numpy as np
+
+from .memory_budget import ADMISSION_LOOKAHEAD, WORKER_FALLBACK_MB
+
+WORKER_MODES = ('prefork', 'naive')
+# Bemelegítő inferencia hossza (16 kHz) - legalább egy teljes EffNet patch
+WARMUP_SECONDS = 3.0
+
+# Fájlonkénti időkorlát: alap + MB-onkénti rész (egy 10 MB-os MP3 ~ 10 perc audio)
+DEFAULT_TIMEOUT_BASE = 120.0
+DEFAULT_TIMEOUT_PER_MB = 20.0
+# Watchdog ellenőrzési periódus
+WATCHDOG_INTERVAL = 0.5
+# Dinamikus forrás (pl. JobScheduler) jelzése: most nincs kiadható fájl, de a forrás még nem ért véget
+IDLE = object()
+
+
+def memory_usage_kb():
+    """
+    Saját folyamat memóriája KB-ban: RSS, PSS (a megosztott lapok arányosan),
+    Private_Dirty (csak ehhez a workerhez tartozó, módosított lapok)
+    """
+    usage = {'rss': None, 'pss': None, 'private_dirty': None}
+    try:
+        # Linux 4.14+: összesített smaps
+        with open('/proc/self/smaps_rollup') as f:
+            for line in f:
+                key, _, value = line.partition(':')
+                field = {'Rss': 'rss', 'Pss': 'pss', 'Private_Dirty': 'private_dirty'}.get(key)
+                if field:
+                    usage[field] = int(value.split()[0])
+        return usage
+    except OSError:
+        pass
+
+    # Fallback: csúcs RSS (macOS-en byte, Linuxon KB)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    usage['rss'] = peak // 1024 if platform.system() == 'Darwin' else peak
+    return usage
+
+
+def _status_kb(field):
+    """/proc/self/status mező KB-ban (VmRSS, VmHWM); None, ha nem elérhető (nem Linux)"""
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def reset_peak_rss():
+    """A csúcs RSS (VmHWM) visszaállítása az aktuálisra - Linux 4.0+; False, ha nem támogatott"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+
+def warm_up(classifier):
+    """
+    Egy üres inferencia, hogy a TF gráf inicializálása a fork előtt megtörténjen
+    Patch gyorsítótáras módban a predictor mel patch-eket vár: a csend a saját front enden megy át
+    """
+    silence = np.zeros(int(16000 * WARMUP_SECONDS), dtype=np.float32)
+    if classifier.front_end is not None:
+        silence = classifier.front_end(silence)
+    classifier.predictor(silence)
+
+
+def _worker_main(classifier, mode, forked_at, conn):
+    """Worker ciklus: feladatok és eredmények a saját pipe-ján"""
+    # A per-fájl progress kiírások a szülő kimenetét szemetelnék
+    sys.stdout = open(os.devnull, 'w')
+    pid = os.getpid()
+
+    if mode == 'naive':
+        classifier.model_loaded = False
+        if not classifier.load_model():
+            conn.send(('failed', pid, "modell betöltési hiba"))
+            return
+        warm_up(classifier)
+
+    conn.send(('ready', pid, time.time() - forked_at, memory_usage_kb()))
+
+    processed = 0
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            break
+        filename, file_path = task
+        analysis_start = time.time()
+        # Fájlonkénti csúcs memória: a csúcs RSS növekménye a fájl előtti RSS-hez képest
+        before = _status_kb('VmRSS') if reset_peak_rss() else None
+        result = classifier.analyze_audio(file_path)
+        peak = _status_kb('VmHWM') if before is not None else None
+        if peak is not None:
+            result['peak_rss_mb'] = max(0, peak - before) / 1024
+        conn.send(('result', pid, filename, result, time.time() - analysis_start, memory_usage_kb()))
+        processed += 1
+
+    conn.send(('exit', pid, processed, memory_usage_kb()))
+
+
+class _WorkerSlot:
+    """Egy worker folyamat, a pipe-ja és az éppen futó feladata"""
+    __slots__ = ('process', 'conn', 'ready', 'task', 'started', 'deadline', 'duration', 'cost')
+
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.task = None
+        self.started = None
+        self.deadline = None
+        # Memória kerettel: a futó fájl hossza és becsült csúcs memóriája (MB)
+        self.duration = None
+        self.cost = None
+
+
+class PreforkPool:
+    """
+    Fork-olt, felügyelt worker pool - prefork (közös modell) vagy naive (workerenkénti modell) módban
+
+    budget (MemoryBudget) megadásakor a workers a felső korlát: a fájlok a becsült memóriájuk
+    szerint indulnak, a workerek száma a kerethez igazodik
+    """
+    def __init__(self, classifier, workers, mode='prefork',
+                 timeout_base=DEFAULT_TIMEOUT_BASE, timeout_per_mb=DEFAULT_TIMEOUT_PER_MB, verbose=True,
+                 budget=None):
+        if mode not in WORKER_MODES:
+            raise ValueError(f"Ismeretlen worker mód: {mode}")
+        self.classifier = classifier
+        self.workers = workers
+        self.mode = mode
+        self.timeout_base = timeout_base
+        self.timeout_per_mb = timeout_per_mb
+        # Könyvtárként (analyze_many) használva csendes
+        self.verbose = verbose
+        self.budget = budget
+        self.parent_memory = None
+        self.ctx = mp.get_context('fork')
+        self.slots = []
+        self.worker_stats = {}
+        self.parent_ready_sec = 0.0
+        self.restarts = 0
+        self.timeouts = 0
+        self.crashes = 0
+
+    def start(self):
+        """
+        Workerek indítása - prefork módban előtte modell betöltés + bemelegítés
+        Naive módban a fork a szülő modellbetöltése ELŐTT történik
+        """
+        if platform.system() == 'Darwin' and self.verbose:
+            print("⚠️  macOS-en a fork TensorFlow/Metal mellett instabil lehet")
+
+        started = time.time()
+        if self.mode == 'prefork':
+            if not self.classifier.load_model():
+                return False
+            if self.verbose:
+                print("🔥 Modell bemelegítése (dummy inferencia)...")
+            warm_up(self.classifier)
+            # A GC ne írja a megosztott objektumok fejléceit (copy-on-write megtartása)
+            gc.collect()
+            gc.freeze()
+        self.parent_ready_sec = time.time() - started
+        self.parent_memory = memory_usage_kb()
+
+        initial = self.workers if self.budget is None else min(self.workers, self.budget.min_workers)
+        for _ in range(initial):
+            self.slots.append(self._spawn())
+
+        if self.verbose:
+            print(f"👥 {initial} worker elindítva ({self.mode} mód, felügyelt)"
+                  + (f", memória keret: {self.budget.budget_mb:.0f} MB, legfeljebb {self.workers} worker"
+                     if self.budget is not None else ""))
+        if self.budget is not None:
+            self.budget.scaled(initial)
+        return True
+
+    def _spawn(self):
+        """Új worker fork-olása (újraindításkor prefork módban azonnal kész)"""
+        parent_conn, child_conn = self.ctx.Pipe()
+        process = self.ctx.Process(
+            target=_worker_main,
+            args=(self.classifier, self.mode, time.time(), child_conn),
+            daemon=True
+        )
+        process.start()
+        child_conn.close()
+        return _WorkerSlot(process, parent_conn)
+
+    def timeout_for(self, file_path):
+        """Fájlmérettel skálázott időkorlát másodpercben (None = nincs korlát)"""
+        if self.timeout_base is None:
+            return None
+        try:
+            size_mb = os.stat(file_path).st_size / (1024*1024)
+        except OSError:
+            size_mb = 0.0
+        return self.timeout_base + self.timeout_per_mb * size_mb
+
+    def _dispatch(self, slot, filename, file_path):
+        """Feladat kiadása egy szabad workernek"""
+        timeout = self.timeout_for(file_path)
+        slot.task = (filename, file_path)
+        slot.started = time.time()
+        slot.deadline = slot.started + timeout if timeout is not None else None
+        slot.conn.send(slot.task)
+
+    def _handle_message(self, slot, message):
+        """Worker üzenet feldolgozása, eredmény esetén (fájl, eredmény, idő)"""
+        kind, pid = message[0], message[1]
+        stats = self.worker_stats.setdefault(pid, {})
+        if kind == 'result':
+            filename, result, elapsed, stats['memory_now'] = message[2:]
+            if self.budget is not None and result['success'] and 'peak_rss_mb' in result:
+                self.budget.model.observe(slot.duration, result['peak_rss_mb'])
+            slot.task = slot.started = slot.deadline = slot.duration = slot.cost = None
+            return filename, result, elapsed
+        if kind == 'ready':
+            slot.ready = True
+            stats['ready_sec'], stats['memory_ready'] = message[2], message[3]
+        elif kind == 'exit':
+            stats['processed'], stats['memory_exit'] = message[2], message[3]
+        elif kind == 'failed':
+            stats['error'] = message[2]
+        return None
+
+    def _replace(self, slot, reason):
+        """
+        Elakadt / összeomlott worker lecserélése
+        Visszatér: a megszakított fájl hibaeredménye (ha volt futó feladat)
+        """
+        if slot.process.is_alive():
+            slot.process.kill()
+        slot.process.join()
+        slot.conn.close()
+
+        failed = None
+        if slot.task is not None:
+            filename, file_path = slot.task
+            elapsed = time.time() - slot.started
+            if self.verbose:
+                print(f"    🐕 Watchdog: {filename} - {reason}")
+            failed = (filename, {'success': False, 'error': reason}, elapsed)
+
+        self.worker_stats.setdefault(slot.process.pid, {})['error'] = reason
+        self.slots[self.slots.index(slot)] = self._spawn()
+        self.restarts += 1
+        return failed
+
+    def _exit_reason(self, process):
+        """Összeomlás oka a kilépési kódból"""
+        code = process.exitcode
+        if code is not None and code < 0:
+            try:
+                return f"worker összeomlott ({signal.Signals(-code).name})"
+            except ValueError:
+                return f"worker összeomlott (jelzés {-code})"
+        return f"worker váratlanul kilépett (kód {code})"
+
+    def _watchdog(self):
+        """Időtúllépés és összeomlás ellenőrzése, a megszakított fájlok hibaeredményei"""
+        failures = []
+        now = time.time()
+        for slot in list(self.slots):
+            if 'error' in self.worker_stats.get(slot.process.pid, {}) and not slot.process.is_alive():
+                # Betöltésnél elbukott worker (naive mód) - nem indítjuk újra
+                continue
+            if not slot.process.is_alive():
+                self.crashes += slot.task is not None
+                failure = self._replace(slot, self._exit_reason(slot.process))
+            elif slot.deadline is not None and now > slot.deadline:
+                self.timeouts += 1
+                failure = self._replace(slot, f"időtúllépés ({slot.deadline - slot.started:.0f}s korlát)")
+            else:
+                continue
+            if failure is not None:
+                failures.append(failure)
+        return failures
+
+    def imap(self, audio_files, audio_dir='', resolve=None, wakeup=None):
+        """
+        Eredmények (fájl, eredmény, elemzési idő) a befejezés sorrendjében
+        Workerenként egy kiadott fájl, így a watchdog pontosan tudja, mi futott
+
+        resolve(fájl): a dekóder által olvasott útvonal (pl. előolvasott helyi másolat)
+        A forrás IDLE-t adhat (most nincs munka); wakeup (fileno() + drain()) jelzésére
+        a pool a watchdog periódus kivárása nélkül újra kérdez
+        """
+        pending = iter(audio_files)
+        exhausted = False
+        # Memória kerettel: soron következő, még nem kiadott fájlok (fájl, útvonal, hossz)
+        lookahead = []
+
+        while True:
+            if self.budget is not None:
+                exhausted = self._admit(pending, lookahead, exhausted, audio_dir, resolve)
+            for slot in self.slots:
+                if exhausted or self.budget is not None:
+                    break
+                if slot.ready and slot.task is None:
+                    filename = next(pending, None)
+                    if filename is None:
+                        exhausted = True
+                        break
+                    if filename is IDLE:
+                        break
+                    file_path = resolve(filename) if resolve is not None else os.path.join(audio_dir, filename)
+                    self._dispatch(slot, filename, file_path)
+
+            if exhausted and not lookahead and all(slot.task is None for slot in self.slots):
+                return
+
+            failed = sum(1 for slot in self.slots if 'error' in self.worker_stats.get(slot.process.pid, {}))
+            if failed == len(self.slots):
+                raise RuntimeError("Egyik worker sem tudta betölteni a modellt")
+
+            by_conn = dict((slot.conn, slot) for slot in self.slots)
+            waitables = list(by_conn) + ([wakeup] if wakeup is not None else [])
+            for conn in wait(waitables, timeout=WATCHDOG_INTERVAL):
+                if conn is wakeup:
+                    wakeup.drain()
+                    continue
+                slot = by_conn[conn]
+                try:
+                    item = self._handle_message(slot, conn.recv())
+                except (EOFError, OSError):
+                    # Lezárt pipe: a watchdog kezeli a halott folyamatot
+                    slot.process.join(timeout=1.0)
+                    continue
+                if item is not None:
+                    yield item
+
+            for failure in self._watchdog():
+                yield failure
+
+    def _worker_mb(self, slot):
+        """Worker alap memória MB-ban (privát lapok, ennek hiányában RSS) - az utolsó mérés szerint"""
+        stats = self.worker_stats.get(slot.process.pid, {})
+        memory = stats.get('memory_now') or stats.get('memory_ready') or {}
+        value = memory.get('private_dirty') or memory.get('rss')
+        return value / 1024 if value else WORKER_FALLBACK_MB
+
+    def used_memory_mb(self):
+        """Becsült memória: szülő (a közös modell egyszer) + workerek alapja + futó fájlok becslése"""
+        parent = (self.parent_memory or {}).get('rss') or 0
+        return parent / 1024 + sum(self._worker_mb(slot) + (slot.cost or 0.0) for slot in self.slots)
+
+    def _admit(self, pending, lookahead, exhausted, audio_dir, resolve):
+        """
+        Memória keretes kiosztás: a szabad workerek a soron következő, keretbe férő fájlt kapják
+        (csak addig olvasunk előre, amíg nincs ilyen), utána worker indítás / leállítás
+        Visszatér: kimerült-e a forrás
+        """
+        budget = self.budget
+
+        def pull():
+            nonlocal exhausted
+            if exhausted:
+                return False
+            filename = next(pending, None)
+            if filename is None:
+                exhausted = True
+                return False
+            if filename is IDLE:
+                return False
+            file_path = resolve(filename) if resolve is not None else os.path.join(audio_dir, filename)
+            lookahead.append((filename, file_path, budget.duration(filename, file_path)))
+            return True
+
+        while True:
+            free = [slot for slot in self.slots if slot.ready and slot.task is None]
+            if not free:
+                break
+            used = self.used_memory_mb()
+            while (len(lookahead) < ADMISSION_LOOKAHEAD
+                   and not any(budget.fits(budget.model.estimate(entry[2]), used) for entry in lookahead)
+                   and pull()):
+                pass
+            candidates = [(entry[0], budget.model.estimate(entry[2])) for entry in lookahead]
+            running = sum(1 for slot in self.slots if slot.task is not None)
+            index = budget.choose(candidates, used, running)
+            if index is None:
+                break
+            filename, file_path, duration = lookahead.pop(index)
+            slot = free[0]
+            self._dispatch(slot, filename, file_path)
+            slot.duration, slot.cost = duration, candidates[index][1]
+
+        ready = all(slot.ready for slot in self.slots)
+        idle = [slot for slot in self.slots if slot.ready and slot.task is None]
+        if not idle and ready and len(self.slots) < self.workers and (lookahead or pull()):
+            # Minden worker dolgozik: új worker, ha az alapja és a következő fájl is belefér
+            cost = min(budget.model.estimate(entry[2]) for entry in lookahead)
+            worker_mb = sum(self._worker_mb(slot) for slot in self.slots) / len(self.slots)
+            if budget.can_grow(self.used_memory_mb(), worker_mb, cost):
+                self.slots.append(self._spawn())
+                budget.scaled(len(self.slots), +1)
+        elif idle and lookahead and budget.should_shrink(len(self.slots)):
+            # A keret miatt tétlen worker: leállítva a privát memóriája felszabadul
+            self._retire(idle[0])
+            budget.scaled(len(self.slots), -1)
+        return exhausted
+
+    def _retire(self, slot):
+        """Tétlen worker leállítása (memória keret miatti leskálázás)"""
+        try:
+            slot.conn.send(None)
+            if slot.conn.poll(5.0):
+                self._handle_message(slot, slot.conn.recv())
+        except (EOFError, OSError):
+            pass
+        slot.process.join(timeout=5.0)
+        if slot.process.is_alive():
+            slot.process.kill()
+            slot.process.join()
+        slot.conn.close()
+        self.slots.remove(slot)
+        if self.verbose:
+            print(f"    🐏 Worker leállítva a memória keret miatt ({len(self.slots)} marad)")
+
+    def _finished_workers(self):
+        """Kilépett vagy betöltésnél elbukott workerek száma"""
+        return sum(1 for slot in self.slots
+                   if 'processed' in self.worker_stats.get(slot.process.pid, {})
+                   or 'error' in self.worker_stats.get(slot.process.pid, {}))
+
+    def shutdown(self):
+        """Workerek leállítása és a záró statisztikák begyűjtése"""
+        for slot in self.slots:
+            try:
+                slot.conn.send(None)
+            except OSError:
+                pass
+        deadline = time.time() + 30.0
+        while self._finished_workers() < len(self.slots) and time.time() < deadline:
+            by_conn = dict((slot.conn, slot) for slot in self.slots)
+            ready = wait(list(by_conn), timeout=WATCHDOG_INTERVAL)
+            for conn in ready:
+                try:
+                    self._handle_message(by_conn[conn], conn.recv())
+                except (EOFError, OSError):
+                    by_conn[conn].process.join(timeout=1.0)
+            # Üzenet nélkül kilépett (összeomlott) workerekre nem várunk
+            if not ready and not any(slot.process.is_alive() for slot in self.slots):
+                break
+        for slot in self.slots:
+            slot.process.join(timeout=5.0)
+            if slot.process.is_alive():
+                slot.process.kill()
+                slot.process.join()
+            slot.conn.close()
+        gc.unfreeze()
+
+    def report(self):
+        """Workerenkénti memória és készenléti idő táblázat"""
+        def mb(memory, key):
+            value = (memory or {}).get(key)
+            return f"{value / 1024:8.1f}" if value is not None else "       -"
+
+        print(f"\n👥 WORKER STATISZTIKÁK ({self.mode} mód)")
+        print("-" * 72)
+        print(f"  Szülő modell készenlét: {self.parent_ready_sec:.2f}s")
+        print(f"  {'PID':>7} {'kész (s)':>9} {'RSS MB':>8} {'PSS MB':>8} {'priv MB':>8} {'fájlok':>7}")
+        total_pss = 0
+        for pid, stats in sorted(self.worker_stats.items()):
+            if 'error' in stats:
+                print(f"  {pid:>7} ❌ {stats['error']}")
+                continue
+            memory = stats.get('memory_exit') or stats.get('memory_ready')
+            total_pss += (memory or {}).get('pss') or 0
+            print(f"  {pid:>7} {stats.get('ready_sec', 0.0):9.2f} {mb(memory, 'rss')} "
+                  f"{mb(memory, 'pss')} {mb(memory, 'private_dirty')} {stats.get('processed', 0):7}")
+        if total_pss:
+            print(f"  Összes worker PSS: {total_pss / 1024:.1f} MB")
+        if self.restarts:
+            print(f"  🐕 Újraindítások: {self.restarts} (időtúllépés: {self.timeouts}, összeomlás: {self.crashes})")
+        if self.budget is not None:
+            self.budget.report()
+
+    def summary(self, files, wall_sec):
+        """
+        A futás összesítője a módok összevetéséhez: készenlét (szülő betöltés + a leglassabb worker),
+        workerek összes RSS / PSS-e, áteresztőképesség
+        """
+        ready = [stats['ready_sec'] for stats in self.worker_stats.values() if 'ready_sec' in stats]
+        memories = [stats.get('memory_exit') or stats.get('memory_ready') or {}
+                    for stats in self.worker_stats.values() if 'error' not in stats]
+
+        def total_mb(key):
+            values = [memory[key] for memory in memories if memory.get(key) is not None]
+            return round(sum(values) / 1024, 1) if values else None
+
+        return {
+            'worker_mode': self.mode,
+            'workers': self.workers,
+            'files': files,
+            'wall_sec': round(wall_sec, 2),
+            'files_per_sec': round(files / wall_sec, 3) if wall_sec > 0 else None,
+            'ready_sec': round(self.parent_ready_sec + (max(ready) if ready else 0.0), 2),
+            'rss_mb': total_mb('rss'),
+            'pss_mb': total_mb('pss'),
+        }
+
+
+def print_mode_comparison(summaries):
+    """
+    Prefork vs. naive egymás mellett: {mód: (összesítő, mérés ideje)} - a jelenlegi futás és a
+    gépen ugyanilyen beállítással és workerszámmal legutóbb mért másik mód
+    """
+    modes = [mode for mode in WORKER_MODES if mode in summaries]
+    if len(modes) < 2:
+        other = [mode for mode in WORKER_MODES if mode not in summaries]
+        print(f"  💡 Összevetéshez futtasd ugyanígy --worker-mode {other[0]} módban is (az eredmény megmarad)")
+        return
+
+    def cell(value, spec):
+        return f"{value:{spec}}" if value is not None else "-"
+
+    print(f"\n⚖️  WORKER MÓDOK ÖSSZEVETÉSE ({summaries[modes[0]][0]['workers']} worker)")
+    print(f"  {'':<20}" + "".join(f"{mode:>14}" for mode in modes))
+    rows = [("készenlét (s)", 'ready_sec', '.2f'), ("worker RSS (MB)", 'rss_mb', '.1f'),
+            ("worker PSS (MB)", 'pss_mb', '.1f'), ("fájl / s", 'files_per_sec', '.3f'), ("fájlok", 'files', 'd')]
+    for label, key, spec in rows:
+        print(f"  {label:<20}" + "".join(f"{cell(summaries[mode][0].get(key), spec):>14}" for mode in modes))
+    print(f"  {'mérve':<20}" + "".join(f"{summaries[mode][1][5:16]:>14}" for mode in modes))
+
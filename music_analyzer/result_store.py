@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+"""
+Tartós SQLite eredménytár az elemzési eredményekhez
+Indexelt lekérdezés (BPM, műfaj, konfidencia) a timestampes CSV-k helyett
+
+Használat:
+  python3 result_store.py query --db eredmenyek.sqlite --genre "Electronic / House" --bpm 120 128
+  python3 result_store.py query --db eredmenyek.sqlite --parent Electronic --min-conf 0.5
+  python3 result_store.py export --db eredmenyek.sqlite --out eredmenyek.csv
+  python3 result_store.py stats --db eredmenyek.sqlite
+"""
+import os
+import sys
+import csv
+import sqlite3
+import argparse
+from datetime import datetime
+
+# Ennyi sor gyűlik össze egy tranzakcióba a batch futás alatt
+STORE_BATCH_SIZE = 100
+TOP_K = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    fajl TEXT NOT NULL,
+    bpm REAL,
+    audio_hossz_sec REAL,
+    feldolgozasi_ido_sec REAL,
+    feldolgozas_ideje TEXT,
+    pooling TEXT,
+    top_genre_id INTEGER REFERENCES genres(id),
+    top_conf REAL
+);
+CREATE TABLE IF NOT EXISTS genres (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS parent_genres (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS genre_scores (
+    track_id INTEGER NOT NULL REFERENCES tracks(id) ON DELETE CASCADE,
+    rank INTEGER NOT NULL,
+    genre_id INTEGER NOT NULL REFERENCES genres(id),
+    confidence REAL NOT NULL,
+    PRIMARY KEY (track_id, rank)
+);
+CREATE TABLE IF NOT EXISTS errors (
+    path TEXT PRIMARY KEY,
+    fajl TEXT NOT NULL,
+    hiba TEXT,
+    rogzitve TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_bpm ON tracks(bpm);
+CREATE INDEX IF NOT EXISTS idx_tracks_top_genre ON tracks(top_genre_id, bpm);
+CREATE INDEX IF NOT EXISTS idx_tracks_top_conf ON tracks(top_conf);
+CREATE INDEX IF NOT EXISTS idx_scores_genre ON genre_scores(genre_id, confidence);
+"""
+
+# Fő műfaj oszlopok - régebbi tárakhoz ALTER TABLE-lel kerülnek fel
+PARENT_COLUMNS = (
+    ('top_parent_id', 'INTEGER REFERENCES parent_genres(id)'),
+    ('top_parent_conf', 'REAL'),
+)
+
+# CSV oszlop -> tracks oszlop; minden más (nem Genre_i / Conf_i) kulcs extra oszlop lesz
+CORE_COLUMNS = {
+    'fajl': 'fajl',
+    'BPM': 'bpm',
+    'audio_hossz_sec': 'audio_hossz_sec',
+    'feldolgozasi_ido_sec': 'feldolgozasi_ido_sec',
+    'feldolgozas_ideje': 'feldolgozas_ideje',
+    'pooling': 'pooling',
+}
+INTERNAL_COLUMNS = ('id', 'path', 'top_genre_id', 'top_conf', 'top_parent_id', 'top_parent_conf')
+# Azonosító táblák és a rájuk hivatkozó oszlopok (az id a modell osztály / fő műfaj indexe)
+ID_TABLES = {
+    'genres': (('genre_scores', 'genre_id'), ('tracks', 'top_genre_id')),
+    'parent_genres': (('tracks', 'top_parent_id'),),
+}
+
+
+def is_extra_column(key):
+    """Opcionális eredmény oszlop-e (levágott arány, leírók stb.)"""
+    return key not in CORE_COLUMNS and not key.startswith(('Genre_', 'Conf_', 'Parent_'))
+
+
+def export_view_sql(extra_columns=()):
+    """A régi CSV formátum (Genre_1..5 / Conf_1..5) származtatott nézetként, extra oszlopokkal"""
+    extras = "".join(f't."{column}", ' for column in extra_columns)
+    return "CREATE VIEW results_csv AS SELECT t.fajl, t.bpm AS BPM, " \
+        "t.audio_hossz_sec, t.feldolgozasi_ido_sec, t.feldolgozas_ideje, t.pooling, " + extras + ", ".join(
+            f"(SELECT g.name FROM genre_scores s JOIN genres g ON g.id = s.genre_id "
+            f"WHERE s.track_id = t.id AND s.rank = {i}) AS Genre_{i}, "
+            f"(SELECT s.confidence FROM genre_scores s "
+            f"WHERE s.track_id = t.id AND s.rank = {i}) AS Conf_{i}"
+            for i in range(1, TOP_K + 1)
+        ) + ", (SELECT p.name FROM parent_genres p WHERE p.id = t.top_parent_id) AS Parent_Genre, " \
+        "t.top_parent_id AS Parent_id, t.top_parent_conf AS Parent_Conf, " \
+        "(SELECT group_concat(genre_id, ' ') FROM (SELECT s.genre_id FROM genre_scores s " \
+        "WHERE s.track_id = t.id ORDER BY s.rank)) AS Genre_ids FROM tracks t"
+
+
+class ResultStore:
+    """
+    SQLite eredménytár WAL módban, batch upsert-tel
+    labels (a modell címkelistája) megadásakor a genres / parent_genres azonosítói a modell
+    osztály indexei, illetve a GenreHierarchy fő műfaj indexei - ugyanazok, mint a CSV / NDJSON /
+    Parquet Genre_ids és Parent_id oszlopaiban
+    """
+    def __init__(self, db_path, labels=None):
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        existing = [name for _, name, *_ in self.conn.execute("PRAGMA table_info(tracks)")]
+        for column, column_type in PARENT_COLUMNS:
+            if column not in existing:
+                self.conn.execute(f"ALTER TABLE tracks ADD COLUMN {column} {column_type}")
+        self.conn.commit()
+        if labels is not None:
+            # A hierarchia (és vele a numpy) csak itt kell: a --help / query / export út nem tölti be
+            from .genre_hierarchy import GenreHierarchy, display_name
+            hierarchy = GenreHierarchy(labels)
+            # Az átszámozás idejére a hivatkozások ellenőrzése ki van kapcsolva
+            self._seed_ids('genres', [display_name(label) for label in hierarchy.labels])
+            self._seed_ids('parent_genres', hierarchy.parents)
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_tracks_top_parent ON tracks(top_parent_id, top_parent_conf)")
+        self.extra_columns = [
+            name for name in existing
+            if name not in INTERNAL_COLUMNS and name not in CORE_COLUMNS.values()
+        ]
+        self._create_view()
+        self.conn.commit()
+        self._genre_ids = dict(
+            (name, genre_id) for genre_id, name in self.conn.execute("SELECT id, name FROM genres")
+        )
+        self._parent_ids = dict(
+            (name, parent_id) for parent_id, name in self.conn.execute("SELECT id, name FROM parent_genres")
+        )
+        self._pending = []
+        self._pending_errors = []
+
+    def close(self):
+        """Függő sorok kiírása és lezárás"""
+        self.flush()
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _seed_ids(self, table, names):
+        """
+        Azonosító tábla feltöltése id = index szerint; a korábbi (első előfordulás sorrendű)
+        azonosítók átszámozása a hivatkozó oszlopokban. Ismeretlen név a címkék utáni id-t kap
+        """
+        wanted = dict((name, index) for index, name in enumerate(names))
+        current = self.conn.execute(f"SELECT id, name FROM {table}").fetchall()
+        aligned = all(wanted[name] == row_id if name in wanted else row_id >= len(names) for row_id, name in current)
+        if aligned:
+            if len(current) < len(wanted):
+                with self.conn:
+                    self.conn.executemany(f"INSERT OR IGNORE INTO {table}(id, name) VALUES (?, ?)",
+                                          [(index, name) for name, index in wanted.items()])
+            return
+
+        remap = {}
+        next_id = len(names)
+        for row_id, name in sorted(current):
+            if name in wanted:
+                remap[row_id] = wanted[name]
+            else:
+                remap[row_id] = next_id
+                next_id += 1
+        rows = [(index, name) for name, index in wanted.items()]
+        rows += [(remap[row_id], name) for row_id, name in current if name not in wanted]
+        with self.conn:
+            self.conn.execute("CREATE TEMP TABLE id_remap (old INTEGER PRIMARY KEY, new INTEGER NOT NULL)")
+            self.conn.executemany("INSERT INTO id_remap VALUES (?, ?)", remap.items())
+            for ref_table, column in ID_TABLES[table]:
+                self.conn.execute(f"UPDATE {ref_table} SET {column} = "
+                                  f"(SELECT new FROM id_remap WHERE old = {column}) WHERE {column} IS NOT NULL")
+            self.conn.execute(f"DELETE FROM {table}")
+            self.conn.executemany(f"INSERT INTO {table}(id, name) VALUES (?, ?)", rows)
+            self.conn.execute("DROP TABLE id_remap")
+
+    def _create_view(self):
+        """results_csv nézet (újra)létrehozása az aktuális extra oszlopokkal"""
+        self.conn.execute("DROP VIEW IF EXISTS results_csv")
+        self.conn.execute(export_view_sql(self.extra_columns))
+
+    def _ensure_columns(self, rows):
+        """Új extra oszlopok felvétele (ALTER TABLE), a típus az első nem üres értékből"""
+        added = False
+        for row in rows:
+            for key, value in row.items():
+                if not is_extra_column(key) or key in self.extra_columns or value is None:
+                    continue
+                column_type = 'TEXT' if isinstance(value, str) else 'REAL'
+                self.conn.execute(f'ALTER TABLE tracks ADD COLUMN "{key}" {column_type}')
+                self.extra_columns.append(key)
+                added = True
+        if added:
+            self._create_view()
+
+    def _genre_id(self, name):
+        """Műfaj azonosító (új műfaj felvétele, ha kell)"""
+        genre_id = self._genre_ids.get(name)
+        if genre_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO genres(name) VALUES (?)", (name,))
+            genre_id = self.conn.execute("SELECT id FROM genres WHERE name = ?", (name,)).fetchone()[0]
+            self._genre_ids[name] = genre_id
+        return genre_id
+
+    def _parent_id(self, name):
+        """Fő műfaj azonosító (új felvétele, ha kell); None, ha a sor nem tartalmaz fő műfajt"""
+        if name is None:
+            return None
+        parent_id = self._parent_ids.get(name)
+        if parent_id is None:
+            self.conn.execute("INSERT OR IGNORE INTO parent_genres(name) VALUES (?)", (name,))
+            parent_id = self.conn.execute("SELECT id FROM parent_genres WHERE name = ?", (name,)).fetchone()[0]
+            self._parent_ids[name] = parent_id
+        return parent_id
+
+    def add_result(self, path, row):
+        """Egy CSV-stílusú eredménysor sorba állítása (batch upsert)"""
+        self._pending.append((path, row))
+        if len(self._pending) >= STORE_BATCH_SIZE:
+            self.flush()
+
+    def add_error(self, path, error):
+        """Hibás fájl rögzítése"""
+        self._pending_errors.append((path, error))
+        if len(self._pending_errors) >= STORE_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Összegyűlt sorok kiírása egyetlen tranzakcióban"""
+        if not self._pending and not self._pending_errors:
+            return
+
+        with self.conn:
+            self._ensure_columns(row for _, row in self._pending)
+            # Extra oszlopok: üres új érték nem írja felül a korábbit (pl. leírók nélküli újrafuttatás)
+            extras = "".join(f', "{column}"' for column in self.extra_columns)
+            placeholders = ", ?" * len(self.extra_columns)
+            updates = "".join(f',\n                        "{column}" = COALESCE(excluded."{column}", tracks."{column}")'
+                              for column in self.extra_columns)
+
+            for path, row in self._pending:
+                genres = []
+                for i in range(1, TOP_K + 1):
+                    if f'Genre_{i}' in row:
+                        genres.append((i, self._genre_id(row[f'Genre_{i}']), float(row[f'Conf_{i}'])))
+
+                top_genre_id, top_conf = (genres[0][1], genres[0][2]) if genres else (None, None)
+                self.conn.execute(
+                    """
+                    INSERT INTO tracks (path, fajl, bpm, audio_hossz_sec, feldolgozasi_ido_sec,
+                                        feldolgozas_ideje, pooling, top_genre_id, top_conf,
+                                        top_parent_id, top_parent_conf""" + extras + """)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?""" + placeholders + """)
+                    ON CONFLICT(path) DO UPDATE SET
+                        fajl = excluded.fajl,
+                        bpm = excluded.bpm,
+                        audio_hossz_sec = excluded.audio_hossz_sec,
+                        feldolgozasi_ido_sec = excluded.feldolgozasi_ido_sec,
+                        feldolgozas_ideje = excluded.feldolgozas_ideje,
+                        pooling = excluded.pooling,
+                        top_genre_id = excluded.top_genre_id,
+                        top_conf = excluded.top_conf,
+                        top_parent_id = excluded.top_parent_id,
+                        top_parent_conf = excluded.top_parent_conf""" + updates + """
+                    """,
+                    (path, row['fajl'], row.get('BPM'), row.get('audio_hossz_sec'),
+                     row.get('feldolgozasi_ido_sec'), row.get('feldolgozas_ideje'),
+                     row.get('pooling'), top_genre_id, top_conf,
+                     self._parent_id(row.get('Parent_Genre')), row.get('Parent_Conf'))
+                    + tuple(row.get(column) for column in self.extra_columns)
+                )
+                track_id = self.conn.execute("SELECT id FROM tracks WHERE path = ?", (path,)).fetchone()[0]
+
+                self.conn.execute("DELETE FROM genre_scores WHERE track_id = ?", (track_id,))
+                self.conn.executemany(
+                    "INSERT INTO genre_scores (track_id, rank, genre_id, confidence) VALUES (?, ?, ?, ?)",
+                    [(track_id, rank, genre_id, conf) for rank, genre_id, conf in genres]
+                )
+
+            now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO errors (path, fajl, hiba, rogzitve) VALUES (?, ?, ?, ?)",
+                [(path, os.path.basename(path), error, now) for path, error in self._pending_errors]
+            )
+            # Sikeres újrafeldolgozás után a régi hiba törlése
+            self.conn.executemany(
+                "DELETE FROM errors WHERE path = ?",
+                [(path,) for path, _ in self._pending]
+            )
+
+        self._pending = []
+        self._pending_errors = []
+
+    def query(self, genre=None, bpm_min=None, bpm_max=None, min_conf=None, any_rank=False, limit=None,
+              parent=None):
+        """
+        Számok szűrése műfaj / fő műfaj / BPM tartomány / konfidencia szerint
+
+        any_rank=True esetén a műfaj a top 5 bármelyik helyén szerepelhet,
+        parent megadásakor a min_conf a fő műfaj részesedésére vonatkozik
+        """
+        sql = ["SELECT t.path, t.bpm, g.name, t.top_conf FROM tracks t "
+               "LEFT JOIN genres g ON g.id = t.top_genre_id"]
+        where = []
+        params = []
+
+        if genre is not None:
+            if any_rank:
+                where.append("t.id IN (SELECT s.track_id FROM genre_scores s "
+                             "JOIN genres sg ON sg.id = s.genre_id WHERE sg.name = ?)")
+            else:
+                where.append("g.name = ?")
+            params.append(genre)
+        if parent is not None:
+            where.append("t.top_parent_id = (SELECT id FROM parent_genres WHERE name = ?)")
+            params.append(parent)
+        if bpm_min is not None:
+            where.append("t.bpm >= ?")
+            params.append(bpm_min)
+        if bpm_max is not None:
+            where.append("t.bpm <= ?")
+            params.append(bpm_max)
+        if min_conf is not None:
+            where.append("t.top_parent_conf >= ?" if parent is not None else "t.top_conf >= ?")
+            params.append(min_conf)
+
+        if where:
+            sql.append("WHERE " + " AND ".join(where))
+        sql.append("ORDER BY t.bpm")
+        if limit is not None:
+            sql.append("LIMIT ?")
+            params.append(limit)
+
+        self.flush()
+        return self.conn.execute(" ".join(sql), params).fetchall()
+
+    def export_csv(self, out_path):
+        """A régi CSV formátum előállítása a results_csv nézetből"""
+        self.flush()
+        cursor = self.conn.execute("SELECT * FROM results_csv ORDER BY fajl")
+        columns = [c[0] for c in cursor.description]
+        count = 0
+        with open(out_path, 'w', newline='', encoding='utf-8-sig') as f:
+            writer = csv.writer(f)
+            writer.writerow(columns)
+            for row in cursor:
+                writer.writerow(row)
+                count += 1
+
+        errors_path = None
+        error_rows = self.conn.execute("SELECT fajl, hiba FROM errors ORDER BY fajl").fetchall()
+        if error_rows:
+            root, ext = os.path.splitext(out_path)
+            errors_path = f"{root}_hibak{ext}"
+            with open(errors_path, 'w', newline='', encoding='utf-8-sig') as f:
+                writer = csv.writer(f)
+                writer.writerow(['fajl', 'hiba'])
+                writer.writerows(error_rows)
+
+        return count, errors_path
+
+    def stats(self):
+        """Összesített statisztikák"""
+        self.flush()
+        tracks, avg_bpm, avg_conf = self.conn.execute(
+            "SELECT COUNT(*), AVG(bpm), AVG(top_conf) FROM tracks"
+        ).fetchone()
+        errors = self.conn.execute("SELECT COUNT(*) FROM errors").fetchone()[0]
+        top_genres = self.conn.execute(
+            "SELECT g.name, COUNT(*) AS n FROM tracks t JOIN genres g ON g.id = t.top_genre_id "
+            "GROUP BY t.top_genre_id ORDER BY n DESC LIMIT 5"
+        ).fetchall()
+        top_parents = self.conn.execute(
+            "SELECT p.name, COUNT(*) AS n FROM tracks t JOIN parent_genres p ON p.id = t.top_parent_id "
+            "GROUP BY t.top_parent_id ORDER BY n DESC LIMIT 5"
+        ).fetchall()
+        return {
+            'tracks': tracks,
+            'errors': errors,
+            'avg_bpm': avg_bpm,
+            'avg_conf': avg_conf,
+            'top_genres': top_genres,
+            'top_parents': top_parents
+        }
+
+
+def main(argv=None):
+    """Lekérdező parancssor az eredménytárhoz"""
+    parser = argparse.ArgumentParser(description="Essentia eredménytár lekérdezése")
+    parser.add_argument('--db', required=True, help="SQLite eredménytár fájl")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    query_cmd = commands.add_parser('query', help="Számok szűrése")
+    query_cmd.add_argument('--genre', help='Műfaj, pl. "Electronic / House"')
+    query_cmd.add_argument('--parent', help='Fő műfaj, pl. "Electronic" vagy "Funk / Soul"')
+    query_cmd.add_argument('--any-rank', action='store_true', help="Műfaj a top 5 bármelyik helyén")
+    query_cmd.add_argument('--bpm', nargs=2, type=float, metavar=('MIN', 'MAX'), help="BPM tartomány")
+    query_cmd.add_argument('--min-conf', type=float,
+                           help="Minimális top-1 konfidencia (0-1; --parent mellett a fő műfaj részesedése)")
+    query_cmd.add_argument('--limit', type=int, help="Legfeljebb ennyi sor")
+
+    export_cmd = commands.add_parser('export', help="CSV export (régi formátum)")
+    export_cmd.add_argument('--out', help="Kimeneti CSV (alap: eredmenyek_<timestamp>.csv)")
+
+    commands.add_parser('stats', help="Összesített statisztikák")
+
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print(f"❌ Eredménytár nem található: {args.db}", file=sys.stderr)
+        return 1
+
+    with ResultStore(args.db) as store:
+        if args.command == 'query':
+            bpm_min, bpm_max = args.bpm if args.bpm else (None, None)
+            rows = store.query(args.genre, bpm_min, bpm_max, args.min_conf, args.any_rank, args.limit,
+                               parent=args.parent)
+            for path, bpm, genre, conf in rows:
+                conf_text = f"{conf:.1%}" if conf is not None else "-"
+                print(f"{bpm:6.1f}  {conf_text:>6}  {genre or '-'}  {path}")
+            print(f"📊 Találatok: {len(rows)}", file=sys.stderr)
+
+        elif args.command == 'export':
+            out_path = args.out or f"eredmenyek_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv"
+            count, errors_path = store.export_csv(out_path)
+            print(f"💾 Exportálva: {out_path} ({count} sor)")
+            if errors_path:
+                print(f"⚠️ Hibák exportálva: {errors_path}")
+
+        elif args.command == 'stats':
+            stats = store.stats()
+            print(f"📊 Számok: {stats['tracks']}, hibás fájlok: {stats['errors']}")
+            if stats['tracks']:
+                print(f"  • Átlagos BPM: {stats['avg_bpm']:.1f}")
+                print(f"  • Átlagos konfidencia: {stats['avg_conf']:.1%}")
+                print("  • Legnépszerűbb műfajok:")
+                for genre, count in stats['top_genres']:
+                    print(f"    - {genre}: {count} fájl")
+                if stats['top_parents']:
+                    print("  • Fő műfajok:")
+                    for parent, count in stats['top_parents']:
+                        print(f"    - {parent}: {count} fájl")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
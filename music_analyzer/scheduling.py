@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Hossz-tudatos ütemezés a batch makespan csökkentésére
+Olcsó hosszbecslés (méret / névleges bitráta), leghosszabb először (LPT),
+prioritásos fájlok előre, becsült és tényleges makespan összevetése
+"""
+import os
+import heapq
+import fnmatch
+
+SCHEDULE_METHODS = ('lpt', 'spt', 'fifo')
+DEFAULT_SCHEDULE = 'lpt'
+
+# Névleges bitráták (kbit/s) a méret alapú hosszbecsléshez
+NOMINAL_KBPS = {
+    '.mp3': 192,
+    '.ogg': 160,
+    '.m4a': 256,
+    '.flac': 900,
+    '.wav': 1411,
+}
+FALLBACK_KBPS = 256
+
+# Feldolgozási idő audio másodpercenként a futás előtti becsléshez (~12x realtime)
+DEFAULT_COST_PER_AUDIO_SEC = 0.08
+
+
+def estimate_duration(path, size):
+    """Becsült hossz másodpercben a fájlméret és a formátum névleges bitrátája alapján"""
+    kbps = NOMINAL_KBPS.get(os.path.splitext(path)[1].lower(), FALLBACK_KBPS)
+    return size * 8.0 / (kbps * 1000.0)
+
+
+def simulate_makespan(durations, workers):
+    """
+    Lista ütemezés szimulációja: minden fájl a legkorábban felszabaduló workerhez
+    durations: feldolgozási idők a kiosztás sorrendjében
+    """
+    free_at = [0.0] * max(1, workers)
+    for duration in durations:
+        start = heapq.heappop(free_at)
+        heapq.heappush(free_at, start + duration)
+    return max(free_at)
+
+
+class SchedulePlan:
+    """Kiosztási sorrend + becslések"""
+    __slots__ = ('order', 'estimates', 'workers', 'method', 'priority_count', 'predicted_makespan')
+
+    def __init__(self, order, estimates, workers, method, priority_count, predicted_makespan):
+        self.order = order
+        self.estimates = estimates
+        self.workers = workers
+        self.method = method
+        self.priority_count = priority_count
+        self.predicted_makespan = predicted_makespan
+
+
+def plan_schedule(audio_files, sizes, workers, method=DEFAULT_SCHEDULE, priority_patterns=(),
+                  durations=None, cost_per_audio_sec=DEFAULT_COST_PER_AUDIO_SEC):
+    """
+    Kiosztási sorrend: prioritásos fájlok (glob minták) előre, a többi LPT / SPT / FIFO
+
+    durations: pontos hosszak (pl. metaadatból), különben méret alapú becslés
+    """
+    if method not in SCHEDULE_METHODS:
+        raise ValueError(f"Ismeretlen ütemezés: {method}")
+
+    estimates = {}
+    for path in audio_files:
+        known = durations.get(path) if durations else None
+        estimates[path] = known if known is not None else estimate_duration(path, sizes.get(path, 0))
+
+    def is_priority(path):
+        return any(fnmatch.fnmatch(path, pattern) for pattern in priority_patterns)
+
+    priority = [path for path in audio_files if is_priority(path)]
+    rest = [path for path in audio_files if not is_priority(path)]
+
+    if method == 'lpt':
+        rest.sort(key=lambda path: estimates[path], reverse=True)
+    elif method == 'spt':
+        rest.sort(key=lambda path: estimates[path])
+
+    order = priority + rest
+    predicted = simulate_makespan((estimates[path] * cost_per_audio_sec for path in order), workers)
+    return SchedulePlan(order, estimates, workers, method, len(priority), predicted)
+
+
+def print_schedule_report(plan, results, actual_makespan):
+    """Becsült vs tényleges makespan és a hosszbecslés pontossága"""
+    if not results:
+        return
+
+    audio_total = sum(row['audio_hossz_sec'] for row in results)
+    busy_total = sum(row['feldolgozasi_ido_sec'] for row in results)
+    cost = busy_total / audio_total if audio_total > 0 else DEFAULT_COST_PER_AUDIO_SEC
+
+    # A mért költséggel újraszámolt becslés - csak a hosszbecslés hibája marad benne
+    calibrated = simulate_makespan((plan.estimates[path] * cost for path in plan.order), plan.workers)
+    lower_bound = max(busy_total / plan.workers, max(row['feldolgozasi_ido_sec'] for row in results))
+
+    errors = [abs(plan.estimates[row['fajl']] - row['audio_hossz_sec']) / row['audio_hossz_sec']
+              for row in results if row['fajl'] in plan.estimates and row['audio_hossz_sec'] > 0]
+
+    print(f"\n🗓️  ÜTEMEZÉS ({plan.method}, {plan.workers} worker, {plan.priority_count} prioritásos)")
+    print("-" * 40)
+    print(f"  • Előzetes becsült makespan: {plan.predicted_makespan:.1f}s")
+    print(f"  • Becslés mért költséggel ({cost:.3f}s / audio s): {calibrated:.1f}s")
+    print(f"  • Tényleges makespan: {actual_makespan:.1f}s")
+    print(f"  • Alsó korlát (terhelés / worker, leghosszabb fájl): {lower_bound:.1f}s")
+    if errors:
+        print(f"  • Hosszbecslés átlagos hibája: {sum(errors) / len(errors):.1%}")
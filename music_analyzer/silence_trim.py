@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Csend és zajszerű (nem zenei) szakaszok levágása a BPM és a műfaj predikció előtt
+Frame-enkénti RMS (opcionálisan spektrális laposság), numpy-val vektorizálva
+"""
+import numpy as np
+
+# off: nincs levágás, silence: csak csend (RMS), noise: csend + zajszerű frame-ek
+TRIM_MODES = ('off', 'silence', 'noise')
+DEFAULT_TRIM_MODE = 'off'
+
+# Frame hossz másodpercben (átfedés nélkül, csak szegmentáláshoz)
+TRIM_FRAME_SEC = 0.05
+# Abszolút csend küszöb (dBFS) és a hangos részekhez viszonyított küszöb (dB)
+TRIM_ABS_DB = -60.0
+TRIM_REL_DB = 40.0
+# Csak az ennél hosszabb csendes szakaszok kerülnek ki (zenei szünetek maradnak)
+TRIM_MIN_GAP_SEC = 2.0
+# Spektrális laposság küszöb: e fölött zajszerű a frame (fehér zaj ~1, zene jóval kisebb)
+TRIM_FLATNESS = 0.5
+# Ha ennél kevesebb marad, az eredeti jelet használjuk (a modellnek kell némi audio)
+TRIM_MIN_KEEP_SEC = 3.0
+
+
+def _frames(audio, frame_size):
+    """Átfedés nélküli frame mátrix (n_frames, frame_size), másolat nélkül"""
+    n_frames = len(audio) // frame_size
+    return np.asarray(audio[:n_frames * frame_size], dtype=np.float32).reshape(n_frames, frame_size)
+
+
+def _runs(mask):
+    """True szakaszok (kezdet, vég) frame indexei"""
+    edges = np.diff(np.concatenate(([0], mask.astype(np.int8), [0])))
+    return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+
+def find_music_regions(audio, sample_rate, use_flatness=False):
+    """
+    Megtartandó szakaszok (kezdet, vég) másodpercben, (n, 2) tömbként
+
+    Csendes: az RMS a -60 dBFS vagy a hangos részek (95. percentilis) alatti
+    40 dB küszöb alatt van; use_flatness esetén a zajszerű frame-ek is
+    """
+    frame_size = max(1, int(TRIM_FRAME_SEC * sample_rate))
+    frames = _frames(audio, frame_size)
+    duration = len(audio) / float(sample_rate)
+    if len(frames) == 0:
+        return np.array([[0.0, duration]])
+
+    rms_db = 10.0 * np.log10(np.mean(frames * frames, axis=1) + 1e-12)
+    threshold = max(TRIM_ABS_DB, np.percentile(rms_db, 95) - TRIM_REL_DB)
+    drop = rms_db < threshold
+
+    if use_flatness:
+        power = np.abs(np.fft.rfft(frames * np.hanning(frame_size), axis=1)) ** 2 + 1e-12
+        flatness = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+        drop |= flatness > TRIM_FLATNESS
+
+    # Rövid csendek (szünetek, breakek) maradnak
+    starts, ends = _runs(drop)
+    min_gap = int(np.ceil(TRIM_MIN_GAP_SEC / TRIM_FRAME_SEC))
+    long_gaps = (ends - starts) >= min_gap
+    drop[:] = False
+    for start, end in zip(starts[long_gaps], ends[long_gaps]):
+        drop[start:end] = True
+
+    # A frame-ekre nem osztható maradék a fájl végén a megelőző frame-hez igazodik
+    starts, ends = _runs(~drop)
+    regions = np.stack((starts, ends), axis=1).astype(np.float64) * (frame_size / float(sample_rate))
+    if len(regions) and ends[-1] == len(frames):
+        regions[-1, 1] = duration
+    return regions
+
+
+def kept_seconds(regions):
+    """Megtartott audio hossza másodpercben"""
+    return float(np.sum(regions[:, 1] - regions[:, 0])) if len(regions) else 0.0
+
+
+def cut_regions(audio, sample_rate, regions):
+    """A megadott szakaszok összefűzése (bármilyen mintavételi frekvenciájú jelből)"""
+    if len(regions) == 1 and regions[0, 0] == 0 and regions[0, 1] * sample_rate >= len(audio):
+        return audio
+    bounds = np.round(regions * sample_rate).astype(np.int64)
+    return np.concatenate([audio[start:end] for start, end in bounds]).astype(audio.dtype, copy=False)
+
+
+def trim_silence(audio, sample_rate, use_flatness=False):
+    """
+    Csendes / zajszerű szakaszok levágása
+    Visszatér: (levágott jel, levágott arány 0..1, megtartott szakaszok)
+    """
+    duration = len(audio) / float(sample_rate)
+    regions = find_music_regions(audio, sample_rate, use_flatness)
+    kept = kept_seconds(regions)
+    if duration <= 0 or kept < min(TRIM_MIN_KEEP_SEC, duration):
+        return audio, 0.0, np.array([[0.0, duration]])
+    return cut_regions(audio, sample_rate, regions), 1.0 - kept / duration, regions
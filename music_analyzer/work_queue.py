@@ -0,0 +1,620 @@
+#!/usr/bin/env python3
+"""
+Megosztott munkasor több elemző géphez: lease, heartbeat, visibility timeout,
+dead-letter a többször hibázó fájlokhoz, gépenkénti áteresztőképesség
+
+Backendek:
+  sqlite:///mnt/shared/queue.db  - SQLite + fájlzár (egy gép vagy NFS)
+  redis://host:6379/0            - Redis protokoll (opcionális: pip install redis)
+
+Használat:
+  python3 work_queue.py --queue sqlite:///mnt/shared/queue.db enqueue --audio-dir /mnt/zene
+  python3 linux_essentia_speed.py --queue sqlite:///mnt/shared/queue.db --db node1.sqlite
+  python3 work_queue.py --queue sqlite:///mnt/shared/queue.db stats
+  python3 work_queue.py --queue redis://localhost:6379/0 selftest
+"""
+import os
+import sys
+import json
+import time
+import socket
+import sqlite3
+import importlib.util
+import argparse
+import tempfile
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+# Opcionális függőség - csak a Redis backendhez kell (import a kapcsolódáskor)
+REDIS_AVAILABLE = importlib.util.find_spec('redis') is not None
+
+from .library_discovery import DEFAULT_AUDIO_DIR, discover, parse_shard
+
+# Ennyi ideig "láthatatlan" egy kiadott fájl, ha nincs heartbeat
+DEFAULT_VISIBILITY_TIMEOUT = 600
+# Ennyi sikertelen próbálkozás után dead-letter
+DEFAULT_MAX_ATTEMPTS = 3
+# Önteszt: rövid visibility timeout, hogy a lejárat másodpercek alatt kipróbálható legyen
+SELFTEST_VISIBILITY_TIMEOUT = 1.0
+SELFTEST_MAX_ATTEMPTS = 2
+
+
+def default_worker_id():
+    """Gép + folyamat azonosító"""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+class Lease:
+    """Egy kiadott fájl (útvonal, tulajdonos, próbálkozás sorszáma)"""
+    __slots__ = ('path', 'owner', 'attempt')
+
+    def __init__(self, path, owner, attempt):
+        self.path = path
+        self.owner = owner
+        self.attempt = attempt
+
+
+class SQLiteWorkQueue:
+    """
+    SQLite munkasor - minden művelet egy külön .lock fájlon tartott fcntl zár alatt
+    (NFS-en a SQLite saját zárolása és a WAL mód nem megbízható, ezért DELETE journal)
+    """
+    def __init__(self, db_path, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.db_path = db_path
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self._lock_path = db_path + '.lock'
+        self._thread_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, timeout=60, check_same_thread=False, isolation_level=None)
+        with self._locked(transaction=False):
+            self.conn.execute("PRAGMA journal_mode=DELETE")
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    path TEXT PRIMARY KEY,
+                    state TEXT NOT NULL DEFAULT 'pending',
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    last_error TEXT,
+                    updated REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_jobs_state ON jobs(state, lease_expires);
+                CREATE TABLE IF NOT EXISTS nodes (
+                    worker_id TEXT PRIMARY KEY,
+                    stats TEXT NOT NULL,
+                    last_seen REAL
+                );
+            """)
+
+    @contextmanager
+    def _locked(self, transaction=True):
+        """Folyamatok (fcntl) és szálak (heartbeat) közötti kizárás + tranzakció"""
+        with self._thread_lock:
+            with open(self._lock_path, 'a') as lock_file:
+                if fcntl is not None:
+                    fcntl.lockf(lock_file, fcntl.LOCK_EX)
+                try:
+                    if not transaction:
+                        yield self.conn
+                        return
+                    self.conn.execute("BEGIN IMMEDIATE")
+                    try:
+                        yield self.conn
+                    except BaseException:
+                        self.conn.execute("ROLLBACK")
+                        raise
+                    self.conn.execute("COMMIT")
+                finally:
+                    if fcntl is not None:
+                        fcntl.lockf(lock_file, fcntl.LOCK_UN)
+
+    def enqueue(self, paths):
+        """Fájlok felvétele (már ismert útvonal nem duplikálódik), visszatér: új elemek száma"""
+        now = time.time()
+        with self._locked() as conn:
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO jobs (path, updated) VALUES (?, ?)",
+                ((path, now) for path in paths)
+            )
+            return conn.total_changes - before
+
+    def lease(self, owner, count=1):
+        """Legfeljebb count fájl kiadása (lejárt lease-ek újra kiadhatók)"""
+        now = time.time()
+        with self._locked() as conn:
+            # Lejárt lease, elfogyott próbálkozások -> dead-letter
+            conn.execute(
+                "UPDATE jobs SET state = 'dead', lease_owner = NULL, updated = ?, "
+                "last_error = COALESCE(last_error, 'lease lejárt (elakadt vagy összeomlott worker)') "
+                "WHERE state = 'leased' AND lease_expires < ? AND attempts >= ?",
+                (now, now, self.max_attempts)
+            )
+            rows = conn.execute(
+                "SELECT path, attempts FROM jobs WHERE state = 'pending' "
+                "OR (state = 'leased' AND lease_expires < ?) ORDER BY updated LIMIT ?",
+                (now, count)
+            ).fetchall()
+            conn.executemany(
+                "UPDATE jobs SET state = 'leased', attempts = attempts + 1, lease_owner = ?, "
+                "lease_expires = ?, updated = ? WHERE path = ?",
+                ((owner, now + self.visibility_timeout, now, path) for path, _ in rows)
+            )
+        return [Lease(path, owner, attempts + 1) for path, attempts in rows]
+
+    def heartbeat(self, leases):
+        """Lease-ek meghosszabbítása"""
+        if not leases:
+            return
+        expires = time.time() + self.visibility_timeout
+        with self._locked() as conn:
+            conn.executemany(
+                "UPDATE jobs SET lease_expires = ? WHERE path = ? AND lease_owner = ? AND state = 'leased'",
+                ((expires, lease.path, lease.owner) for lease in leases)
+            )
+
+    def complete(self, lease):
+        """Sikeres feldolgozás - False, ha a lease közben elveszett"""
+        with self._locked() as conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET state = 'done', lease_owner = NULL, last_error = NULL, updated = ? "
+                "WHERE path = ? AND lease_owner = ? AND state = 'leased'",
+                (time.time(), lease.path, lease.owner)
+            )
+            return cursor.rowcount == 1
+
+    def fail(self, lease, error):
+        """Sikertelen feldolgozás - újrapróbálás vagy dead-letter"""
+        with self._locked() as conn:
+            conn.execute(
+                "UPDATE jobs SET state = CASE WHEN attempts >= ? THEN 'dead' ELSE 'pending' END, "
+                "lease_owner = NULL, last_error = ?, updated = ? "
+                "WHERE path = ? AND lease_owner = ? AND state = 'leased'",
+                (self.max_attempts, error, time.time(), lease.path, lease.owner)
+            )
+
+    def report_node(self, worker_id, stats):
+        """Gépenkénti áteresztőképesség rögzítése"""
+        with self._locked() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO nodes (worker_id, stats, last_seen) VALUES (?, ?, ?)",
+                (worker_id, json.dumps(stats), time.time())
+            )
+
+    def requeue_dead(self):
+        """Dead-letter fájlok visszatétele a sorba nullázott próbálkozással"""
+        with self._locked() as conn:
+            return conn.execute(
+                "UPDATE jobs SET state = 'pending', attempts = 0, updated = ? WHERE state = 'dead'",
+                (time.time(),)
+            ).rowcount
+
+    def dead_letters(self):
+        """Dead-letter fájlok (útvonal, utolsó hiba)"""
+        with self._locked() as conn:
+            return conn.execute(
+                "SELECT path, last_error FROM jobs WHERE state = 'dead' ORDER BY path"
+            ).fetchall()
+
+    def stats(self):
+        """Állapotonkénti darabszám + gépenkénti statisztikák"""
+        with self._locked() as conn:
+            counts = dict(conn.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+            nodes = [(worker_id, json.loads(stats), last_seen) for worker_id, stats, last_seen
+                     in conn.execute("SELECT worker_id, stats, last_seen FROM nodes ORDER BY worker_id")]
+        return counts, nodes
+
+    def close(self):
+        self.conn.close()
+
+
+# Redis Lua scriptek - minden állapotváltás atomikusan a szerveren fut
+_REDIS_ENQUEUE = """
+local added = 0
+for _, path in ipairs(ARGV) do
+    if redis.call('SADD', KEYS[1], path) == 1 then
+        redis.call('RPUSH', KEYS[2], path)
+        added = added + 1
+    end
+end
+return added
+"""
+
+_REDIS_LEASE = """
+local pending, leased, owners, attempts, dead, errors = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5], KEYS[6]
+local now, expires = tonumber(ARGV[1]), tonumber(ARGV[2])
+local max_attempts, count, owner = tonumber(ARGV[3]), tonumber(ARGV[4]), ARGV[5]
+for _, path in ipairs(redis.call('ZRANGEBYSCORE', leased, '-inf', now)) do
+    redis.call('ZREM', leased, path)
+    redis.call('HDEL', owners, path)
+    if tonumber(redis.call('HGET', attempts, path) or '0') >= max_attempts then
+        redis.call('HSETNX', errors, path, 'lease lejárt (elakadt vagy összeomlott worker)')
+        redis.call('RPUSH', dead, path)
+    else
+        redis.call('LPUSH', pending, path)
+    end
+end
+local out = {}
+for i = 1, count do
+    local path = redis.call('LPOP', pending)
+    if not path then break end
+    redis.call('ZADD', leased, expires, path)
+    redis.call('HSET', owners, path, owner)
+    table.insert(out, path)
+    table.insert(out, redis.call('HINCRBY', attempts, path, 1))
+end
+return out
+"""
+
+_REDIS_HEARTBEAT = """
+local expires, owner = ARGV[1], ARGV[2]
+for i = 3, #ARGV do
+    if redis.call('HGET', KEYS[2], ARGV[i]) == owner then
+        redis.call('ZADD', KEYS[1], 'XX', expires, ARGV[i])
+    end
+end
+return 0
+"""
+
+_REDIS_COMPLETE = """
+local leased, owners, attempts, errors, done = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5]
+local path, owner = ARGV[1], ARGV[2]
+if redis.call('HGET', owners, path) ~= owner then return 0 end
+redis.call('ZREM', leased, path)
+redis.call('HDEL', owners, path)
+redis.call('HDEL', attempts, path)
+redis.call('HDEL', errors, path)
+redis.call('INCR', done)
+return 1
+"""
+
+_REDIS_FAIL = """
+local pending, leased, owners, attempts, dead, errors = KEYS[1], KEYS[2], KEYS[3], KEYS[4], KEYS[5], KEYS[6]
+local path, owner, err, max_attempts = ARGV[1], ARGV[2], ARGV[3], tonumber(ARGV[4])
+if redis.call('HGET', owners, path) ~= owner then return 0 end
+redis.call('ZREM', leased, path)
+redis.call('HDEL', owners, path)
+redis.call('HSET', errors, path, err)
+if tonumber(redis.call('HGET', attempts, path) or '0') >= max_attempts then
+    redis.call('RPUSH', dead, path)
+else
+    redis.call('RPUSH', pending, path)
+end
+return 1
+"""
+
+
+class RedisWorkQueue:
+    """
+    Redis munkasor: pending LIST, kiadott fájlok ZSET-ben lejárati idővel
+    """
+    def __init__(self, url, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, prefix='essentia:queue'):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis csomag nincs telepítve (pip install redis)")
+        import redis
+
+        self.client = redis.Redis.from_url(url, decode_responses=True)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.keys = dict(
+            (name, f"{prefix}:{name}")
+            for name in ('known', 'pending', 'leased', 'owners', 'attempts', 'dead', 'errors', 'done', 'nodes')
+        )
+        self._enqueue = self.client.register_script(_REDIS_ENQUEUE)
+        self._lease = self.client.register_script(_REDIS_LEASE)
+        self._heartbeat = self.client.register_script(_REDIS_HEARTBEAT)
+        self._complete = self.client.register_script(_REDIS_COMPLETE)
+        self._fail = self.client.register_script(_REDIS_FAIL)
+
+    def _k(self, *names):
+        return [self.keys[name] for name in names]
+
+    def enqueue(self, paths):
+        added = 0
+        paths = list(paths)
+        # Darabolás, hogy egy script hívás ne legyen túl nagy
+        for start in range(0, len(paths), 1000):
+            added += self._enqueue(keys=self._k('known', 'pending'), args=paths[start:start + 1000])
+        return added
+
+    def lease(self, owner, count=1):
+        now = time.time()
+        out = self._lease(
+            keys=self._k('pending', 'leased', 'owners', 'attempts', 'dead', 'errors'),
+            args=[now, now + self.visibility_timeout, self.max_attempts, count, owner]
+        )
+        return [Lease(out[i], owner, int(out[i + 1])) for i in range(0, len(out), 2)]
+
+    def heartbeat(self, leases):
+        if not leases:
+            return
+        owner = leases[0].owner
+        self._heartbeat(
+            keys=self._k('leased', 'owners'),
+            args=[time.time() + self.visibility_timeout, owner] + [lease.path for lease in leases]
+        )
+
+    def complete(self, lease):
+        return self._complete(
+            keys=self._k('leased', 'owners', 'attempts', 'errors', 'done'),
+            args=[lease.path, lease.owner]
+        ) == 1
+
+    def fail(self, lease, error):
+        self._fail(
+            keys=self._k('pending', 'leased', 'owners', 'attempts', 'dead', 'errors'),
+            args=[lease.path, lease.owner, error, self.max_attempts]
+        )
+
+    def report_node(self, worker_id, stats):
+        self.client.hset(self.keys['nodes'], worker_id, json.dumps(dict(stats, last_seen=time.time())))
+
+    def requeue_dead(self):
+        moved = 0
+        while True:
+            path = self.client.lmove(self.keys['dead'], self.keys['pending'], 'LEFT', 'RIGHT')
+            if path is None:
+                return moved
+            self.client.hdel(self.keys['attempts'], path)
+            moved += 1
+
+    def dead_letters(self):
+        paths = self.client.lrange(self.keys['dead'], 0, -1)
+        errors = self.client.hmget(self.keys['errors'], paths) if paths else []
+        return list(zip(paths, errors))
+
+    def stats(self):
+        counts = {
+            'pending': self.client.llen(self.keys['pending']),
+            'leased': self.client.zcard(self.keys['leased']),
+            'done': int(self.client.get(self.keys['done']) or 0),
+            'dead': self.client.llen(self.keys['dead']),
+        }
+        nodes = []
+        for worker_id, raw in sorted(self.client.hgetall(self.keys['nodes']).items()):
+            stats = json.loads(raw)
+            nodes.append((worker_id, stats, stats.pop('last_seen', None)))
+        return counts, nodes
+
+    def close(self):
+        self.client.close()
+
+
+def open_queue(url, visibility_timeout=DEFAULT_VISIBILITY_TIMEOUT, max_attempts=DEFAULT_MAX_ATTEMPTS):
+    """Munkasor megnyitása URL alapján (sqlite:///... , redis://... vagy sima fájlútvonal)"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisWorkQueue(url, visibility_timeout, max_attempts)
+    if url.startswith('sqlite://'):
+        url = url[len('sqlite://'):]
+    return SQLiteWorkQueue(url, visibility_timeout, max_attempts)
+
+
+class QueueFeeder:
+    """
+    Munkasorból táplált fájllista a process_batch_tensorflow számára
+
+    Iterálva egyenként kér lease-t, háttérszálon heartbeat-et küld,
+    a done() callback pedig nyugtázza / visszaadja a fájlt
+    """
+    def __init__(self, queue, worker_id=None, wait=False, poll_interval=5.0):
+        self.queue = queue
+        self.worker_id = worker_id or default_worker_id()
+        self.wait = wait
+        self.poll_interval = poll_interval
+        self._current = {}
+        self._stop = threading.Event()
+        self.stats = {'files_done': 0, 'files_failed': 0, 'lost_leases': 0,
+                      'audio_sec': 0.0, 'elapsed_sec': 0.0}
+        self._started = None
+
+    def _heartbeat_loop(self):
+        """Futó lease-ek meghosszabbítása a visibility timeout harmadánként"""
+        interval = max(1.0, self.queue.visibility_timeout / 3.0)
+        while not self._stop.wait(interval):
+            try:
+                self.queue.heartbeat(list(self._current.values()))
+            except Exception as e:
+                print(f"⚠️ Heartbeat hiba: {e}", file=sys.stderr)
+
+    def __iter__(self):
+        self._started = time.time()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, daemon=True)
+        heartbeat.start()
+        try:
+            while True:
+                leases = self.queue.lease(self.worker_id, 1)
+                if not leases:
+                    if not self.wait:
+                        return
+                    time.sleep(self.poll_interval)
+                    continue
+                lease = leases[0]
+                self._current[lease.path] = lease
+                yield lease.path
+        finally:
+            self._stop.set()
+            self._report()
+
+    def done(self, path, error=None, result=None):
+        """Fájl nyugtázása: error=None -> kész, különben újrapróbálás / dead-letter"""
+        lease = self._current.pop(path, None)
+        if lease is None:
+            return
+        if error is None:
+            if not self.queue.complete(lease):
+                self.stats['lost_leases'] += 1
+            self.stats['files_done'] += 1
+            if result is not None:
+                self.stats['audio_sec'] += result.get('audio_length', 0.0)
+        else:
+            self.queue.fail(lease, error)
+            self.stats['files_failed'] += 1
+        self._report()
+
+    def _report(self):
+        """Gépenkénti áteresztőképesség kiírása a munkasorba"""
+        if self._started is None:
+            return
+        self.stats['elapsed_sec'] = time.time() - self._started
+        try:
+            self.queue.report_node(self.worker_id, self.stats)
+        except Exception as e:
+            print(f"⚠️ Statisztika küldési hiba: {e}", file=sys.stderr)
+
+    def summary(self):
+        """Ember által olvasható összefoglaló"""
+        elapsed = self.stats['elapsed_sec']
+        rate = self.stats['files_done'] / elapsed * 60 if elapsed > 0 else 0.0
+        realtime = self.stats['audio_sec'] / elapsed if elapsed > 0 else 0.0
+        return (f"🖧 {self.worker_id}: {self.stats['files_done']} kész, {self.stats['files_failed']} hibás, "
+                f"{rate:.1f} fájl/perc, {realtime:.1f}x realtime")
+
+
+def self_test(queue):
+    """
+    Lease, lejárat és visszavétel, heartbeat hosszabbítás, dead-letter a max. próbálkozás után -
+    egy üres sor ellen, SELFTEST_VISIBILITY_TIMEOUT / SELFTEST_MAX_ATTEMPTS beállítással; True, ha minden rendben
+    """
+    checks = []
+
+    def check(name, ok):
+        print(f"  {'✅' if ok else '❌'} {name}")
+        checks.append(ok)
+
+    def state():
+        counts, _ = queue.stats()
+        return dict((key, counts.get(key, 0)) for key in ('pending', 'leased', 'done', 'dead'))
+
+    timeout = queue.visibility_timeout
+    check("enqueue: 3 új fájl, az ismert útvonal nem duplikálódik",
+          queue.enqueue(['a.mp3', 'b.mp3', 'c.mp3']) == 3 and queue.enqueue(['a.mp3']) == 0)
+
+    first = queue.lease('w1', 2)
+    second = queue.lease('w2', 2)
+    check("lease: w1 két fájlt, w2 a maradékot kapja, első próbálkozásként",
+          [lease.path for lease in first] == ['a.mp3', 'b.mp3'] and [lease.path for lease in second] == ['c.mp3']
+          and all(lease.attempt == 1 for lease in first + second))
+    check("lease: üres sorból nincs több kiadás", queue.lease('w3', 1) == [])
+
+    # A b.mp3 nem kap heartbeat-et: lejár, az a.mp3 és a c.mp3 nem
+    time.sleep(timeout * 0.6)
+    queue.heartbeat(first[:1])
+    queue.heartbeat(second)
+    time.sleep(timeout * 0.6)
+    reclaimed = queue.lease('w2', 2)
+    check("lejárat: a heartbeat nélküli b.mp3 újra kiadható (2. próbálkozás), a meghosszabbítottak nem",
+          [(lease.path, lease.attempt) for lease in reclaimed] == [('b.mp3', 2)])
+    check("complete: az elveszett lease nyugtázása elutasítva", not queue.complete(first[1]))
+    check("complete: a meghosszabbított lease nyugtázható", queue.complete(first[0]))
+
+    queue.fail(second[0], 'teszt hiba')
+    retried = queue.lease('w2', 1)
+    check("fail: a fájl visszakerül a sorba (2. próbálkozás)",
+          [(lease.path, lease.attempt) for lease in retried] == [('c.mp3', 2)])
+    queue.fail(retried[0], 'teszt hiba')
+    check(f"dead-letter: {queue.max_attempts} sikertelen próbálkozás után, a hibával",
+          queue.dead_letters() == [('c.mp3', 'teszt hiba')])
+
+    # A b.mp3 a második próbálkozásában is lejár: a következő lease dead-letterbe teszi
+    time.sleep(timeout * 1.2)
+    check("dead-letter: lejárt lease az utolsó próbálkozásnál nem adható ki újra", queue.lease('w3', 1) == [])
+    check("dead-letter: a lejárt fájl is bekerül",
+          dict(queue.dead_letters()).get('b.mp3', '').startswith('lease lejárt'))
+    check("stats: 1 kész, 2 dead-letter, nincs függő / kiadott",
+          state() == {'pending': 0, 'leased': 0, 'done': 1, 'dead': 2})
+
+    check("requeue-dead: 2 fájl vissza, nullázott próbálkozással",
+          queue.requeue_dead() == 2 and sorted((lease.path, lease.attempt) for lease in queue.lease('w1', 5))
+          == [('b.mp3', 1), ('c.mp3', 1)])
+    return all(checks)
+
+
+def run_self_test(url):
+    """Önteszt külön névtérben: Redis-en saját kulcs előtaggal (utána törölve), SQLite-nál ideiglenes fájlban"""
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        queue = RedisWorkQueue(url, SELFTEST_VISIBILITY_TIMEOUT, SELFTEST_MAX_ATTEMPTS,
+                               prefix=f"essentia:selftest:{os.getpid()}")
+        print(f"🧪 Redis önteszt: {url} ({queue.client.info('server')['redis_version']})")
+        try:
+            return self_test(queue)
+        finally:
+            queue.client.delete(*queue.keys.values())
+            queue.close()
+    with tempfile.TemporaryDirectory() as directory:
+        queue = SQLiteWorkQueue(os.path.join(directory, 'selftest.db'), SELFTEST_VISIBILITY_TIMEOUT,
+                                SELFTEST_MAX_ATTEMPTS)
+        print("🧪 SQLite önteszt (ideiglenes sor)")
+        try:
+            return self_test(queue)
+        finally:
+            queue.close()
+
+
+def main(argv=None):
+    """Munkasor kezelő parancssor"""
+    parser = argparse.ArgumentParser(description="Essentia megosztott munkasor")
+    parser.add_argument('--queue', required=True, help="sqlite:///út/queue.db vagy redis://host:6379/0")
+    parser.add_argument('--max-attempts', type=int, default=DEFAULT_MAX_ATTEMPTS,
+                        help=f"Próbálkozások dead-letter előtt (alap: {DEFAULT_MAX_ATTEMPTS})")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    enqueue_cmd = commands.add_parser('enqueue', help="Fájlok felvétele a sorba")
+    enqueue_cmd.add_argument('--audio-dir', default=DEFAULT_AUDIO_DIR, help="Zenei könyvtár (rekurzív)")
+    enqueue_cmd.add_argument('--file-list', metavar='PATH', help="Útvonalak fájlból ('-' = stdin)")
+    enqueue_cmd.add_argument('--shard', type=parse_shard, metavar='i/n', help="Csak az i-edik szelet")
+
+    commands.add_parser('stats', help="Sor állapota és gépenkénti áteresztőképesség")
+    commands.add_parser('dead', help="Dead-letter fájlok listája")
+    commands.add_parser('requeue-dead', help="Dead-letter fájlok visszatétele")
+    commands.add_parser('selftest', help="Lease / lejárat / heartbeat / dead-letter ellenőrzés a backend ellen "
+                                         "(a meglévő sort nem érinti)")
+
+    args = parser.parse_args(argv)
+    if args.command == 'selftest':
+        ok = run_self_test(args.queue)
+        print("🎉 Önteszt sikeres" if ok else "❌ Önteszt sikertelen")
+        return 0 if ok else 1
+    queue = open_queue(args.queue, max_attempts=args.max_attempts)
+
+    try:
+        if args.command == 'enqueue':
+            entries = discover(args.audio_dir, args.file_list, args.shard)
+            base_dir = '' if args.file_list is not None else args.audio_dir
+            added = queue.enqueue(os.path.join(base_dir, path) for path, _ in entries)
+            print(f"📥 Sorba állítva: {added} új fájl ({len(entries) - added} már ismert)")
+
+        elif args.command == 'stats':
+            counts, nodes = queue.stats()
+            print("📊 Sor állapota: " + ", ".join(
+                f"{state}: {counts.get(state, 0)}" for state in ('pending', 'leased', 'done', 'dead')
+            ))
+            now = time.time()
+            for worker_id, stats, last_seen in nodes:
+                elapsed = stats.get('elapsed_sec', 0.0)
+                rate = stats['files_done'] / elapsed * 60 if elapsed > 0 else 0.0
+                realtime = stats['audio_sec'] / elapsed if elapsed > 0 else 0.0
+                seen = f"{now - last_seen:.0f}s" if last_seen else "?"
+                print(f"  🖧 {worker_id}: {stats['files_done']} kész, {stats['files_failed']} hibás, "
+                      f"{rate:.1f} fájl/perc, {realtime:.1f}x realtime (utoljára: {seen})")
+
+        elif args.command == 'dead':
+            for path, error in queue.dead_letters():
+                print(f"💀 {path}: {error}")
+
+        elif args.command == 'requeue-dead':
+            print(f"♻️ Visszatéve: {queue.requeue_dead()} fájl")
+    finally:
+        queue.close()
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,400 @@
+#!/usr/bin/env python3
+"""
+Lejátszási lista / crate csoportosítás az elemzési eredményeken, memórián kívül (batch-enként)
+  - kmeans: vektorizált mini-batch k-means (Sculley) a műfaj aktivációs vektor + tempó jellemzőn
+  - tempo:  egy menetes csoportosítás (legerősebb műfaj, BPM sáv) szerint
+
+Forrás: oszlopos kimenet (.parquet / .arrow, teljes 400 elemű aktivációs vektor) vagy
+SQLite eredménytár (top 5 műfaj konfidenciája ritka vektorként); a futásidő lineáris
+a számok számában (k-means: epochs + 1 menet), a memória a batch mérettel korlátos
+
+Kimenet: <out>_hozzarendeles.csv (path, klaszter, BPM, Genre_1, tavolsag)
+         <out>_kozeppontok.json (klaszterenként méret, átlag BPM, top műfajok, középpont)
+
+Használat:
+  python3 playlist_grouping.py --source eredmenyek.parquet --clusters 48
+  python3 playlist_grouping.py --source eredmenyek.sqlite --method tempo --bucket 8
+"""
+import os
+import sys
+import csv
+import json
+import time
+import sqlite3
+import argparse
+
+import numpy as np
+
+from music_analyzer.columnar_output import ARROW_EXTENSIONS, PYARROW_AVAILABLE
+
+GROUPING_METHODS = ('kmeans', 'tempo')
+DEFAULT_METHOD = 'kmeans'
+DEFAULT_CLUSTERS = 32
+DEFAULT_BATCH_SIZE = 4096
+DEFAULT_EPOCHS = 3
+# A tempó jellemző súlya az egységnyi hosszúra normált műfaj vektorhoz képest
+# (log2 skálán: egy oktáv eltérés = TEMPO_WEIGHT távolság)
+DEFAULT_TEMPO_WEIGHT = 0.5
+BPM_REFERENCE = 120.0
+DEFAULT_BUCKET_BPM = 10.0
+# k-means++ inicializálás legfeljebb ennyi mintából (az első batch-ekből)
+INIT_SAMPLE = 20000
+# Független k-means++ futások száma, a legkisebb potenciálú marad
+INIT_RUNS = 3
+TOP_LABELS = 3
+
+
+class ColumnarSource:
+    """Parquet / Arrow IPC eredményfájl batch-enkénti olvasása (path, BPM, aktivációk)"""
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        if not PYARROW_AVAILABLE:
+            raise RuntimeError("pyarrow nincs telepítve (pip install pyarrow)")
+        self.path = path
+        self.batch_size = batch_size
+        self.is_arrow = os.path.splitext(path)[1].lower() in ARROW_EXTENSIONS
+        schema = self._schema()
+        self.labels = [label.replace('---', ' / ') for label in json.loads(schema.metadata[b'labels'])]
+
+    def _schema(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        if self.is_arrow:
+            with pa.memory_map(self.path) as source:
+                return pa.ipc.open_file(source).schema
+        return pq.read_schema(self.path)
+
+    def _record_batches(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        columns = ['path', 'BPM', 'activations']
+        if self.is_arrow:
+            with pa.memory_map(self.path) as source:
+                reader = pa.ipc.open_file(source)
+                for i in range(reader.num_record_batches):
+                    yield reader.get_batch(i).select(columns)
+        else:
+            yield from pq.ParquetFile(self.path).iter_batches(batch_size=self.batch_size, columns=columns)
+
+    def batches(self):
+        """(útvonalak, BPM tömb, (n, n_classes) float32 mátrix) batch-enként"""
+        n_classes = len(self.labels)
+        for batch in self._record_batches():
+            paths = batch.column(0).to_pylist()
+            bpm = batch.column(1).to_numpy(zero_copy_only=False).astype(np.float32)
+            flat = batch.column(2).flatten().to_numpy(zero_copy_only=False)
+            yield paths, np.nan_to_num(bpm), flat.reshape(len(paths), n_classes).astype(np.float32)
+
+
+class StoreSource:
+    """SQLite eredménytár: a top 5 konfidencia ritka műfaj vektorként, id szerinti lapozással"""
+    def __init__(self, path, batch_size=DEFAULT_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        conn = sqlite3.connect(path)
+        try:
+            genres = conn.execute("SELECT id, name FROM genres ORDER BY id").fetchall()
+        finally:
+            conn.close()
+        self.column_of = dict((genre_id, i) for i, (genre_id, _) in enumerate(genres))
+        self.labels = [name for _, name in genres]
+
+    def batches(self):
+        """(útvonalak, BPM tömb, (n, n_genres) float32 mátrix) batch-enként"""
+        conn = sqlite3.connect(self.path)
+        try:
+            last_id = -1
+            while True:
+                tracks = conn.execute(
+                    "SELECT id, path, bpm FROM tracks WHERE id > ? ORDER BY id LIMIT ?",
+                    (last_id, self.batch_size)
+                ).fetchall()
+                if not tracks:
+                    return
+                row_of = dict((track_id, i) for i, (track_id, _, _) in enumerate(tracks))
+                matrix = np.zeros((len(tracks), len(self.labels)), dtype=np.float32)
+                for track_id, genre_id, confidence in conn.execute(
+                    "SELECT track_id, genre_id, confidence FROM genre_scores WHERE track_id BETWEEN ? AND ?",
+                    (tracks[0][0], tracks[-1][0])
+                ):
+                    if genre_id in self.column_of:
+                        matrix[row_of[track_id], self.column_of[genre_id]] = confidence
+                last_id = tracks[-1][0]
+                bpm = np.array([bpm or 0.0 for _, _, bpm in tracks], dtype=np.float32)
+                yield [path for _, path, _ in tracks], bpm, matrix
+        finally:
+            conn.close()
+
+
+def open_source(path, batch_size=DEFAULT_BATCH_SIZE):
+    """Forrás a kiterjesztés alapján (.parquet / .arrow / .feather / .ipc = oszlopos, más = SQLite)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Forrás nem található: {path}")
+    ext = os.path.splitext(path)[1].lower()
+    if ext == '.parquet' or ext in ARROW_EXTENSIONS:
+        return ColumnarSource(path, batch_size)
+    return StoreSource(path, batch_size)
+
+
+def tempo_feature(bpm):
+    """log2(BPM / 120) - 0 BPM (nem számolt) esetén 0"""
+    return np.where(bpm > 0, np.log2(np.maximum(bpm, 1.0) / BPM_REFERENCE), 0.0).astype(np.float32)
+
+
+def features(matrix, bpm, tempo_weight=DEFAULT_TEMPO_WEIGHT):
+    """Egységnyi hosszúra normált műfaj vektor + súlyozott tempó oszlop"""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    unit = matrix / np.maximum(norms, 1e-8)
+    return np.hstack([unit, tempo_weight * tempo_feature(bpm)[:, np.newaxis]]).astype(np.float32)
+
+
+def cluster_sums(labels, x, n_clusters):
+    """Klaszterenkénti összeg egy mátrixszorzással (one-hot^T · x, gyorsabb az np.add.at-nél)"""
+    one_hot = np.zeros((n_clusters, len(labels)), dtype=x.dtype)
+    one_hot[labels, np.arange(len(labels))] = 1.0
+    return (one_hot @ x).astype(np.float64)
+
+
+def nearest(x, centers):
+    """Legközelebbi középpont és a négyzetes távolság (||x||² - 2x·c + ||c||², egy mátrixszorzás)"""
+    distances = (x * x).sum(axis=1)[:, np.newaxis] - 2.0 * (x @ centers.T) + (centers * centers).sum(axis=1)
+    labels = np.argmin(distances, axis=1)
+    return labels, np.maximum(distances[np.arange(len(x)), labels], 0.0)
+
+
+class MiniBatchKMeans:
+    """
+    Mini-batch k-means: batch-enként hozzárendelés, majd a középpontok mozgatása
+    1 / (eddigi darabszám) tanulási rátával (a klasszikus per-minta frissítés batch alakja)
+    """
+    def __init__(self, n_clusters=DEFAULT_CLUSTERS, seed=0):
+        self.n_clusters = n_clusters
+        self.rng = np.random.default_rng(seed)
+        self.centers = None
+        self.counts = np.zeros(n_clusters, dtype=np.float64)
+
+    def init_centers(self, sample, runs=INIT_RUNS):
+        """k-means++ runs-szor a mintán, a legkisebb összes négyzetes távolságú középpontok maradnak"""
+        best = None
+        for _ in range(runs):
+            centers, potential = self._plus_plus(sample)
+            if best is None or potential < best[1]:
+                best = (centers, potential)
+        self.centers = best[0]
+
+    def _plus_plus(self, sample):
+        """
+        Mohó k-means++: lépésenként 2 + log(k) jelölt a D² eloszlásból,
+        a teljes potenciált leginkább csökkentő marad (zajos adaton stabilabb)
+        """
+        k = self.n_clusters
+        trials = 2 + int(np.log(k))
+        sample_sq = (sample * sample).sum(axis=1)
+        centers = np.empty((k, sample.shape[1]), dtype=np.float32)
+        centers[0] = sample[self.rng.integers(len(sample))]
+        closest = np.maximum(sample_sq - 2.0 * (sample @ centers[0]) + sample_sq.dtype.type(centers[0] @ centers[0]), 0.0)
+        for i in range(1, k):
+            total = closest.sum()
+            if total > 0:
+                candidates = self.rng.choice(len(sample), size=trials, p=closest / total)
+            else:
+                candidates = self.rng.integers(len(sample), size=trials)
+            chosen = sample[candidates]
+            distances = sample_sq[np.newaxis, :] - 2.0 * (chosen @ sample.T) + (chosen * chosen).sum(axis=1)[:, np.newaxis]
+            potentials = np.minimum(closest[np.newaxis, :], np.maximum(distances, 0.0))
+            best = int(np.argmin(potentials.sum(axis=1)))
+            centers[i] = chosen[best]
+            closest = potentials[best]
+        return centers, float(closest.sum())
+
+    def partial_fit(self, x):
+        """Egy batch: hozzárendelés + középpont frissítés (vektorizálva)"""
+        labels, _ = nearest(x, self.centers)
+        batch_counts = np.bincount(labels, minlength=self.n_clusters).astype(np.float64)
+        sums = cluster_sums(labels, x, self.n_clusters)
+        hit = batch_counts > 0
+        self.counts += batch_counts
+        rate = (batch_counts[hit] / self.counts[hit])[:, np.newaxis]
+        batch_means = sums[hit] / batch_counts[hit][:, np.newaxis]
+        self.centers[hit] = ((1.0 - rate) * self.centers[hit] + rate * batch_means).astype(np.float32)
+        return labels
+
+    def predict(self, x):
+        return nearest(x, self.centers)
+
+
+class _ClusterStats:
+    """Klaszterenkénti összegek a kimenethez (méret, BPM, átlagos műfaj vektor)"""
+    def __init__(self, n_genres):
+        self.n_genres = n_genres
+        self.size = []
+        self.bpm_sum = []
+        self.bpm_count = []
+        self.genre_sum = []
+
+    def add(self, labels, bpm, matrix):
+        n = int(labels.max()) + 1 if len(labels) else 0
+        while len(self.size) < n:
+            self.size.append(0)
+            self.bpm_sum.append(0.0)
+            self.bpm_count.append(0)
+            self.genre_sum.append(np.zeros(self.n_genres, dtype=np.float64))
+        counts = np.bincount(labels, minlength=n)
+        has_bpm = bpm > 0
+        bpm_sums = np.bincount(labels[has_bpm], weights=bpm[has_bpm], minlength=n)
+        bpm_counts = np.bincount(labels[has_bpm], minlength=n)
+        sums = cluster_sums(labels, matrix, n)
+        for cluster in np.flatnonzero(counts):
+            self.size[cluster] += int(counts[cluster])
+            self.bpm_sum[cluster] += float(bpm_sums[cluster])
+            self.bpm_count[cluster] += int(bpm_counts[cluster])
+            self.genre_sum[cluster] += sums[cluster]
+
+
+def _write_assignments(writer, paths, labels, bpm, matrix, names, distances=None):
+    top = np.argmax(matrix, axis=1)
+    for i, path in enumerate(paths):
+        writer.writerow([path, int(labels[i]), round(float(bpm[i]), 1), names[top[i]],
+                         round(float(np.sqrt(distances[i])), 4) if distances is not None else ''])
+
+
+def group_kmeans(source, writer, n_clusters, epochs=DEFAULT_EPOCHS, tempo_weight=DEFAULT_TEMPO_WEIGHT, seed=0):
+    """Mini-batch k-means epochs menetben, majd egy hozzárendelő menet; (modell, statisztika)"""
+    model = MiniBatchKMeans(n_clusters, seed)
+    stats = _ClusterStats(len(source.labels))
+
+    for epoch in range(epochs):
+        pending = []
+        for _, bpm, matrix in source.batches():
+            x = features(matrix, bpm, tempo_weight)
+            if model.centers is None:
+                # Inicializálás az első batch-(ek)ből: legalább k minta kell
+                pending.append(x)
+                sample = np.vstack(pending)
+                if len(sample) < max(n_clusters, min(INIT_SAMPLE, source.batch_size)):
+                    continue
+                model.init_centers(sample[:INIT_SAMPLE])
+                pending = []
+                x = sample
+            model.partial_fit(x)
+        if model.centers is None:
+            if not pending:
+                raise ValueError("Üres forrás - nincs csoportosítható szám")
+            # Kevés szám: az egész forrás egy batch
+            sample = np.vstack(pending)
+            model.n_clusters = min(n_clusters, len(sample))
+            model.counts = np.zeros(model.n_clusters)
+            model.init_centers(sample)
+            model.partial_fit(sample)
+        print(f"  🔁 {epoch + 1}/{epochs}. menet kész", file=sys.stderr)
+
+    for paths, bpm, matrix in source.batches():
+        labels, distances = model.predict(features(matrix, bpm, tempo_weight))
+        stats.add(labels, bpm, matrix)
+        _write_assignments(writer, paths, labels, bpm, matrix, source.labels, distances)
+    return model, stats
+
+
+def tempo_bucket_keys(matrix, bpm, bucket_bpm=DEFAULT_BUCKET_BPM):
+    """(legerősebb műfaj index, BPM sáv alsó határa) párok; 0 BPM = -1 sáv"""
+    top = np.argmax(matrix, axis=1)
+    buckets = np.where(bpm > 0, np.floor(bpm / bucket_bpm) * bucket_bpm, -1.0)
+    return list(zip(top.tolist(), buckets.tolist()))
+
+
+def group_tempo(source, writer, bucket_bpm=DEFAULT_BUCKET_BPM):
+    """Egy menetes csoportosítás műfaj + BPM sáv szerint; ({kulcs: klaszter}, statisztika)"""
+    groups = {}
+    stats = _ClusterStats(len(source.labels))
+    for paths, bpm, matrix in source.batches():
+        keys = tempo_bucket_keys(matrix, bpm, bucket_bpm)
+        labels = np.array([groups.setdefault(key, len(groups)) for key in keys], dtype=np.int64)
+        stats.add(labels, bpm, matrix)
+        _write_assignments(writer, paths, labels, bpm, matrix, source.labels)
+    return groups, stats
+
+
+def describe_clusters(stats, labels, centers=None, groups=None, bucket_bpm=DEFAULT_BUCKET_BPM):
+    """Klaszter leírások a JSON kimenethez (név: top műfaj + BPM)"""
+    keys = dict((cluster, key) for key, cluster in (groups or {}).items())
+    clusters = []
+    for cluster, size in enumerate(stats.size):
+        if size == 0:
+            continue
+        mean_genres = stats.genre_sum[cluster] / size
+        order = np.argsort(mean_genres)[::-1][:TOP_LABELS]
+        mean_bpm = stats.bpm_sum[cluster] / stats.bpm_count[cluster] if stats.bpm_count[cluster] else None
+        if cluster in keys and keys[cluster][1] >= 0:
+            tempo_text = f"{keys[cluster][1]:.0f}-{keys[cluster][1] + bucket_bpm:.0f} BPM"
+        else:
+            tempo_text = f"~{mean_bpm:.0f} BPM" if mean_bpm else "BPM nélkül"
+        entry = {
+            'klaszter': cluster,
+            'nev': f"{labels[order[0]]} · {tempo_text}",
+            'meret': size,
+            'atlag_BPM': round(mean_bpm, 1) if mean_bpm else None,
+            'top_mufajok': [[labels[i], round(float(mean_genres[i]), 4)] for i in order],
+        }
+        if centers is not None:
+            entry['kozeppont'] = [round(float(v), 5) for v in centers[cluster]]
+        clusters.append(entry)
+    return clusters
+
+
+def main(argv=None):
+    """Csoportosítás parancssor"""
+    parser = argparse.ArgumentParser(description="Lejátszási lista csoportosítás műfaj és tempó szerint")
+    parser.add_argument('--source', required=True, help="Eredmények: .parquet / .arrow vagy SQLite eredménytár")
+    parser.add_argument('--method', choices=GROUPING_METHODS, default=DEFAULT_METHOD,
+                        help="kmeans: mini-batch k-means, tempo: műfaj + BPM sáv")
+    parser.add_argument('--clusters', type=int, default=DEFAULT_CLUSTERS, help="Klaszterek száma (kmeans)")
+    parser.add_argument('--epochs', type=int, default=DEFAULT_EPOCHS, help="Menetek száma (kmeans)")
+    parser.add_argument('--tempo-weight', type=float, default=DEFAULT_TEMPO_WEIGHT,
+                        help="Tempó súlya a műfaj vektorhoz képest (kmeans, 0 = csak műfaj)")
+    parser.add_argument('--bucket', type=float, default=DEFAULT_BUCKET_BPM, help="BPM sáv szélesség (tempo)")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help="Sorok batch-enként")
+    parser.add_argument('--seed', type=int, default=0, help="Véletlen mag (kmeans++ inicializálás)")
+    parser.add_argument('--out', default="csoportok", help="Kimeneti fájlok előtagja")
+    args = parser.parse_args(argv)
+
+    try:
+        source = open_source(args.source, args.batch_size)
+    except (FileNotFoundError, RuntimeError, sqlite3.Error) as e:
+        print(f"❌ {e}", file=sys.stderr)
+        return 1
+
+    assignments_path = f"{args.out}_hozzarendeles.csv"
+    centroids_path = f"{args.out}_kozeppontok.json"
+    print(f"🧩 Csoportosítás: {args.method}, forrás: {args.source} ({len(source.labels)} műfaj)", file=sys.stderr)
+    start = time.time()
+
+    with open(assignments_path, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.writer(f)
+        writer.writerow(['path', 'klaszter', 'BPM', 'Genre_1', 'tavolsag'])
+        if args.method == 'kmeans':
+            try:
+                model, stats = group_kmeans(source, writer, args.clusters, args.epochs, args.tempo_weight, args.seed)
+            except ValueError as e:
+                print(f"❌ {e}", file=sys.stderr)
+                return 1
+            clusters = describe_clusters(stats, source.labels, centers=model.centers)
+        else:
+            groups, stats = group_tempo(source, writer, args.bucket)
+            clusters = describe_clusters(stats, source.labels, groups=groups, bucket_bpm=args.bucket)
+
+    with open(centroids_path, 'w', encoding='utf-8') as f:
+        json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'source': args.source, 'method': args.method,
+                   'labels': source.labels, 'tempo_weight': args.tempo_weight if args.method == 'kmeans' else None,
+                   'clusters': clusters}, f, ensure_ascii=False, indent=1)
+
+    tracks = sum(cluster['meret'] for cluster in clusters)
+    elapsed = time.time() - start
+    print(f"✅ {tracks} szám, {len(clusters)} csoport, {elapsed:.1f}s "
+          f"({tracks / elapsed if elapsed > 0 else 0:.0f} szám/s)", file=sys.stderr)
+    for cluster in sorted(clusters, key=lambda c: -c['meret'])[:10]:
+        print(f"  {cluster['meret']:6d}  {cluster['nev']}")
+    print(f"💾 {assignments_path}, {centroids_path}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
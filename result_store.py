@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Tartós SQLite eredménytár az elemzési eredményekhez
+Parancssori belépési pont; a modul: music_analyzer.result_store (python3 -m music_analyzer.result_store is ugyanez)
+"""
+import sys
+
+from music_analyzer.result_store import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Indulási idő benchmark: a parancssori belépési pontok `--help` futása friss interpreterben
+Modulonkénti import költség (python -X importtime), összevetés a mentett alapvonallal
+
+Regressziónak számít (nem nulla kilépési kód):
+  - nehéz modul (essentia, tensorflow, pandas, pyarrow, redis) betöltése --help alatt
+  - a medián indulási idő az alapvonal (1 + tűrés)-szerese + STARTUP_SLACK_SEC fölött
+
+Használat:
+  python3 startup_benchmark.py              # mérés + ellenőrzés
+  python3 startup_benchmark.py --save       # alapvonal mentése
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+import statistics
+
+DEFAULT_BASELINE_PATH = "startup_baseline.json"
+# Ezek csak a tényleges elemzéshez / kimenethez kellenek, --help alatt nem töltődhetnek be
+HEAVY_MODULES = ('essentia', 'tensorflow', 'pandas', 'pyarrow', 'redis')
+STARTUP_COMMANDS = (
+    ('linux_essentia_speed.py', '--help'),
+    ('linux_essentia_optimized.py', '--help'),
+    ('apple_essentia_silicon.py', '--help'),
+    ('result_store.py', '--help'),
+    ('work_queue.py', '--help'),
+    ('audio_probe.py', '--help'),
+    ('audio_decoders.py', '--help'),
+    ('benchmark_history.py', '--help'),
+    ('evaluate_modes.py', '--help'),
+    ('mel_patches.py', '--help'),
+    ('job_scheduler.py', '--help'),
+)
+DEFAULT_REPEAT = 5
+DEFAULT_TOLERANCE = 0.3
+# Abszolút ráhagyás: rövid futásoknál a folyamatindítás zaja nagyobb, mint a relatív tűrés
+STARTUP_SLACK_SEC = 0.05
+TOP_MODULES = 8
+
+
+def _run(command, importtime=False):
+    """Egy parancs friss interpreterben; (idő másodpercben, stderr)"""
+    script_dir = os.path.dirname(os.path.abspath(__file__))
+    argv = [sys.executable] + (['-X', 'importtime'] if importtime else []) + \
+        [os.path.join(script_dir, command[0])] + list(command[1:])
+    start = time.perf_counter()
+    completed = subprocess.run(argv, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, cwd=script_dir)
+    elapsed = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} kilépési kód: {completed.returncode}")
+    return elapsed, completed.stderr.decode('utf-8', 'replace')
+
+
+def parse_importtime(stderr):
+    """
+    -X importtime kimenet: ({legfelső szintű modul: kumulatív ms}, betöltött csomagok halmaza)
+    A beágyazott importok behúzással szerepelnek, ezek a szülő kumulatív idejében vannak
+    """
+    top_level = {}
+    packages = set()
+    for line in stderr.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        fields = line[len('import time:'):].split('|')
+        if len(fields) != 3 or not fields[1].strip().isdigit():
+            continue
+        name = fields[2].rstrip()
+        module = name.strip()
+        packages.add(module.split('.')[0])
+        if not name[1:].startswith(' '):
+            top_level[module] = top_level.get(module, 0.0) + int(fields[1]) / 1000.0
+    return top_level, packages
+
+
+def measure(command, repeat=DEFAULT_REPEAT):
+    """Medián indulási idő + modulonkénti import költség + betöltött nehéz modulok"""
+    times = [_run(command)[0] for _ in range(repeat)]
+    _, stderr = _run(command, importtime=True)
+    modules, packages = parse_importtime(stderr)
+    return {
+        'median_sec': round(statistics.median(times), 4),
+        'min_sec': round(min(times), 4),
+        'modules': dict((name, round(ms, 2)) for name, ms in modules.items()),
+        'heavy': sorted(packages.intersection(HEAVY_MODULES)),
+    }
+
+
+def load_baseline(path):
+    """Mentett alapvonal ({parancs: mérés}); hiányzó fájl: üres"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f).get('commands', {})
+
+
+def check(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Regressziók listája (üres = rendben)"""
+    problems = []
+    for name, result in results.items():
+        if result['heavy']:
+            problems.append(f"{name}: nehéz modul --help alatt: {', '.join(result['heavy'])}")
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        limit = reference['median_sec'] * (1 + tolerance) + STARTUP_SLACK_SEC
+        if result['median_sec'] > limit:
+            problems.append(f"{name}: {result['median_sec']:.3f}s > {limit:.3f}s "
+                            f"(alapvonal {reference['median_sec']:.3f}s)")
+    return problems
+
+
+def print_report(results, baseline, top=TOP_MODULES):
+    """Parancsonkénti idő (alapvonalhoz képest) és a legdrágább importok"""
+    for name, result in results.items():
+        reference = baseline.get(name)
+        change = ""
+        if reference:
+            change = f" (alapvonal {reference['median_sec']:.3f}s, {result['median_sec'] / reference['median_sec'] - 1:+.0%})"
+        print(f"\n⏱️  {name}: {result['median_sec']:.3f}s medián, {result['min_sec']:.3f}s min{change}")
+        for module, ms in sorted(result['modules'].items(), key=lambda item: -item[1])[:top]:
+            print(f"    {ms:8.1f} ms  {module}")
+
+
+def main(argv=None):
+    """Indulási idő mérés parancssor"""
+    parser = argparse.ArgumentParser(description="Parancssori belépési pontok indulási ideje és import költsége")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_PATH, help="Alapvonal fájl (JSON)")
+    parser.add_argument('--save', action='store_true', help="A mérés mentése új alapvonalként")
+    parser.add_argument('--repeat', type=int, default=DEFAULT_REPEAT, help="Futások száma parancsonként")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE,
+                        help=f"Megengedett relatív lassulás (alap: {DEFAULT_TOLERANCE:.0%}%)")
+    parser.add_argument('--top', type=int, default=TOP_MODULES, help="Kiírt legdrágább importok száma")
+    args = parser.parse_args(argv)
+
+    print(f"🚀 Indulási idő benchmark ({platform.python_implementation()} {platform.python_version()}, "
+          f"{args.repeat} futás / parancs)")
+    results = {}
+    for command in STARTUP_COMMANDS:
+        results[' '.join(command)] = measure(command, args.repeat)
+
+    baseline = load_baseline(args.baseline)
+    print_report(results, baseline, args.top)
+
+    if args.save:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({'created': time.strftime("%Y-%m-%d %H:%M:%S"), 'python': platform.python_version(),
+                       'machine': platform.machine(), 'commands': results}, f, indent=2)
+        print(f"\n💾 Alapvonal mentve: {args.baseline}")
+
+    problems = check(results, baseline if not args.save else {}, args.tolerance)
+    if problems:
+        print("\n❌ Indulási regresszió:")
+        for problem in problems:
+            print(f"  • {problem}")
+        return 1
+    print("\n✅ Nincs indulási regresszió"
+          + ("" if baseline or args.save else " (alapvonal nélkül csak a nehéz importok ellenőrizve)"))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
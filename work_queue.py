@@ -0,0 +1,11 @@
+#!/usr/bin/env python3
+"""
+Megosztott munkasor több elemző géphez: lease, heartbeat, visibility timeout,
+Parancssori belépési pont; a modul: music_analyzer.work_queue (python3 -m music_analyzer.work_queue is ugyanez)
+"""
+import sys
+
+from music_analyzer.work_queue import main
+
+if __name__ == "__main__":
+    sys.exit(main())